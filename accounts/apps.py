@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from simple_history.signals import post_create_historical_record
+        from .signals import record_history_changes
+        post_create_historical_record.connect(record_history_changes)
@@ -0,0 +1,146 @@
+"""
+Архівування старої історії (simple_history).
+Записи історії, старші за HISTORY_RETENTION_MONTHS місяців, переносяться у файли
+JSONL.gz в каталозі HISTORY_ARCHIVE_DIR
+(<app_label>.<model>/<рік>-<місяць>/<перший history_id частини>.jsonl.gz),
+а зміни полів - з HistoryChange в ArchivedHistoryChange.
+Останній запис історії кожного обʼєкта залишається, щоб наступна зміна
+порівнювалась з ним. Дані переносяться частинами, тому памʼять обмежена
+розміром частини.
+Файл частини повністю записується до видалення записів з БД. Якщо видалення
+не відбулось, повторний запуск запише ці записи ще раз, а при читанні
+повтори відкидаються за history_id.
+"""
+
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from itertools import groupby
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import ArchivedHistoryChange, HistoryChange
+
+
+def retention_months() -> int:
+    return getattr(settings, "HISTORY_RETENTION_MONTHS", 12)
+
+
+def archive_dir() -> str:
+    default = os.path.join(settings.BASE_DIR, "history_archive")
+    return getattr(settings, "HISTORY_ARCHIVE_DIR", default)
+
+
+def retention_cutoff(months: int) -> datetime.datetime:
+    """Початок місяця, який був <months> місяців тому"""
+    now = timezone.localtime()
+    month = now.year * 12 + now.month - 1 - months
+    return now.replace(
+        year=month // 12, month=month % 12 + 1, day=1,
+        hour=0, minute=0, second=0, microsecond=0,
+    )
+
+
+def archive_month_dir(model, date: datetime.date) -> str:
+    return os.path.join(archive_dir(), model._meta.label_lower, f"{date:%Y-%m}")
+
+
+def write_records(model, rows: list[dict]) -> None:
+    """Записує записи історії <rows> моделі <model> у файли архіву за місяцями"""
+    def month(row):
+        return row["history_date"].date().replace(day=1)
+
+    for date, month_rows in groupby(sorted(rows, key=month), key=month):
+        month_rows = list(month_rows)
+        directory = archive_month_dir(model, date)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{month_rows[0]['history_id']}.jsonl.gz")
+        # пишемо в тимчасовий файл і перейменовуємо, щоб не лишилось недописаних файлів
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".tmp", delete=False
+        ) as tmp:
+            with gzip.open(tmp, "wt", encoding="utf-8") as file:
+                for row in month_rows:
+                    file.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+        os.replace(tmp.name, path)
+
+
+def read_records(model, date: datetime.date):
+    """Записи історії моделі <model> з архіву за місяць <date> за зростанням history_id"""
+    directory = archive_month_dir(model, date)
+    if not os.path.isdir(directory):
+        return
+    names = [name for name in os.listdir(directory) if name.endswith(".jsonl.gz")]
+    seen = set()
+    for name in sorted(names, key=lambda name: int(name.split(".")[0])):
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as file:
+            for line in file:
+                row = json.loads(line)
+                if row["history_id"] not in seen:
+                    seen.add(row["history_id"])
+                    yield row
+
+
+def archive_records(model, cutoff: datetime.datetime, batch_size: int) -> int:
+    """
+    Переносить у файли архіву записи історії моделі <model>, старші за <cutoff>,
+    крім останнього запису кожного обʼєкта. Повертає кількість перенесених записів.
+    """
+    history_model = model.history.model
+    pk_name = model._meta.pk.attname
+    newer = history_model.objects.filter(
+        **{pk_name: OuterRef(pk_name)}, history_date__gt=OuterRef("history_date")
+    )
+    qs = history_model.objects.filter(Exists(newer), history_date__lt=cutoff)
+
+    archived = 0
+    last_id = 0
+    while True:
+        rows = list(
+            qs.filter(history_id__gt=last_id).order_by("history_id").values()[:batch_size]
+        )
+        if not rows:
+            return archived
+        last_id = rows[-1]["history_id"]
+        # спочатку файл, потім видалення: при збої записи лишаються в БД
+        write_records(model, rows)
+        history_model.objects.filter(
+            history_id__in=[row["history_id"] for row in rows]
+        ).delete()
+        archived += len(rows)
+
+
+def archive_changes(cutoff: datetime.datetime, batch_size: int) -> int:
+    """
+    Переносить зміни полів, старші за <cutoff>, в ArchivedHistoryChange.
+    Повертає кількість перенесених змін.
+    """
+    fields = [
+        field.attname
+        for field in HistoryChange._meta.concrete_fields
+        if not field.primary_key
+    ]
+    archived = 0
+    while True:
+        with transaction.atomic():
+            changes = list(
+                HistoryChange.objects.filter(date__lt=cutoff)
+                .order_by("id")
+                .values("id", *fields)[:batch_size]
+            )
+            if not changes:
+                return archived
+            ArchivedHistoryChange.objects.bulk_create(
+                ArchivedHistoryChange(**{field: change[field] for field in fields})
+                for change in changes
+            )
+            HistoryChange.objects.filter(
+                id__in=[change["id"] for change in changes]
+            ).delete()
+        archived += len(changes)
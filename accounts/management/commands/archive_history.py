@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from simple_history.models import registered_models
+
+from accounts import history_archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносить історію, старшу за --months місяців (HISTORY_RETENTION_MONTHS), "
+        "у файли JSONL.gz в HISTORY_ARCHIVE_DIR, а зміни полів - в архівну таблицю"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months", type=int, default=history_archive.retention_months()
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        cutoff = history_archive.retention_cutoff(options["months"])
+        self.stdout.write(f"Archiving history older than {cutoff:%Y-%m-%d}")
+
+        for model in sorted(registered_models.values(), key=lambda m: m._meta.label):
+            count = history_archive.archive_records(model, cutoff, batch_size)
+            self.stdout.write(f"{model.__name__}: {count} records")
+
+        count = history_archive.archive_changes(cutoff, batch_size)
+        self.stdout.write(f"Field changes: {count}")
+
+        self.stdout.write(self.style.SUCCESS("History archived successfully!"))
@@ -0,0 +1,46 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from simple_history.models import registered_models
+
+from accounts.models import HistoryChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Заповнює таблицю змін полів (HistoryChange) з наявної історії моделей. "
+        "Історія читається потоково, частинами по --batch-size записів"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        for model in sorted(registered_models.values(), key=lambda m: m._meta.label):
+            self.stdout.write(f"Backfilling {model.__name__}")
+            pk_name = model._meta.pk.attname
+            content_type = ContentType.objects.get_for_model(model)
+            records = model.history.model.objects.order_by(
+                pk_name, "history_date", "history_id"
+            )
+
+            with transaction.atomic():
+                HistoryChange.objects.filter(content_type=content_type).delete()
+                prev_record = None
+                pairs = []
+                for record in records.iterator(chunk_size=batch_size):
+                    # записи одного обʼєкта йдуть підряд, тому попередній запис
+                    # обʼєкта - попередній рядок
+                    if prev_record and getattr(prev_record, pk_name) == getattr(
+                        record, pk_name
+                    ):
+                        pairs.append((prev_record, record))
+                    prev_record = record
+                    if len(pairs) >= batch_size:
+                        HistoryChange.objects.bulk_create(HistoryChange.from_records(pairs))
+                        pairs = []
+                HistoryChange.objects.bulk_create(HistoryChange.from_records(pairs))
+
+        self.stdout.write(self.style.SUCCESS("History changes backfilled successfully!"))
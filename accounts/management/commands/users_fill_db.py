@@ -1,12 +1,20 @@
+import os
 import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from xml.etree.ElementTree import Element
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Permission
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
 
 from accounts.models import CustomGroup, CustomUser
-from handbooks.models import FilialAgency
+from handbooks.models import FilialAgency, PhoneNumber
+from utils.import_profile import ImportProfile
+from utils.import_report import ImportReport
+from utils.model_versions import bump_model_version
 
 
 @dataclass
@@ -71,63 +79,218 @@ def parse_user_element(user_element: Element) -> UserData:
     return user
 
 
-class Command(BaseCommand):
-    help = "Додає групи та користувачів з файлів 'xml/Groups.xml' та 'xml/Users.xml' до бази даних."
+def hash_passwords(passwords: list[str], jobs: int) -> list[str]:
+    """
+    Хешує паролі в <jobs> процесах: кожен хеш PBKDF2 займає сотні мілісекунд,
+    тому для сотень користувачів послідовне хешування - найдовша частина імпорту.
+    """
+    if jobs <= 1 or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(passwords) // (jobs * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def ids_by(queryset, field_name: str, values) -> dict[str, list[int]]:
+    """Значення поля <field_name> -> pk всіх обʼєктів з цим значенням"""
+    ids = defaultdict(list)
+    for pk, value in queryset.filter(**{f"{field_name}__in": values}).values_list(
+        "pk", field_name
+    ):
+        ids[value].append(pk)
+    return ids
+
+
+def validate(groups_data: list[GroupData], users_data: list[UserData]) -> ImportReport:
+    """
+    Перевіряє групи та користувачів з файлів. База лише читається: помилки -
+    порожні та повторені назви й email, а також ті, що вже є в базі,
+    попередження - невідомі права, філії та групи, які будуть пропущені.
+    """
+    report = ImportReport()
+
+    names = Counter(group.name for group in groups_data)
+    existing_groups = set(
+        CustomGroup.objects.filter(name__in=names).values_list("name", flat=True)
+    )
+    codenames = {codename for group in groups_data for codename in group.permissions}
+    known_codenames = set(
+        Permission.objects.filter(codename__in=codenames).values_list(
+            "codename", flat=True
+        )
+    )
+    for group in groups_data:
+        if not group.name:
+            report.error("groups", group.name, "Name", group.name, "missing name")
+        elif names[group.name] > 1:
+            report.error("groups", group.name, "Name", group.name, "duplicate name")
+        elif group.name in existing_groups:
+            report.error("groups", group.name, "Name", group.name, "already exists")
+        for codename in set(group.permissions) - known_codenames:
+            report.warning("groups", group.name, "Permission", codename, "unknown")
+
+    emails = Counter(user.email for user in users_data)
+    existing_users = set(
+        CustomUser.objects.filter(email__in=emails).values_list("email", flat=True)
+    )
+    filials = {filial for user in users_data for filial in user.filials}
+    known_filials = set(
+        FilialAgency.objects.filter(filial_agency__in=filials).values_list(
+            "filial_agency", flat=True
+        )
+    )
+    known_groups = set(names) | set(
+        CustomGroup.objects.values_list("name", flat=True)
+    )
+    for user in users_data:
+        if not user.email:
+            report.error("users", user.email, "Email", user.email, "missing email")
+        elif emails[user.email] > 1:
+            report.error("users", user.email, "Email", user.email, "duplicate email")
+        elif user.email in existing_users:
+            report.error("users", user.email, "Email", user.email, "already exists")
+        if not user.password:
+            report.error("users", user.email, "Password", None, "missing password")
+        for filial in set(user.filials) - known_filials:
+            report.warning("users", user.email, "Filial", filial, "unknown")
+        for group in set(user.groups) - known_groups:
+            report.warning("users", user.email, "Group", group, "unknown")
+    return report
 
-    def handle(self, *args, **options):
-        self.stdout.write("Filling groups...")
 
-        root = ET.parse("xml/Groups.xml").getroot()
-        groups_data = list(map(parse_group_element, root.findall("Group")))
+class Command(BaseCommand):
+    help = "Додає групи та користувачів з файлів 'xml/Groups.xml' та 'xml/Users.xml' до бази даних."
 
-        if any(group.name == "" for group in groups_data):
-            raise ValueError("You didn't specify a group name.")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--xml-dir", default="xml", help="Каталог з Groups.xml та Users.xml",
+        )
+        parser.add_argument(
+            "--jobs", type=int, default=os.cpu_count() or 1,
+            help="Кількість процесів для хешування паролів",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Лише перевірити файли та записати звіт, не змінюючи базу",
+        )
+        parser.add_argument(
+            "--report", default="users_fill_db_report.json",
+            help="Файл JSON звіту перевірки для --dry-run",
+        )
+        parser.add_argument(
+            "--profile", action="store_true",
+            help="Вивести рядки, час, кількість запитів та памʼять кожного етапу",
+        )
 
-        groups = [CustomGroup(name=group.name) for group in groups_data]
-        for group in groups:
-            group.save()
+    def handle(self, *args, **options):
+        xml_dir = options["xml_dir"]
+        profile = ImportProfile(enabled=options["profile"])
+
+        with profile.stage("Parse") as stage:
+            root = ET.parse(os.path.join(xml_dir, "Groups.xml")).getroot()
+            groups_data = list(map(parse_group_element, root.findall("Group")))
+            users_root = ET.parse(os.path.join(xml_dir, "Users.xml")).getroot()
+            users_data = list(map(parse_user_element, users_root.findall("User")))
+            stage.rows = len(groups_data) + len(users_data)
+
+        with profile.stage("Validate") as stage:
+            report = validate(groups_data, users_data)
+            stage.rows = len(report.issues)
+        self.stdout.write(f"{report.errors} errors, {report.warnings} warnings")
+        if options["dry_run"]:
+            report.write(options["report"])
+            self.stdout.write(f"Report written to {options['report']}")
+            self.write_profile(profile)
+            if report.errors:
+                raise CommandError(f"{report.errors} errors in xml files")
+            return
+        if report.errors:
+            raise CommandError(
+                f"{report.errors} errors in xml files, nothing imported. "
+                "Run with --dry-run for the report"
+            )
 
-        for i, group_data in enumerate(groups_data):
-            if len(group_data.permissions) == 0:
-                continue
+        with transaction.atomic():
+            self.fill_groups(groups_data, profile)
+            self.fill_users(users_data, options["jobs"], profile)
 
-            perms = Permission.objects.filter(codename__in=group_data.permissions)
-            groups[i].permissions.set(perms)
+        self.write_profile(profile)
+        self.stdout.write(self.style.SUCCESS("Groups and users filled successfully!"))
 
+    def fill_groups(self, groups_data: list[GroupData], profile: ImportProfile):
+        self.stdout.write("Filling groups...")
+        with profile.stage("Groups") as stage:
+            # bulk_create не підтримує наслідування таблиць (CustomGroup -> Group),
+            # тому групи, яких небагато, зберігаються по одній
+            groups = [CustomGroup(name=group.name) for group in groups_data]
+            for group in groups:
+                group.save()
+
+            codenames = {code for group in groups_data for code in group.permissions}
+            permissions = ids_by(Permission.objects, "codename", codenames)
+            through = CustomGroup.permissions.through
+            through.objects.bulk_create(
+                through(group_id=group.pk, permission_id=permission_id)
+                for group, group_data in zip(groups, groups_data)
+                for codename in set(group_data.permissions)
+                for permission_id in permissions[codename]
+            )
+            bump_model_version(CustomGroup)
+            stage.rows = len(groups)
         self.stdout.write("Groups filled successfully!")
-        self.stdout.write("Filling users...")
-
-        users_root = ET.parse("xml/Users.xml").getroot()
-        users_data = list(map(parse_user_element, users_root.findall("User")))
-
-        if any(user.email == "" for user in users_data):
-            raise ValueError("You didn't specify user email.")
-
-        if any(user.password == "" for user in users_data):
-            raise ValueError("You didn't specify user password.")
 
-        users = [
-            CustomUser(
-                email=user.email, first_name=user.first_name, last_name=user.last_name
+    def fill_users(self, users_data: list[UserData], jobs: int, profile: ImportProfile):
+        self.stdout.write("Filling users...")
+        with profile.stage("Passwords") as stage:
+            passwords = hash_passwords([user.password for user in users_data], jobs)
+            stage.rows = len(passwords)
+
+        with profile.stage("Users") as stage:
+            users = CustomUser.objects.bulk_create(
+                CustomUser(
+                    email=user.email,
+                    first_name=user.first_name,
+                    last_name=user.last_name,
+                    password=password,
+                )
+                for user, password in zip(users_data, passwords)
             )
-            for user in users_data
-        ]
-        for i, user_data in enumerate(users_data):
-            users[i].set_password(user_data.password)
-
-        users = CustomUser.objects.bulk_create(users)
-
-        for i, user_data in enumerate(users_data):
-            users[i].save()
-            if user_data.filials:
-                filials = FilialAgency.objects.filter(filial_agency__in=user_data.filials)
-                users[i].filials.set(filials)
+            # bulk_create не надсилає сигналів, тому історію та версії пишемо вручну
+            CustomUser.history.bulk_history_create(users)
 
-            if user_data.groups:
-                groups = CustomGroup.objects.filter(name__in=user_data.groups)
-                users[i].groups.set(groups)
-
-            for phone_number in user_data.phone_numbers:
-                users[i].phone_numbers.create(number=phone_number)
+            filials = ids_by(
+                FilialAgency.objects,
+                "filial_agency",
+                {filial for user in users_data for filial in user.filials},
+            )
+            groups = ids_by(
+                CustomGroup.objects,
+                "name",
+                {group for user in users_data for group in user.groups},
+            )
+            filials_through = CustomUser.filials.through
+            filials_through.objects.bulk_create(
+                filials_through(customuser_id=user.pk, filialagency_id=filial_id)
+                for user, user_data in zip(users, users_data)
+                for name in set(user_data.filials)
+                for filial_id in filials[name]
+            )
+            groups_through = CustomUser.groups.through
+            groups_through.objects.bulk_create(
+                groups_through(customuser_id=user.pk, group_id=group_id)
+                for user, user_data in zip(users, users_data)
+                for name in set(user_data.groups)
+                for group_id in groups[name]
+            )
+            PhoneNumber.objects.bulk_create(
+                PhoneNumber(user=user, number=number)
+                for user, user_data in zip(users, users_data)
+                for number in user_data.phone_numbers
+            )
+            bump_model_version(CustomUser)
+            bump_model_version(PhoneNumber)
+            stage.rows = len(users)
 
-        self.stdout.write(self.style.SUCCESS("Groups and users filled successfully!"))
+    def write_profile(self, profile: ImportProfile) -> None:
+        if profile.enabled:
+            self.stdout.write("\n".join(profile.lines()))
@@ -1,7 +1,10 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser, Group
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from simple_history.models import HistoricalRecords
 
@@ -105,3 +108,177 @@ class CustomGroup(Group, BaseModel):
         verbose_name = "Group"
         verbose_name_plural = "Groups"
         default_permissions = ("add", "change", "view")
+
+
+class BaseHistoryChange(models.Model):
+    """Зміна одного поля обʼєкта з історією (simple_history)"""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    history_id = models.PositiveIntegerField()  # id запису історії
+    field = models.CharField(max_length=100)
+    old_value = models.TextField(null=True, blank=True)
+    new_value = models.TextField(null=True, blank=True)
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    date = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+        default_permissions = ()
+
+    @property
+    def model_name(self) -> str:
+        return ContentType.objects.get_for_id(self.content_type_id).model
+
+    @property
+    def verbose_field(self) -> str:
+        model = ContentType.objects.get_for_id(self.content_type_id).model_class()
+        return model._meta.get_field(self.field).verbose_name
+
+    @classmethod
+    def for_object(cls, obj) -> models.QuerySet:
+        """Зміни обʼєкта <obj> від нових до старих"""
+        return (
+            cls.objects.filter(
+                content_type=ContentType.objects.get_for_model(type(obj)),
+                object_id=obj.pk,
+            )
+            .select_related("user")
+            .order_by("-date", "-id")
+        )
+
+
+class HistoryChange(BaseHistoryChange):
+    """
+    Зміни полів записуються разом із записом історії (див. accounts.signals),
+    тому сторінки історії та звіт змін лише читають їх за індексами.
+    Старі зміни переносяться в ArchivedHistoryChange (див. accounts.history_archive).
+    """
+
+    # поля, значення яких не копіюються в таблицю змін
+    EXCLUDED_FIELDS = ("password", "import_hash")
+
+    class Meta(BaseHistoryChange.Meta):
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "-date"]),
+            models.Index(fields=["content_type", "-date", "-id"]),
+            models.Index(fields=["-date", "-id"]),
+            models.Index(fields=["user", "-date"]),
+        ]
+
+    @staticmethod
+    def value_to_str(value) -> str | None:
+        return None if value is None else str(value)
+
+    @classmethod
+    def from_records(cls, pairs) -> list["HistoryChange"]:
+        """
+        Повертає (не зберігаючи) зміни полів для пар (попередній запис, запис) історії
+        однієї моделі. Повʼязані обʼєкти змінених зовнішніх ключів завантажуються
+        одним запитом на модель.
+        """
+        changes = []
+        related_ids = {}
+        for prev_record, record in pairs:
+            model = record.instance_type
+            content_type = ContentType.objects.get_for_model(model)
+            object_id = getattr(record, model._meta.pk.attname)
+            for field in record.tracked_fields:
+                if field.name in cls.EXCLUDED_FIELDS:
+                    continue
+                old_value = getattr(prev_record, field.attname)
+                new_value = getattr(record, field.attname)
+                if old_value == new_value:
+                    continue
+                if field.is_relation:
+                    related_ids.setdefault(field.related_model, set()).update(
+                        (old_value, new_value)
+                    )
+                changes.append(
+                    (
+                        field,
+                        cls(
+                            content_type=content_type,
+                            object_id=object_id,
+                            history_id=record.history_id,
+                            field=field.name,
+                            old_value=old_value,
+                            new_value=new_value,
+                            user_id=record.history_user_id,
+                            date=record.history_date,
+                        ),
+                    )
+                )
+
+        # значення зовнішніх ключів зберігаємо як назви повʼязаних обʼєктів
+        related_objects = {
+            model: model._base_manager.in_bulk(ids - {None})
+            for model, ids in related_ids.items()
+        }
+        for field, change in changes:
+            if field.is_relation:
+                objects = related_objects[field.related_model]
+                change.old_value = objects.get(change.old_value, change.old_value)
+                change.new_value = objects.get(change.new_value, change.new_value)
+            change.old_value = cls.value_to_str(change.old_value)
+            change.new_value = cls.value_to_str(change.new_value)
+        return [change for _, change in changes]
+
+    @classmethod
+    def record(cls, history_instance) -> None:
+        """Зберігає зміни полів, внесені записом історії <history_instance>"""
+        prev_record = history_instance.prev_record
+        if prev_record is not None:
+            cls.objects.bulk_create(cls.from_records([(prev_record, history_instance)]))
+
+    @classmethod
+    def with_archive(cls, obj) -> "HistoryWithArchive":
+        """Зміни обʼєкта <obj> від нових до старих разом з архівними"""
+        return HistoryWithArchive(
+            cls.for_object(obj), ArchivedHistoryChange.for_object(obj)
+        )
+
+
+class ArchivedHistoryChange(BaseHistoryChange):
+    """Зміни полів, старші за термін зберігання історії"""
+
+    class Meta(BaseHistoryChange.Meta):
+        indexes = [models.Index(fields=["content_type", "object_id", "-date"])]
+
+
+class HistoryWithArchive:
+    """
+    Зміни з основної таблиці, а за ними архівні (для Paginator).
+    В архів переносяться зміни, старші за всі зміни в основній таблиці,
+    тому архівна таблиця читається лише для зрізів, які виходять за межі основної.
+    """
+
+    def __init__(self, changes: models.QuerySet, archived: models.QuerySet):
+        self.changes = changes
+        self.archived = archived
+
+    @cached_property
+    def changes_count(self) -> int:
+        return self.changes.count()
+
+    def count(self) -> int:
+        return self.changes_count + self.archived.count()
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        yield from self.changes
+        yield from self.archived
+
+    def __getitem__(self, index: slice) -> list[BaseHistoryChange]:
+        start, stop = index.start or 0, index.stop
+        count = self.changes_count
+        items = list(self.changes[start:stop]) if start < count else []
+        if stop is None or stop > count:
+            archived_stop = None if stop is None else stop - count
+            items += self.archived[max(start - count, 0):archived_stop]
+        return items
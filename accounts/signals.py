@@ -0,0 +1,4 @@
+def record_history_changes(sender, history_instance, **kwargs):
+    from .models import HistoryChange
+
+    HistoryChange.record(history_instance)
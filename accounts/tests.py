@@ -1,9 +1,33 @@
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse_lazy
+from django.utils import timezone
 
-from accounts.models import CustomUser
+from accounts import history_archive
+from accounts.management.commands import users_fill_db
+from accounts.models import (
+    ArchivedHistoryChange,
+    CustomGroup,
+    CustomUser,
+    HistoryChange,
+)
+from handbooks.models import (
+    District,
+    FilialAgency,
+    Locality,
+    LocalityDistrict,
+    Region,
+)
 
 
 class AccountsTest(TestCase):
@@ -53,3 +77,223 @@ class AccountsTest(TestCase):
             reverse_lazy("accounts:profile", kwargs={"lang": "en"})
         )
         self.assertEqual(response.status_code, 200)
+
+
+class HistoryChangeTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.user.first_name = "First"
+        self.user.save()
+        self.user.first_name = "Second"
+        self.user.set_password("newpassword")
+        self.user.save()
+
+    def values(self):
+        return list(
+            HistoryChange.for_object(self.user).values_list(
+                "history_id", "field", "old_value", "new_value"
+            )
+        )
+
+    def test_backfill(self):
+        expected = self.values()
+        self.assertEqual(
+            [(field, old, new) for _, field, old, new in expected],
+            [("first_name", "First", "Second"), ("first_name", None, "First")],
+        )
+
+        HistoryChange.objects.all().delete()
+        call_command("backfill_history_changes", batch_size=1, stdout=StringIO())
+        self.assertEqual(self.values(), expected)
+
+
+class HistoryArchiveTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.user.first_name = "First"
+        self.user.save()
+        self.user.first_name = "Second"
+        self.user.save()
+
+        # перші два записи історії та зміна першого збереження - дуже старі
+        self.old_date = timezone.now() - datetime.timedelta(days=800)
+        records = self.user.history.order_by("history_id")
+        self.old_ids = [record.history_id for record in records[:2]]
+        CustomUser.history.filter(history_id__in=self.old_ids).update(
+            history_date=self.old_date
+        )
+        HistoryChange.objects.filter(history_id=self.old_ids[1]).update(date=self.old_date)
+
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+
+    def test_archive_history(self):
+        expected = [
+            (change.field, change.old_value, change.new_value)
+            for change in HistoryChange.with_archive(self.user)
+        ]
+
+        with override_settings(HISTORY_ARCHIVE_DIR=self.archive_dir.name):
+            call_command("archive_history", months=12, batch_size=1, stdout=StringIO())
+            month = self.old_date.date().replace(day=1)
+            archived = list(history_archive.read_records(CustomUser, month))
+
+        self.assertEqual([row["history_id"] for row in archived], self.old_ids)
+        self.assertEqual(self.user.history.count(), 1)
+        self.assertEqual(HistoryChange.objects.count(), 1)
+        self.assertEqual(ArchivedHistoryChange.objects.count(), 1)
+        self.assertEqual(
+            [
+                (change.field, change.old_value, change.new_value)
+                for change in HistoryChange.with_archive(self.user)
+            ],
+            expected,
+        )
+
+    def test_archive_rerun_after_failed_delete(self):
+        rows = list(
+            CustomUser.history.filter(history_id__in=self.old_ids)
+            .order_by("history_id").values()
+        )
+        month = self.old_date.date().replace(day=1)
+        with override_settings(HISTORY_ARCHIVE_DIR=self.archive_dir.name):
+            # частина записана, але записи не видалились - повторний запуск
+            history_archive.write_records(CustomUser, rows[:1])
+            call_command("archive_history", months=12, batch_size=2, stdout=StringIO())
+            archived = list(history_archive.read_records(CustomUser, month))
+
+        self.assertEqual([row["history_id"] for row in archived], self.old_ids)
+
+    def test_archive_read_only_past_live_changes(self):
+        with override_settings(HISTORY_ARCHIVE_DIR=self.archive_dir.name):
+            call_command("archive_history", months=12, batch_size=1, stdout=StringIO())
+
+        history = HistoryChange.with_archive(self.user)
+        with self.assertNumQueries(2):
+            # кількість змін в основній таблиці та сторінка лише з неї
+            self.assertEqual(len(history[0:1]), 1)
+        with self.assertNumQueries(2):
+            # сторінка з основної та архівної таблиць
+            self.assertEqual(len(history[0:2]), 2)
+        self.assertEqual(len(history), 2)
+
+
+USERS_XML = """<UserList>
+    <User>
+        <Email>realtor@gmail.com</Email>
+        <Password>secret</Password>
+        <FilialList><Filial>Unknown</Filial></FilialList>
+        <GroupList><Group>рієлтор</Group></GroupList>
+    </User>
+    <User>
+        <Email>realtor@gmail.com</Email>
+        <Password></Password>
+    </User>
+</UserList>"""
+
+GROUPS_XML = """<GroupList>
+    <Group>
+        <Name>рієлтор</Name>
+        <PermissionList>
+            <Permission>add_own_client</Permission>
+            <Permission>unknown_permission</Permission>
+        </PermissionList>
+    </Group>
+</GroupList>"""
+
+
+class UsersFillDbTest(TestCase):
+    def setUp(self):
+        self.xml_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.xml_dir)
+        self.write("Groups.xml", GROUPS_XML)
+        self.write("Users.xml", USERS_XML)
+        self.report = os.path.join(self.xml_dir, "report.json")
+
+    def write(self, name, content):
+        with open(os.path.join(self.xml_dir, name), "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def test_dry_run_reports_without_writing(self):
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command(
+                "users_fill_db", xml_dir=self.xml_dir, dry_run=True,
+                report=self.report, profile=True, stdout=out,
+            )
+        self.assertFalse(CustomUser.objects.exists())
+        self.assertFalse(CustomGroup.objects.exists())
+        self.assertIn("queries", out.getvalue())
+
+        with open(self.report, encoding="utf-8") as file:
+            report = json.load(file)
+        # обидва записи з однаковим email та порожній пароль
+        self.assertEqual(report["errors"], 3)
+        issues = {(issue["field"], issue["message"]) for issue in report["issues"]}
+        self.assertIn(("Email", "duplicate email"), issues)
+        self.assertIn(("Password", "missing password"), issues)
+        self.assertIn(("Filial", "unknown"), issues)
+        self.assertIn(("Permission", "unknown"), issues)
+
+        # без --dry-run файли з помилками теж не імпортуються
+        with self.assertRaises(CommandError):
+            call_command("users_fill_db", xml_dir=self.xml_dir, stdout=StringIO())
+        self.assertFalse(CustomUser.objects.exists())
+
+    def test_bulk_import(self):
+        region = Region.objects.create(region="Region")
+        district = District.objects.create(district="District", region=region)
+        locality = Locality.objects.create(locality="Locality", district=district)
+        locality_district = LocalityDistrict.objects.create(
+            district="Locality district",
+            locality=locality,
+            prefix_to_site="",
+            is_subdistrict=False,
+            new_building_district=1,
+        )
+        filial = FilialAgency.objects.create(
+            filial_agency="Центр", locality_district=locality_district
+        )
+        self.write("Users.xml", """<UserList>
+            <User>
+                <Email>first@gmail.com</Email>
+                <Password>secret</Password>
+                <FirstName>First</FirstName>
+                <FilialList><Filial>Центр</Filial></FilialList>
+                <PhoneNumberList>
+                    <PhoneNumber>0501</PhoneNumber>
+                    <PhoneNumber>0502</PhoneNumber>
+                </PhoneNumberList>
+                <GroupList><Group>рієлтор</Group></GroupList>
+            </User>
+            <User>
+                <Email>second@gmail.com</Email>
+                <Password>other</Password>
+            </User>
+        </UserList>""")
+
+        call_command("users_fill_db", xml_dir=self.xml_dir, jobs=1, stdout=StringIO())
+        group = CustomGroup.objects.get(name="рієлтор")
+        self.assertEqual(
+            list(group.permissions.values_list("codename", flat=True)), ["add_own_client"]
+        )
+        user = CustomUser.objects.get(email="first@gmail.com")
+        self.assertTrue(user.check_password("secret"))
+        self.assertEqual(user.first_name, "First")
+        self.assertEqual(list(user.filials.all()), [filial])
+        self.assertEqual(list(user.groups.all()), [group.group_ptr])
+        self.assertEqual(
+            sorted(user.phone_numbers.values_list("number", flat=True)), ["0501", "0502"]
+        )
+        self.assertEqual(user.history.count(), 1)
+        second = CustomUser.objects.get(email="second@gmail.com")
+        self.assertTrue(second.check_password("other"))
+
+    def test_hash_passwords_in_processes(self):
+        hashes = users_fill_db.hash_passwords(["first", "second", "third"], jobs=2)
+        self.assertEqual(len(set(hashes)), 3)
+        self.assertTrue(check_password("second", hashes[1]))
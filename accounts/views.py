@@ -14,9 +14,10 @@ from accounts.services import (
     user_can_view_user_history,
 )
 from handbooks.forms import PhoneNumberFormSet
+from images.services import real_estate_cards
 from objects.choices import RealEstateStatus
 from objects.models import Apartment, Commerce, House, Land
-from utils.mixins.mixins import CustomLoginRequiredMixin
+from utils.mixins.mixins import CachedCountPaginateMixin, CustomLoginRequiredMixin
 from utils.utils import get_office_context
 from utils.views import (
     CustomCreateView,
@@ -109,16 +110,12 @@ class ProfileView(CustomLoginRequiredMixin, UpdateView):
             }
 
             objects = chain(
-                Apartment.objects.filter(**qs_filter),
-                Commerce.objects.filter(**qs_filter),
-                House.objects.filter(**qs_filter),
-                Land.objects.filter(**qs_filter),
+                Apartment.objects.filter(**qs_filter).select_related("cover_image"),
+                Commerce.objects.filter(**qs_filter).select_related("cover_image"),
+                House.objects.filter(**qs_filter).select_related("cover_image"),
+                Land.objects.filter(**qs_filter).select_related("cover_image"),
             )
-            objects_clean = []
-            for obj in objects:
-                image = obj.images.first()
-                objects_clean.append({"image": image, "object": obj})
-            context["objects"] = objects_clean
+            context["objects"] = real_estate_cards(objects)
         return context
 
 
@@ -135,7 +132,9 @@ def users_list_redirect(request, lang):
     return render(request, "403.html", kwargs)
 
 
-class UserListView(CustomLoginRequiredMixin, PermissionRequiredMixin, ListView):
+class UserListView(
+    CustomLoginRequiredMixin, PermissionRequiredMixin, CachedCountPaginateMixin, ListView
+):
     paginate_by = 5
     permission_required = "accounts.view_customuser"
     template_name = "accounts/user_list.html"
@@ -190,7 +189,9 @@ class MyUserListView(UserListView):
         return context
 
 
-class GroupListView(CustomLoginRequiredMixin, PermissionRequiredMixin, ListView):
+class GroupListView(
+    CustomLoginRequiredMixin, PermissionRequiredMixin, CachedCountPaginateMixin, ListView
+):
     queryset = CustomGroup.objects.all()
     permission_required = "accounts.view_group"
     template_name = "accounts/group_list.html"
@@ -28,3 +28,19 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ImportedModel(models.Model):
+    """
+    Обʼєкт, який імпортується з xml вивантажень основної системи (fill_db).
+    external_id - ID обʼєкта в основній системі, import_hash - хеш даних
+    останнього імпорту, за яким незмінені рядки пропускаються.
+    """
+
+    external_id = models.CharField(
+        max_length=50, unique=True, null=True, blank=True, editable=False
+    )
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
@@ -112,6 +112,25 @@ STATIC_URL = "static/"
 MEDIA_URL = "media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Кеш спільний для всіх процесів сервера та фонових пулів: версії моделей
+# (utils.model_versions), сторінки каталогу та лічильники мають бути однакові
+# в усіх процесах. Файловий кеш працює і тоді, коли база даних недоступна.
+# Кеш у памʼяті процесу (LocMemCache) без DEBUG не дозволяється (utils.E001).
+# Стандартні 300 записів закінчуються одразу (версія на кожен обʼєкт, сторінки
+# каталогу, лічильники), після чого кожен запис видаляв би третину кешу разом
+# з версіями. Тому ліміт розрахований на весь каталог, а при переповненні
+# видаляється лише десята частина записів.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache"),
+        "OPTIONS": {
+            "MAX_ENTRIES": 200_000,
+            "CULL_FREQUENCY": 10,
+        },
+    }
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
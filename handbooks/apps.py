@@ -6,6 +6,32 @@ class HandbooksConfig(AppConfig):
     name = "handbooks"
 
     def ready(self):
+        from django.core import checks
         from django.db.models.signals import post_migrate
+        from accounts.models import CustomGroup, CustomUser
+        from images.models import RealEstateImage
+        from objects.models import Apartment, Commerce, House, Land
+        from utils.model_versions import check_shared_cache, track_model_versions
+        from .models import (
+            Client,
+            District,
+            FilialAgency,
+            FilialReport,
+            Handbook,
+            Locality,
+            LocalityDistrict,
+            PhoneNumber,
+            Region,
+            Street,
+        )
         from .signals import remove_history_permissions
         post_migrate.connect(remove_history_permissions, sender=self)
+        # версії для інвалідації кешу: моделі кешованих лічильників списків
+        # (utils.count_cache) та сторінок каталогу (objects.mixins.CatalogCacheMixin)
+        track_model_versions(
+            CustomUser, CustomGroup, PhoneNumber,
+            Region, District, Locality, LocalityDistrict, Street,
+            Handbook, FilialAgency, FilialReport, Client,
+            Apartment, Commerce, House, Land, RealEstateImage,
+        )
+        checks.register(check_shared_cache, checks.Tags.caches)
@@ -1,5 +1,6 @@
 from django import forms
 from django.core.validators import RegexValidator
+from django.db import transaction
 from django.forms import inlineformset_factory
 from django.utils.translation import gettext_lazy as _
 
@@ -288,6 +289,12 @@ class ClientForm(forms.ModelForm):
                 locality_district__in=self.instance.locality_district.all()
             )
 
+    def save(self, commit=True):
+        # клієнт і його ManyToMany в одній транзакції, тоді індекс критеріїв
+        # перебудовується один раз після коміту (див. objects.signals)
+        with transaction.atomic():
+            return super().save(commit)
+
     class Meta:
         model = Client
         exclude = ("date_of_add", "on_delete")
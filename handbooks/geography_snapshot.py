@@ -0,0 +1,117 @@
+"""
+Знімок географії (області, райони, населені пункти, їх райони та вулиці)
+для швидкого розгортання баз без повторного імпорту xml (fill_db).
+Знімок - JSON у gzip, дані кожної моделі зберігаються по колонках:
+{"format": ..., "version": 1, "models": [{"model": "handbooks.region",
+"fields": [...], "columns": {"field": [...]}}, ...]}.
+Рядки впорядковані за pk, а gzip не містить часу створення, тому знімок
+однієї й тієї ж бази завжди однаковий. pk та external_id зберігаються,
+тому після завантаження можна продовжити імпорт через fill_db --sync.
+"""
+
+import gzip
+import json
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from handbooks.models import District, Locality, LocalityDistrict, Region, Street
+from utils.model_versions import bump_model_version
+
+FORMAT = "estate_agency.geography"
+VERSION = 1
+
+# порядок залежностей: кожна модель посилається лише на попередні
+MODELS = [Region, District, Locality, LocalityDistrict, Street]
+
+
+def model_snapshot(model) -> dict:
+    fields = [field.attname for field in model._meta.concrete_fields]
+    rows = model._base_manager.order_by("pk").values_list(*fields)
+    columns = {name: [] for name in fields}
+    for row in rows.iterator():
+        for name, value in zip(fields, row):
+            columns[name].append(value)
+    return {"model": model._meta.label_lower, "fields": fields, "columns": columns}
+
+
+def export_snapshot(path: str) -> dict[str, int]:
+    """Записує знімок географії у файл <path>, повертає кількість рядків моделей"""
+    snapshot = {
+        "format": FORMAT,
+        "version": VERSION,
+        "models": [model_snapshot(model) for model in MODELS],
+    }
+    with gzip.GzipFile(path, "wb", mtime=0) as file:
+        file.write(
+            json.dumps(snapshot, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+        )
+    return {
+        data["model"]: len(data["columns"][data["fields"][0]])
+        for data in snapshot["models"]
+    }
+
+
+def read_snapshot(path: str) -> dict:
+    with gzip.open(path, "rb") as file:
+        snapshot = json.loads(file.read())
+    if snapshot.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a geography snapshot")
+    if snapshot.get("version") != VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {snapshot.get('version')}, expected {VERSION}"
+        )
+    labels = {item["model"] for item in snapshot["models"]}
+    for model in MODELS:
+        if model._meta.label_lower not in labels:
+            raise ValueError(f"{model._meta.label_lower} is missing in {path}")
+    return snapshot
+
+
+def model_objects(model, data: dict) -> list:
+    """Обʼєкти моделі з колонок знімка, поля, яких немає в моделі, пропускаються"""
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    names = [name for name in data["fields"] if name in fields]
+    columns = [data["columns"][name] for name in names]
+    return [
+        model(
+            **{
+                name: fields[name].to_python(value) if value is not None else None
+                for name, value in zip(names, row)
+            }
+        )
+        for row in zip(*columns)
+    ]
+
+
+def load_snapshot(path: str, batch_size: int, replace: bool = False) -> dict[str, int]:
+    """
+    Завантажує знімок <path> в одній транзакції через bulk_create.
+    Якщо в базі вже є географія, потрібен <replace>: наявні дані видаляються
+    разом з усім, що на них посилається.
+    """
+    snapshot = read_snapshot(path)
+    data = {item["model"]: item for item in snapshot["models"]}
+    counts = {}
+    with transaction.atomic():
+        if any(model._base_manager.exists() for model in MODELS):
+            if not replace:
+                raise ValueError("Geography is not empty, use --replace to overwrite it")
+            for model in reversed(MODELS):
+                model._base_manager.all().delete()
+
+        for model in MODELS:
+            objs = model_objects(model, data[model._meta.label_lower])
+            model._base_manager.bulk_create(objs, batch_size=batch_size)
+            counts[model._meta.label_lower] = len(objs)
+
+        # pk записані явно, тому послідовності (PostgreSQL) треба оновити вручну
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), MODELS):
+                cursor.execute(sql)
+
+    # bulk_create не надсилає post_save, тому версію змінюємо вручну
+    for model in MODELS:
+        bump_model_version(model)
+    return counts
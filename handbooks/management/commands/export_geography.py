@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from handbooks.geography_snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Зберігає географію з бази у знімок для load_geography"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="geography.json.gz", help="Файл знімка",
+        )
+
+    def handle(self, *args, **options):
+        counts = export_snapshot(options["path"])
+        for model, rows in counts.items():
+            self.stdout.write(f"  {model}: {rows}")
+        self.stdout.write(self.style.SUCCESS(f"Snapshot saved to {options['path']}"))
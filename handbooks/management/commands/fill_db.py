@@ -1,13 +1,17 @@
-import xml.etree.ElementTree as ET
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 from django.contrib.auth.models import Permission
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils.timezone import get_current_timezone, make_aware
 
 from accounts.models import CustomUser
-from handbooks.choices import CenterType, CityType, NewBuildingDistrictType
-from handbooks.management.commands.utils import get_date, handbook_fill
+from handbooks.choices import CenterType, CityType, HandbookType, NewBuildingDistrictType
+from handbooks.management.commands.utils import ModelSync, Resolver, handbook_ids
 from handbooks.models import (
     Client,
     District,
@@ -18,9 +22,26 @@ from handbooks.models import (
     Region,
     Street,
 )
-from objects.choices import RealEstateStatus
+from handbooks.xml_records import (
+    Record,
+    RecordStream,
+    parse_bool,
+    parse_date,
+    read_handbook_records,
+    read_records,
+)
+from objects.choices import RealEstateDocument, RealEstateStatus
 # from objects.choices import RoomType
-from objects.models import Apartment, Commerce, House
+from objects import full_text_search
+from objects.models import (
+    Apartment,
+    ClientMatch,
+    Commerce,
+    House,
+    RealEstateSearchIndex,
+)
+from utils.import_profile import ImportProfile
+from utils.import_report import ImportReport
 
 LOCALITY_TYPE_MAP = {
     "Село": CityType.VILLAGE,
@@ -43,6 +64,13 @@ STATUS_MAP = {
 }
 
 
+# фрагмент назви документа в основній системі -> документ
+DOCUMENT_MAP = {
+    "Свид. на право собственности": RealEstateDocument.CO,
+    "Договор дарения": RealEstateDocument.GIFT,
+}
+
+
 # ROOMS_TYPE_MAP = {
 #     "Смежные": RoomType.ADJACENT,
 #     "Раздельные": RoomType.SEPARATE,
@@ -50,363 +78,635 @@ STATUS_MAP = {
 #     "1 комната ": RoomType.ROOM,
 # }
 
+HANDBOOK_SECTIONS = [
+    "withdrawal_reason",
+    "conditions",
+    "material",
+    "separation",
+    "agency",
+    "agency_sales",
+    "new_building_name",
+    "stair",
+    "heating",
+    "layout",
+    "house_type",
+]
+
+# назва джерела -> (файл, тег запису); файл довідників читається за розділами
+SOURCES = {
+    "handbooks": ("Catalogs16_02.xml", None),
+    "regions": ("District16_02.xml", "District"),
+    "districts": ("Region16_02.xml", "Region"),
+    "localities": ("Towns16_02.xml", "Town"),
+    "locality_districts": ("TownRegions16_02.xml", "TownRegion"),
+    "streets": ("Streets16_02.xml", "Street"),
+    "filials": ("Branches16_02.xml", "Branch"),
+    "objects": ("Catalog_22_02.xml", "Object"),
+}
 
-class Command(BaseCommand):
-    help = "Парсит XML и загружает данные в базу"
+# найбільші джерела не читаються в списки, а перечитуються з файлу при кожному проході
+STREAMED_SOURCES = ("streets", "objects")
+
+
+# джерело, поле з ID запису іншого джерела, джерело, на яке посилається поле
+REFERENCES = [
+    ("districts", "DistrictId", "regions"),
+    ("localities", "RegionId", "districts"),
+    ("locality_districts", "TownId", "localities"),
+    ("streets", "TownId", "localities"),
+    ("streets", "TownRegionId", "locality_districts"),
+    ("filials", "TownRegionId", "locality_districts"),
+]
+
+# поле обʼєкта нерухомості -> тип довідника, назву з якого містить поле
+OBJECT_HANDBOOKS = {
+    "condition": HandbookType.CONDITION,
+    "material": HandbookType.MATERIAL,
+    "house_type": HandbookType.HOUSE_TYPE,
+    "layout": HandbookType.LAYOUT,
+    "stair": HandbookType.STAIR,
+}
 
-    def handle(self, *args, **kwargs):
-        Permission.objects.filter(codename__icontains="history").delete()
-        Permission.objects.filter(codename__icontains="historical").delete()
-        Permission.objects.filter(codename__icontains="session").delete()
-        Permission.objects.filter(codename__icontains="log").delete()
-        Permission.objects.filter(codename__icontains="permission").delete()
-        Permission.objects.filter(codename__icontains="contenttype").delete()
-        Permission.objects.filter(codename__icontains="delete").delete()
 
-        Client.objects.all().delete()
-        client = {
-            "date_of_add": datetime.now(),
-            "email": "client@gmail.com",
-            "first_name": "Client",
-            "last_name": "Test Client",
-            "phone": "050",
-            "messenger": "viber",
-            "realtor": CustomUser.objects.all().first(),
+def source_task(xml_dir: str, name: str) -> tuple:
+    """Функція читання та її аргументи для джерела <name>"""
+    file_name, tag = SOURCES[name]
+    path = os.path.join(xml_dir, file_name)
+    if tag is None:
+        return read_handbook_records, path, HANDBOOK_SECTIONS
+    return read_records, path, tag
+
+
+def read_sources(xml_dir: str, jobs: int) -> dict[str, Iterable[Record]]:
+    """
+    Читає невеликі xml файли в списки записів: паралельно в <jobs> процесах
+    або послідовно, якщо <jobs> дорівнює 1. Процеси виконують лише функції
+    handbooks.xml_records, які не залежать від Django.
+    Джерела STREAMED_SOURCES повертаються як RecordStream: перевірка та імпорт
+    читають їх записи з файлу по одному, тому памʼять не зростає з їх розміром.
+    """
+    streams = {
+        name: RecordStream(os.path.join(xml_dir, SOURCES[name][0]), SOURCES[name][1])
+        for name in STREAMED_SOURCES
+    }
+    tasks = {
+        name: source_task(xml_dir, name)
+        for name in SOURCES if name not in STREAMED_SOURCES
+    }
+    if jobs <= 1:
+        records = {name: read(*args) for name, (read, *args) in tasks.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            futures = {name: executor.submit(*task) for name, task in tasks.items()}
+            records = {name: future.result() for name, future in futures.items()}
+    records.update(streams)
+    return {name: records[name] for name in SOURCES}
+
+
+def first_id(queryset) -> int | None:
+    return queryset.order_by("id").values_list("id", flat=True).first()
+
+
+def document_type(document: str | None) -> int | None:
+    for name, document_type in DOCUMENT_MAP.items():
+        if document and name in document:
+            return document_type
+    return None
+
+
+def to_int(value: str | None, default=None) -> int | None:
+    return int(float(value)) if value is not None else default
+
+
+def build_handbook(record: Record) -> dict:
+    return {
+        "external_id": record["ID"],
+        "type": int(record["CatalogId"]),
+        "handbook": record["Name"].strip(),
+    }
+
+
+def build_region(record: Record) -> dict:
+    return {"external_id": record["ID"], "region": record["Name"]}
+
+
+def build_district(regions: dict[str, int]):
+    def build(record: Record) -> dict:
+        return {
+            "external_id": record["ID"],
+            "district": record["Name"],
+            "region_id": regions[record["DistrictId"]],
         }
-        client = Client.objects.create(**client)
+    return build
 
-        self.stdout.write("Filling Handbooks")
-        Handbook.objects.all().delete()
-
-        handbook_tree = ET.parse("xml/Catalogs16_02.xml")
-        handbook_root = handbook_tree.getroot()
-
-        handbook_fill(handbook_root, "withdrawal_reason")
-        handbook_fill(handbook_root, "conditions")
-        handbook_fill(handbook_root, "material")
-        handbook_fill(handbook_root, "separation")
-        handbook_fill(handbook_root, "agency")
-        handbook_fill(handbook_root, "agency_sales")
-        handbook_fill(handbook_root, "new_building_name")
-        handbook_fill(handbook_root, "stair")
-        handbook_fill(handbook_root, "heating")
-        handbook_fill(handbook_root, "layout")
-        handbook_fill(handbook_root, "house_type")
-
-        Handbook.objects.create(type=12, handbook="Complex")
-
-        self.stdout.write("Filling Region")
-        Region.objects.all().delete()
-        region_tree = ET.parse("xml/District16_02.xml")
-        region_root = region_tree.getroot()
-        regions = dict()
-        for region in region_root.find("DistrictList"):
-            region_name = region.find("Name").text
-
-            r = Region.objects.create(
-                region=region_name,
-            )
 
-            regions.update(
-                {
-                    region.find("ID").text: r,
-                }
-            )
+def build_locality(districts: dict[str, int]):
+    def build(record: Record) -> dict:
+        return {
+            "external_id": record["ID"],
+            "locality": record["Name"],
+            "district_id": districts[record["RegionId"]],
+            "city_type": LOCALITY_TYPE_MAP.get(record.get("TownType")),
+            "center_type": CENTER_TYPE_MAP.get(record.get("CenterType")),
+        }
+    return build
+
+
+def build_locality_district(localities: dict[str, int]):
+    def build(record: Record) -> dict:
+        hot_offers_limit = record.get("HotOffersLimit")
+        return {
+            "external_id": record["ID"],
+            "district": record["Name"],
+            "locality_id": localities[record["TownId"]],
+            "description": None,
+            "group_on_site": None,
+            "hot_deals_limit": float(hot_offers_limit) if hot_offers_limit else 0,
+            "prefix_to_site": "",
+            "is_subdistrict": False,
+            "new_building_district": NewBuildingDistrictType.NONE,
+        }
+    return build
 
-        self.stdout.write("Filling Districts")
-        District.objects.all().delete()
-        district_tree = ET.parse("xml/Region16_02.xml")
-        district_root = district_tree.getroot()
-        districts = dict()
-        for district in district_root.find("RegionList"):
-            district_name = district.find("Name").text
 
-            d = District.objects.create(
-                district=district_name, region=regions[district.find("DistrictId").text]
+def build_street(localities: dict[str, int], locality_districts: dict[str, int]):
+    def build(record: Record) -> dict:
+        return {
+            "external_id": record["ID"],
+            "street": record["Name"],
+            "locality_id": localities[record["TownId"]],
+            "locality_district_id": locality_districts[record["TownRegionId"]],
+        }
+    return build
+
+
+def build_filial(locality_districts: dict[str, int]):
+    def build(record: Record) -> dict:
+        open_date = parse_date(record.get("DateOpen"), "%d.%m.%Y %H:%M:%S")
+        return {
+            "external_id": record["ID"],
+            "filial_agency": record["Name"],
+            "locality_district_id": locality_districts[record["TownRegionId"]],
+            "phone": record.get("Phone"),
+            "email": record.get("eMail"),
+            "address": record.get("Address"),
+            "type": record.get("BranchType"),
+            "new_build_area": record.get("NewBuildArea"),
+            "open_date": make_aware(open_date, get_current_timezone()),
+        }
+    return build
+
+
+def real_estate_data(record: Record, resolvers: dict[str, Resolver], defaults: dict):
+    """
+    Повертає модель та значення полів обʼєкта нерухомості з запису каталогу
+    або None, якщо обʼєкт не можна імпортувати (невідома адреса чи тип).
+    """
+    model = {"квартира": Apartment, "дом": House, "комерция": Commerce}.get(
+        record.get("object_type")
+    )
+    locality = resolvers["locality"](record.get("locality"))
+    street = resolvers["street"](record.get("street"))
+    if model is None or locality is None or street is None:
+        return None
+
+    data = {
+        "external_id": record["ID"],
+        "deposit_date": parse_date(record.get("deposit_date"), "%d.%m.%Y"),
+        "exclusive": parse_bool(record.get("exclusive")),
+        "locality_id": locality,
+        "street_id": street,
+        "house": record.get("house"),
+        "realtor": defaults["realtor"],
+        "condition_id": resolvers["condition"](record.get("condition")),
+        "material_id": resolvers["material"](record.get("material")),
+        "agency_id": defaults["agency"],
+        # у вивантаженні немає філії обʼєкта
+        "filial_id": defaults["filial"],
+        "house_type_id": resolvers["house_type"](record.get("house_type")),
+        "layout_id": resolvers["layout"](record.get("layout")),
+        "stair_id": resolvers["stair"](record.get("stair")),
+        "owner": defaults["owner"],
+        "parking": parse_bool(record.get("parking")),
+        "generator": parse_bool(record.get("generator")),
+        "e_home": parse_bool(record.get("e_home")),
+        "price": int(record["price"]),
+        "square": to_int(record["square"]),
+        "kitchen_square": to_int(record["kitchen_square"]),
+        "height": float(record["height"]),
+        "floor": int(record["floor"]),
+        "storeys_number": int(record["storeys_number"]),
+        "status": STATUS_MAP[record["status"]],
+        "document": document_type(record.get("document")),
+        "sale_terms": record.get("sale_terms"),
+        "comment": record.get("comment"),
+    }
+    # без дати новий обʼєкт отримує поточну (default), а існуючий зберігає свою
+    creation_date = parse_date(record.get("creation_date"), "%d.%m.%Y")
+    if creation_date:
+        data["creation_date"] = creation_date
+
+    if model is Apartment:
+        data.update(
+            {
+                "apartment": record.get("apartment"),
+                "living_square": to_int(record["living_square"]),
+                "balcony": parse_bool(record.get("balcony")),
+                "balcony_number": int(record["balcony_number"]),
+                "complex_id": defaults["complex"],
+            }
+        )
+    elif model is House:
+        data.update(
+            {
+                "housing": record.get("housing"),
+                "useful_square": to_int(record.get("useful_square")),
+                "land_square": to_int(record.get("land_square")),
+                "rooms_number": to_int(record.get("rooms_number")),
+                "terrace": parse_bool(record.get("terrace")),
+                "facade": parse_bool(record.get("facade")),
+                "own_parking": parse_bool(record.get("own_parking")),
+            }
+        )
+    else:
+        data.update(
+            {
+                "premises": record.get("premises") or "",
+                "useful_square": to_int(record.get("useful_square")),
+                "balcony": parse_bool(record.get("balcony")),
+                "balcony_number": to_int(record.get("balcony_number"), 0),
+                "ground_floor": parse_bool(record.get("ground_floor")),
+                "facade": parse_bool(record.get("balcony")),
+                "own_parking": parse_bool(record.get("own_parking")),
+                "own_courtyard": parse_bool(record.get("own_courtyard")),
+                "separate_building": parse_bool(record.get("separate_building")),
+                "complex_id": defaults["complex"],
+            }
+        )
+    return model, data
+
+
+def check_build(report: ImportReport, source: str, record: Record, build) -> None:
+    """Додає до звіту помилку, якщо з запису неможливо отримати дані рядка"""
+    try:
+        build(record)
+    except KeyError as error:
+        report.error(source, record.get("ID"), error.args[0], None, "missing field")
+    except (AttributeError, TypeError, ValueError) as error:
+        report.error(source, record.get("ID"), "", None, str(error))
+
+
+def check_id(report: ImportReport, source: str, record: Record, ids: dict) -> None:
+    """Запамʼятовує ID запису, помилка у звіті, якщо ID немає або він повторюється"""
+    record_id = record.get("ID")
+    key = record_id
+    if source == "handbooks":
+        key = (record.get("CatalogId"), record_id)
+    if not record_id:
+        report.error(source, None, "ID", record_id, "missing ID")
+    elif key in ids:
+        report.error(source, record_id, "ID", record_id, "duplicate ID")
+    ids[key] = record_id
+
+
+def validate_sources(sources: dict[str, Iterable[Record]]) -> ImportReport:
+    """
+    Перевіряє записи всіх джерел без звернень до бази: ID записів, посилання
+    між файлами, назви довідників та значення полів обʼєктів нерухомості.
+    Помилки - записи, через які імпорт зупинився б з винятком, попередження -
+    обʼєкти, які будуть пропущені, та назви довідників, яких немає у файлі.
+    Кожне джерело проходиться один раз у порядку залежностей, тому в памʼяті
+    тримаються лише ID записів, на які посилаються наступні джерела.
+    """
+    report = ImportReport()
+    # ID з файлу замість pk, щоб перевірити записи тими ж функціями, що й імпорт
+    ids = {name: {} for name in sources}
+    references = {}
+    for source, field, target in REFERENCES:
+        references.setdefault(source, []).append((field, target))
+    handbook_names = {handbook_type: {} for handbook_type in OBJECT_HANDBOOKS.values()}
+
+    builders = {
+        "handbooks": build_handbook,
+        "regions": build_region,
+        "districts": build_district(ids["regions"]),
+        "localities": build_locality(ids["districts"]),
+        "locality_districts": build_locality_district(ids["localities"]),
+        "streets": build_street(ids["localities"], ids["locality_districts"]),
+        "filials": build_filial(ids["locality_districts"]),
+    }
+    for name, build in builders.items():
+        for record in sources[name]:
+            check_id(report, name, record, ids[name])
+            valid = True
+            for field, target in references.get(name, ()):
+                value = record.get(field)
+                if value not in ids[target]:
+                    record_id = record.get("ID")
+                    report.error(name, record_id, field, value, f"unknown {target}")
+                    valid = False
+            if valid:
+                check_build(report, name, record, build)
+            if name == "handbooks":
+                names = handbook_names.get(int(record.get("CatalogId") or 0))
+                if names is not None and record.get("Name"):
+                    names[record["Name"].strip()] = record["Name"]
+
+    resolvers = {
+        "locality": Resolver("locality", ids["localities"]),
+        "street": Resolver("street", ids["streets"]),
+    }
+    for field, handbook_type in OBJECT_HANDBOOKS.items():
+        resolvers[field] = Resolver(field, handbook_names[handbook_type])
+    defaults = dict.fromkeys(("realtor", "agency", "complex", "filial", "owner"))
+
+    for record in sources["objects"]:
+        check_id(report, "objects", record, ids["objects"])
+        record_id = record.get("ID")
+        skipped = False
+        if record.get("object_type") not in ("квартира", "дом", "комерция"):
+            value = record.get("object_type")
+            report.warning("objects", record_id, "object_type", value, "skipped")
+            skipped = True
+        for field, target in (("locality", "localities"), ("street", "streets")):
+            value = record.get(field)
+            if (value or "").strip() not in ids[target]:
+                report.warning("objects", record_id, field, value, f"unknown {target}")
+                skipped = True
+        for field in OBJECT_HANDBOOKS:
+            value = record.get(field)
+            if value is not None and value.strip() not in resolvers[field].ids:
+                report.warning("objects", record_id, field, value, "unknown handbook")
+        if record.get("status") not in STATUS_MAP:
+            report.error("objects", record_id, "status", record.get("status"), "unknown")
+            skipped = True
+        if not skipped:
+            check_build(
+                report, "objects", record,
+                lambda record: real_estate_data(record, resolvers, defaults),
             )
+    return report
 
-            districts.update(
-                {
-                    district.find("ID").text: d,
-                }
-            )
 
-        self.stdout.write("Filling Localities")
-        Locality.objects.all().delete()
-        locality_tree = ET.parse("xml/Towns16_02.xml")
-        locality_root = locality_tree.getroot()
-        localities = dict()
-        for locality in locality_root.find("TownList"):
-            locality_name = locality.find("Name").text
-            locality_type = (
-                locality.find("TownType").text
-                if locality.find("TownType") is not None
-                else None
-            )
-            center_type = (
-                locality.find("CenterType").text
-                if locality.find("CenterType") is not None
-                else None
-            )
+def sync_search_index(model):
+    """
+    Оновлює пошукові індекси нерухомості після імпорту в обхід save():
+    однакова кількість запитів на кожну частину обʼєктів незалежно від її розміру.
+    """
+    def on_change(pks: list[int]) -> None:
+        RealEstateSearchIndex.sync_many(model, pks)
+        full_text_search.sync_many(model, pks)
+        ClientMatch.sync_many(model, pks)
+    return on_change
 
-            loc = Locality.objects.create(
-                locality=locality_name,
-                district=districts[locality.find("RegionId").text],
-                city_type=LOCALITY_TYPE_MAP.get(locality_type, None),
-                center_type=CENTER_TYPE_MAP.get(center_type, None),
-            )
 
-            localities.update(
-                {
-                    locality.find("ID").text: loc,
-                }
-            )
+class Command(BaseCommand):
+    help = "Парсит XML и загружает данные в базу"
 
-        self.stdout.write("Filling LocalityDistricts")
-        LocalityDistrict.objects.all().delete()
-        locality_district_tree = ET.parse("xml/TownRegions16_02.xml")
-        locality_district_root = locality_district_tree.getroot()
-        locality_districts = dict()
-        for district in locality_district_root.find("TownRegionsList"):
-            district_name = district.find("Name").text
-            hot_offers_limit = (
-                float(district.find("HotOffersLimit").text)
-                if district.find("HotOffersLimit") is not None
-                else 0
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = ImportProfile(enabled=False)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Кількість рядків в одному INSERT",
+        )
+        parser.add_argument(
+            "--xml-dir", default="xml", help="Каталог з xml файлами",
+        )
+        parser.add_argument(
+            "--sync", action="store_true",
+            help=(
+                "Оновити лише змінені дані за ID з основної системи замість "
+                "повного перезавантаження, відсутні в файлах дані мʼяко видаляються"
+            ),
+        )
+        parser.add_argument(
+            "--jobs", type=int, default=os.cpu_count() or 1,
+            help="Кількість процесів для читання xml файлів",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Лише перевірити файли та записати звіт, не змінюючи базу",
+        )
+        parser.add_argument(
+            "--report", default="fill_db_report.json",
+            help="Файл JSON звіту перевірки для --dry-run",
+        )
+        parser.add_argument(
+            "--profile", action="store_true",
+            help="Вивести рядки, час, кількість запитів та памʼять кожного етапу",
+        )
+
+    def import_records(
+        self, title: str, model, records: Iterable[Record], build, batch_size: int,
+        sync: bool,
+    ) -> dict[str, int]:
+        """
+        Імпортує обʼєкти моделі <model> з записів <records> в одній транзакції:
+        повністю перезавантажує їх або, якщо <sync>, оновлює лише змінені.
+        Повертає відповідність ID у файлі -> pk у базі.
+        """
+        self.stdout.write(f"Filling {title}")
+        start = time.perf_counter()
+        with self.profile.stage(title) as stage, transaction.atomic():
+            if not sync:
+                model.objects.all().delete()
+            model_sync = ModelSync(model, batch_size)
+            for record in records:
+                model_sync.add(build(record))
+            ids = model_sync.finish()
+            stage.rows = len(ids)
+        self.write_summary(model_sync, len(ids), time.perf_counter() - start)
+        return ids
+
+    def write_summary(self, model_sync: ModelSync, rows: int, elapsed: float) -> None:
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(
+            f"  {model_sync.summary()} in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        )
+
+    def import_handbooks(self, records: Iterable[Record], batch_size: int, sync: bool):
+        self.stdout.write("Filling Handbooks")
+        start = time.perf_counter()
+        with self.profile.stage("Handbooks") as stage, transaction.atomic():
+            if not sync:
+                Handbook.objects.all().delete()
+            handbooks_sync = ModelSync(
+                Handbook, batch_size, unique_fields=("type", "external_id")
             )
+            for record in records:
+                handbooks_sync.add(build_handbook(record))
+            rows = stage.rows = len(handbooks_sync.finish())
+            Handbook.objects.get_or_create(type=HandbookType.COMPLEX, handbook="Complex")
+        self.write_summary(handbooks_sync, rows, time.perf_counter() - start)
+
+    def import_geography(
+        self, sources: dict[str, Iterable[Record]], batch_size: int, sync: bool = False
+    ) -> dict[str, dict[str, int]]:
+        """
+        Імпортує області, райони, населені пункти, їх райони та вулиці.
+        Повертає відповідності ID у файлах -> pk у базі для кожної моделі.
+        """
+        regions = self.import_records(
+            "Region", Region, sources["regions"], build_region, batch_size, sync
+        )
+        districts = self.import_records(
+            "Districts", District, sources["districts"],
+            build_district(regions), batch_size, sync,
+        )
+        localities = self.import_records(
+            "Localities", Locality, sources["localities"],
+            build_locality(districts), batch_size, sync,
+        )
+        locality_districts = self.import_records(
+            "LocalityDistricts", LocalityDistrict, sources["locality_districts"],
+            build_locality_district(localities), batch_size, sync,
+        )
+        streets = self.import_records(
+            "Streets", Street, sources["streets"],
+            build_street(localities, locality_districts), batch_size, sync,
+        )
+        return {
+            "regions": regions,
+            "districts": districts,
+            "localities": localities,
+            "locality_districts": locality_districts,
+            "streets": streets,
+        }
 
-            ld = LocalityDistrict.objects.create(
-                district=district_name,
-                locality=localities[district.find("TownId").text],
-                description=None,
-                group_on_site=None,
-                hot_deals_limit=hot_offers_limit,
-                prefix_to_site="",
-                is_subdistrict=False,
-                new_building_district=NewBuildingDistrictType.NONE,
-            )
+    def import_objects(
+        self, records: Iterable[Record], geography: dict[str, dict[str, int]],
+        client: Client, batch_size: int, sync: bool,
+    ) -> None:
+        self.stdout.write("Filling Objects")
+        with self.profile.stage("Objects") as stage, transaction.atomic():
+            start = time.perf_counter()
+            models = (Apartment, Commerce, House)
+            if not sync:
+                for model in models:
+                    model.objects.all().delete()
+            objects_sync = {
+                model: ModelSync(model, batch_size, on_change=sync_search_index(model))
+                for model in models
+            }
 
-            locality_districts.update(
-                {
-                    district.find("ID").text: ld,
-                }
-            )
+            # довідники, адреси та користувачі завантажуються один раз для всіх обʼєктів
+            resolvers = {
+                "locality": Resolver("locality", geography["localities"]),
+                "street": Resolver("street", geography["streets"]),
+                "condition": Resolver("condition", handbook_ids(HandbookType.CONDITION)),
+                "material": Resolver("material", handbook_ids(HandbookType.MATERIAL)),
+                "house_type": Resolver(
+                    "house_type", handbook_ids(HandbookType.HOUSE_TYPE)
+                ),
+                "layout": Resolver("layout", handbook_ids(HandbookType.LAYOUT)),
+                "stair": Resolver("stair", handbook_ids(HandbookType.STAIR)),
+            }
+            defaults = {
+                "realtor": CustomUser.objects.order_by("id").first(),
+                "agency": first_id(Handbook.objects.filter(type=HandbookType.AGENCY)),
+                "complex": first_id(Handbook.objects.filter(type=HandbookType.COMPLEX)),
+                "filial": first_id(FilialAgency.objects.filter(on_delete=False)),
+                "owner": client,
+            }
 
-        self.stdout.write("Filling Streets")
-        Street.objects.all().delete()
-        street_tree = ET.parse("xml/Streets16_02.xml")
-        street_root = street_tree.getroot()
-        streets = dict()
-        for street in street_root.find("StreetList"):
-            street_name = street.find("Name").text
-            s = Street.objects.create(
-                street=street_name,
-                locality=localities[street.find("TownId").text],
-                locality_district=locality_districts[street.find("TownRegionId").text],
-            )
-            streets.update(
-                {
-                    street.find("ID").text: s,
-                }
-            )
+            skipped = 0
+            for record in records:
+                result = real_estate_data(record, resolvers, defaults)
+                if result is None:
+                    skipped += 1
+                    continue
+                model, data = result
+                objects_sync[model].add(data)
+
+            rows = 0
+            for model, model_sync in objects_sync.items():
+                rows += len(model_sync.finish())
+                self.stdout.write(f"  {model.__name__}: {model_sync.summary()}")
+            stage.rows = rows
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"  {rows} rows in {elapsed:.2f}s, {skipped} skipped")
+            for resolver in resolvers.values():
+                if resolver.missing:
+                    message = f"  Unresolved {resolver.summary()}"
+                    self.stdout.write(self.style.WARNING(message))
 
-        self.stdout.write("Filling FilialAgencies")
-        FilialAgency.objects.all().delete()
-        filial_tree = ET.parse("xml/Branches16_02.xml")
-        filial_root = filial_tree.getroot()
-        for filial in filial_root.find("BranchList"):
-            name = filial.find("Name").text
-            phone = (
-                filial.find("Phone").text if filial.find("Phone") is not None else None
-            )
-            email = (
-                filial.find("eMail").text if filial.find("eMail") is not None else None
-            )
-            address = (
-                filial.find("Address").text
-                if filial.find("Address") is not None
-                else None
-            )
-            filial_type = (
-                filial.find("BranchType").text
-                if filial.find("BranchType") is not None
-                else None
-            )
-            new_build_area = (
-                filial.find("NewBuildArea").text
-                if filial.find("NewBuildArea") is not None
-                else None
+    def handle(self, *args, **kwargs):
+        xml_dir = kwargs["xml_dir"]
+        batch_size = kwargs["batch_size"]
+        sync = kwargs["sync"]
+        jobs = kwargs["jobs"]
+        self.profile = ImportProfile(enabled=kwargs["profile"])
+        total_start = time.perf_counter()
+
+        # читання файлів не залежить від бази, тому невеликі файли читаються одночасно,
+        # а записуються далі в порядку залежностей
+        start = time.perf_counter()
+        with self.profile.stage("Parse") as stage:
+            sources = read_sources(xml_dir, jobs)
+            stage.rows = sum(
+                len(records) for records in sources.values() if isinstance(records, list)
             )
-            open_date = get_date(filial, "DateOpen", "%d.%m.%Y %H:%M:%S")
-
-            FilialAgency.objects.create(
-                filial_agency=name,
-                locality_district=locality_districts[filial.find("TownRegionId").text],
-                phone=phone,
-                email=email,
-                address=address,
-                type=filial_type,
-                new_build_area=new_build_area,
-                open_date=make_aware(open_date, get_current_timezone()),
+        self.stdout.write(
+            f"Parsed {len(sources)} files ({stage.rows} records, "
+            f"{', '.join(STREAMED_SOURCES)} streamed) "
+            f"in {time.perf_counter() - start:.2f}s with {jobs} jobs"
+        )
+
+        # файли перевіряються до змін у базі, щоб не зупинитись посередині імпорту
+        with self.profile.stage("Validate") as stage:
+            report = validate_sources(sources)
+            stage.rows = len(report.issues)
+        self.stdout.write(f"{report.errors} errors, {report.warnings} warnings")
+        if kwargs["dry_run"]:
+            report.write(kwargs["report"])
+            self.stdout.write(f"Report written to {kwargs['report']}")
+            self.write_profile()
+            if report.errors:
+                raise CommandError(f"{report.errors} errors in xml files")
+            return
+        if report.errors:
+            raise CommandError(
+                f"{report.errors} errors in xml files, nothing imported. "
+                "Run with --dry-run for the report"
             )
 
-        self.stdout.write("Filling Objects")
-        Apartment.objects.all().delete()
-        Commerce.objects.all().delete()
-        House.objects.all().delete()
-
-        object_tree = ET.parse("xml/Catalog_22_02.xml")
-        object_root = object_tree.getroot()
-        for obj in object_root.find("Catalog"):
-            obj_data = {
-                "creation_date": get_date(obj, "creation_date", "%d.%m.%Y")
-                if obj.find("creation_date") is not None
-                else None,
-                "deposit_date": get_date(obj, "deposit_date", "%d.%m.%Y"),
-                "exclusive": bool(obj.find("exclusive"))
-                if obj.find("exclusive")
-                else False,
-                "locality": localities[obj.find("locality").text],
-                "street": streets[obj.find("street").text],
-                "house": obj.find("house").text,
-                "realtor": CustomUser.objects.all().first(),
-                "condition": Handbook.objects.filter(
-                    type=2, handbook=obj.find("condition").text
-                ).first()
-                if obj.find("condition") is not None
-                else None,
-                "material": Handbook.objects.filter(
-                    type=3, handbook=obj.find("material").text
-                ).first()
-                if obj.find("material") is not None
-                else None,
-                "agency": Handbook.objects.filter(type=5).first(),
-                "house_type": Handbook.objects.filter(
-                    type=11, handbook=obj.find("house_type").text
-                ).first()
-                if obj.find("house_type") is not None
-                else None,
-                "layout": Handbook.objects.filter(
-                    type=10, handbook=obj.find("layout").text
-                ).first()
-                if obj.find("layout") is not None
-                else None,
-                "stair": Handbook.objects.filter(
-                    type=8, handbook=obj.find("stair").text
-                ).first()
-                if obj.find("stair") is not None
-                else None,
-                "owner": client,
-                "parking": bool(obj.find("parking")) if obj.find("parking") else False,
-                "generator": bool(obj.find("generator"))
-                if obj.find("generator")
-                else False,
-                "e_home": bool(obj.find("e_home")) if obj.find("e_home") else False,
-                "price": int(obj.find("price").text),
-                "square": int(float(obj.find("square").text)),
-                "kitchen_square": int(float(obj.find("kitchen_square").text)),
-                "height": float(obj.find("height").text),
-                "floor": int(obj.find("floor").text),
-                "storeys_number": int(obj.find("storeys_number").text),
-                "status": STATUS_MAP[obj.find("status").text],
-                # "room_types": ROOMS_TYPE_MAP[obj.find("room_types").text]
-                # if obj.find("room_types") is not None
-                # else RoomType.NONE,
-                "document": obj.find("document").text,
-                "sale_terms": obj.find("sale_terms").text
-                if obj.find("sale_terms") is not None
-                else None,
-                "realtor_notes": obj.find("realtor_notes").text
-                if obj.find("realtor_notes") is not None
-                else None,
-                "comment": obj.find("comment").text
-                if obj.find("comment") is not None
-                else None,
-            }
-            if obj.find("creation_date"):
-                obj_data["creation_date"] = get_date(obj, "creation_date", "%d.%m.%Y")
-            
-            if not obj_data["creation_date"]:
-                obj_data["creation_date"] = datetime.now()
-
-            if obj.find("object_type").text == "квартира":
-                print(obj.find("living_square").text)
-                obj_data.update(
-                    {
-                        "apartment": obj.find("apartment").text,
-                        "living_square": int(float(obj.find("living_square").text)),
-                        "balcony": bool(obj.find("balcony"))
-                        if obj.find("balcony")
-                        else False,
-                        "balcony_number": int(obj.find("balcony_number").text),
-                        "complex": Handbook.objects.filter(type=12).first(),
-                    }
-                )
-                Apartment.objects.create(**obj_data)
-            elif obj.find("object_type").text == "дом":
-                obj_data.update(
-                    {
-                        "housing": obj.find("housing").text
-                        if obj.find("housing") is not None
-                        else None,
-                        "useful_square": int(float(obj.find("useful_square").text))
-                        if obj.find("useful_square") is not None
-                        else None,
-                        "land_square": int(float(obj.find("land_square").text))
-                        if obj.find("land_square") is not None
-                        else None,
-                        "rooms_number": int(obj.find("rooms_number").text)
-                        if obj.find("rooms_number") is not None
-                        else None,
-                        "communications": bool(obj.find("communications"))
-                        if obj.find("communications")
-                        else False,
-                        "terrace": bool(obj.find("terrace"))
-                        if obj.find("terrace")
-                        else False,
-                        "facade": bool(obj.find("facade"))
-                        if obj.find("facade")
-                        else False,
-                        "own_parking": bool(obj.find("own_parking"))
-                        if obj.find("own_parking")
-                        else False,
-                    }
-                )
-
-                House.objects.create(**obj_data)
-            elif obj.find("object_type").text == "комерция":
-                obj_data.update(
-                    {
-                        "premises": obj.find("premises").text
-                        if obj.find("premises") is not None
-                        else "",
-                        "useful_square": int(obj.find("useful_square").text)
-                        if obj.find("useful_square") is not None
-                        else None,
-                        "balcony": bool(obj.find("balcony"))
-                        if obj.find("balcony")
-                        else False,
-                        "balcony_number": int(obj.find("balcony_number").text)
-                        if obj.find("balcony_number") is not None
-                        else 0,
-                        "ground_floor": bool(obj.find("ground_floor"))
-                        if obj.find("ground_floor")
-                        else False,
-                        "facade": bool(obj.find("balcony"))
-                        if obj.find("balcony")
-                        else False,
-                        "own_parking": bool(obj.find("own_parking"))
-                        if obj.find("own_parking")
-                        else False,
-                        "own_courtyard": bool(obj.find("own_courtyard"))
-                        if obj.find("own_courtyard")
-                        else False,
-                        "separate_building": bool(obj.find("separate_building"))
-                        if obj.find("separate_building")
-                        else False,
-                        "complex": Handbook.objects.filter(type=12).first(),
-                    }
-                )
-                Commerce.objects.create(**obj_data)
+        Permission.objects.filter(codename__icontains="history").delete()
+        Permission.objects.filter(codename__icontains="historical").delete()
+        Permission.objects.filter(codename__icontains="session").delete()
+        Permission.objects.filter(codename__icontains="log").delete()
+        Permission.objects.filter(codename__icontains="permission").delete()
+        Permission.objects.filter(codename__icontains="contenttype").delete()
+        Permission.objects.filter(codename__icontains="delete").delete()
 
+        if not sync:
+            Client.objects.all().delete()
+        client = {
+            "date_of_add": datetime.now(),
+            "first_name": "Client",
+            "last_name": "Test Client",
+            "phone": "050",
+            "messenger": "viber",
+            "realtor": CustomUser.objects.all().first(),
+        }
+        client, _ = Client.objects.get_or_create(
+            email="client@gmail.com", defaults=client
+        )
+
+        self.import_handbooks(sources["handbooks"], batch_size, sync)
+        geography = self.import_geography(sources, batch_size, sync)
+        self.import_records(
+            "FilialAgencies", FilialAgency, sources["filials"],
+            build_filial(geography["locality_districts"]), batch_size, sync,
+        )
+        self.import_objects(sources["objects"], geography, client, batch_size, sync)
+
+        self.stdout.write(f"Total {time.perf_counter() - total_start:.2f}s")
+        self.write_profile()
         self.stdout.write(self.style.SUCCESS("Data filled successfully!"))
+
+    def write_profile(self) -> None:
+        if self.profile.enabled:
+            self.stdout.write("\n".join(self.profile.lines()))
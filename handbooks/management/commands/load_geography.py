@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from handbooks.geography_snapshot import load_snapshot
+
+
+class Command(BaseCommand):
+    help = "Завантажує географію зі знімка export_geography"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="geography.json.gz", help="Файл знімка",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Кількість рядків в одному INSERT",
+        )
+        parser.add_argument(
+            "--replace", action="store_true",
+            help=(
+                "Видалити наявну географію (разом з усім, що на неї посилається) "
+                "перед завантаженням"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            counts = load_snapshot(
+                options["path"], options["batch_size"], replace=options["replace"]
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        for model, rows in counts.items():
+            self.stdout.write(f"  {model}: {rows}")
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Geography loaded in {elapsed:.2f}s"))
@@ -1,21 +1,196 @@
-import xml.etree.ElementTree as ET
-from datetime import datetime
+import hashlib
+import json
+from collections import Counter, defaultdict
+from collections.abc import Callable, Sequence
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, QuerySet
+
+from accounts.models import HistoryChange
 from handbooks.models import Handbook
+from utils.model_versions import bump_model_version
+
+
+class Resolver:
+    """
+    Пошук pk за значенням з вивантаження у словнику, завантаженому один раз
+    замість запиту на кожен рядок. Нерозвʼязані значення рахуються для звіту.
+    """
+
+    def __init__(self, name: str, ids: dict[str, int]):
+        self.name = name
+        self.ids = ids
+        self.missing = Counter()
+
+    def __call__(self, value: str | None) -> int | None:
+        if value is None:
+            return None
+        value = value.strip()
+        pk = self.ids.get(value)
+        if pk is None:
+            self.missing[value] += 1
+        return pk
+
+    def summary(self) -> str:
+        values = ", ".join(
+            f"{value!r} x{count}" for value, count in self.missing.most_common(10)
+        )
+        return f"{self.name}: {self.missing.total()} ({values})"
+
+
+def handbook_ids(handbook_type: int) -> dict[str, int]:
+    """Назва довідника типу <handbook_type> -> pk (для однакових назв - менший pk)"""
+    handbooks = Handbook.objects.filter(type=handbook_type, on_delete=False)
+    return dict(handbooks.order_by("-id").values_list("handbook", "id"))
+
+
+def content_hash(data: dict) -> str:
+    """Хеш даних рядка імпорту"""
+    content = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ModelSync:
+    """
+    Синхронізує обʼєкти моделі <model> з рядками імпорту за зовнішнім ID.
+    Нові та змінені рядки записуються через bulk_create(update_conflicts=True)
+    частинами по <batch_size>, незмінені (той самий хеш даних) пропускаються,
+    а обʼєкти з <queryset>, яких немає в імпорті, мʼяко видаляються в finish().
+    Для моделей з історією (simple_history) записуються історія та зміни полів.
+    <on_change> викликається з pk створених, змінених та видалених обʼєктів.
+    """
+
+    def __init__(
+        self,
+        model: type[Model],
+        batch_size: int,
+        queryset: QuerySet | None = None,
+        unique_fields: Sequence[str] = ("external_id",),
+        on_change: Callable[[list[int]], None] | None = None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.queryset = model.objects.all() if queryset is None else queryset
+        self.unique_fields = list(unique_fields)
+        self.on_change = on_change
+        rows = self.queryset.exclude(external_id=None).values(
+            "pk", "import_hash", "on_delete", *self.unique_fields
+        )
+        self.existing = {self.key(row): row for row in rows.iterator()}
+        # ключ рядка -> pk для всіх рядків імпорту
+        self.ids = {}
+        self.batch = []
+        self.created = self.updated = self.unchanged = self.deleted = 0
+
+    def key(self, data: dict):
+        values = tuple(data[field] for field in self.unique_fields)
+        return values[0] if len(values) == 1 else values
+
+    def add(self, data: dict) -> None:
+        """Додає рядок імпорту: значення полів моделі разом з external_id"""
+        data = {
+            self.model._meta.get_field(name).attname: (
+                value.pk if isinstance(value, Model) else value
+            )
+            for name, value in data.items()
+        }
+        import_hash = content_hash(data)
+        key = self.key(data)
+        row = self.existing.get(key)
+        if row and row["import_hash"] == import_hash and not row["on_delete"]:
+            self.ids[key] = row["pk"]
+            self.unchanged += 1
+            return
+
+        self.batch.append((key, data, import_hash))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        # update_fields однакові для всіх рядків одного запиту
+        groups = defaultdict(list)
+        for key, data, import_hash in self.batch:
+            obj = self.model(**data, import_hash=import_hash, on_delete=False)
+            groups[tuple(data)].append((key, obj))
+        self.batch.clear()
 
+        created, updated = [], []
+        for names, objs in groups.items():
+            update_fields = [
+                name for name in names if name not in self.unique_fields
+            ] + ["import_hash", "on_delete"]
+            self.model.objects.bulk_create(
+                [obj for _, obj in objs],
+                update_conflicts=True,
+                unique_fields=self.unique_fields,
+                update_fields=update_fields,
+            )
+            for key, obj in objs:
+                if key in self.existing:
+                    obj.pk = self.existing[key]["pk"]
+                    updated.append(obj.pk)
+                else:
+                    created.append(obj.pk)
+                self.ids[key] = obj.pk
+        self.created += len(created)
+        self.updated += len(updated)
+        self.changed(created, updated)
 
-def handbook_fill(root, handbook_name):
-    handbooks = root.find(f".//{handbook_name}")
-    for handbook in handbooks.findall("Element"):
-        handbook_type = int(handbook.find("CatalogId").text)
-        handbook = handbook.find("Name").text.strip()
+    def changed(self, created: list[int], updated: list[int]) -> None:
+        """Записує історію змінених обʼєктів та викликає on_change"""
+        if not created and not updated:
+            return
+        history_attribute = getattr(
+            self.model._meta, "simple_history_manager_attribute", None
+        )
+        if history_attribute:
+            history = getattr(self.model, history_attribute)
+            pk_name = self.model._meta.pk.attname
+            prev_records = {}
+            for record in history.filter(**{f"{pk_name}__in": updated}).order_by(
+                pk_name, "-history_date", "-history_id"
+            ):
+                prev_records.setdefault(getattr(record, pk_name), record)
 
-        Handbook.objects.create(handbook=handbook, type=handbook_type)
+            objs = self.model._base_manager.in_bulk(created + updated)
+            history.bulk_history_create([objs[pk] for pk in created])
+            records = history.bulk_history_create(
+                [objs[pk] for pk in updated], update=True
+            )
+            HistoryChange.objects.bulk_create(
+                HistoryChange.from_records(
+                    (prev_records[getattr(record, pk_name)], record)
+                    for record in records
+                    if getattr(record, pk_name) in prev_records
+                )
+            )
+        if self.on_change:
+            self.on_change(created + updated)
 
+    def finish(self, soft_delete: bool = True) -> dict:
+        """
+        Записує залишок рядків, мʼяко видаляє обʼєкти, яких немає в імпорті,
+        та повертає відповідність ключ рядка -> pk.
+        """
+        if self.batch:
+            self.flush()
+        if soft_delete:
+            missing = [
+                row["pk"]
+                for key, row in self.existing.items()
+                if key not in self.ids and not row["on_delete"]
+            ]
+            for start in range(0, len(missing), self.batch_size):
+                pks = missing[start:start + self.batch_size]
+                self.queryset.filter(pk__in=pks).update(on_delete=True)
+                self.changed([], pks)
+            self.deleted = len(missing)
+        # bulk_create та update не надсилають post_save, тому версію змінюємо вручну
+        bump_model_version(self.model)
+        return self.ids
 
-def get_date(obj: ET.Element, field: str, f: str):  # f - format
-    field = obj.find(field).text
-    try:
-        return datetime.strptime(field, f) if field else None
-    except ValueError:
-        return None
+    def summary(self) -> str:
+        return (
+            f"{self.created} created, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.deleted} deleted"
+        )
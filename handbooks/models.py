@@ -3,7 +3,7 @@ from django.utils import timezone
 from simple_history.models import HistoricalRecords
 
 from accounts.models import CustomUser
-from estate_agency.models import BaseModel
+from estate_agency.models import BaseModel, ImportedModel
 from handbooks.choices import (
     CenterType,
     CityType,
@@ -15,7 +15,7 @@ from handbooks.choices import (
 from objects.choices import RealEstateType
 
 
-class Region(BaseModel):
+class Region(BaseModel, ImportedModel):
     region = models.CharField(max_length=100)
 
     class Meta:
@@ -25,7 +25,7 @@ class Region(BaseModel):
         return self.region
 
 
-class District(BaseModel):
+class District(BaseModel, ImportedModel):
     district = models.CharField(max_length=100)
     region = models.ForeignKey(
         Region, on_delete=models.CASCADE, related_name="region_related_name"
@@ -38,7 +38,7 @@ class District(BaseModel):
         return self.district
 
 
-class Locality(BaseModel):
+class Locality(BaseModel, ImportedModel):
     locality = models.CharField(max_length=100)
     district = models.ForeignKey(
         District, on_delete=models.CASCADE, related_name="district_related_name"
@@ -57,7 +57,7 @@ class Locality(BaseModel):
         return self.locality
 
 
-class LocalityDistrict(BaseModel):
+class LocalityDistrict(BaseModel, ImportedModel):
     district = models.CharField(max_length=100)
     locality = models.ForeignKey(
         Locality, on_delete=models.CASCADE, related_name="locality_related_name"
@@ -78,7 +78,7 @@ class LocalityDistrict(BaseModel):
         return self.district
 
 
-class Street(BaseModel):
+class Street(BaseModel, ImportedModel):
     street = models.CharField(max_length=100)
     locality_district = models.ForeignKey(
         LocalityDistrict,
@@ -96,13 +96,20 @@ class Street(BaseModel):
         return self.street
 
 
-class Handbook(BaseModel):
+class Handbook(BaseModel, ImportedModel):
     handbook = models.CharField(max_length=100)
 
     type = models.PositiveSmallIntegerField(choices=HandbookType.choices)
+    # ID довідників в основній системі унікальні лише в межах типу
+    external_id = models.CharField(max_length=50, null=True, blank=True, editable=False)
 
     class Meta:
         default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "external_id"], name="handbook_type_external_id_uniq"
+            ),
+        ]
         permissions = (
             ("view_handbooks", "Can view handbooks"),
             ("add_handbook", "Can add handbook"),
@@ -159,7 +166,7 @@ class Handbook(BaseModel):
         return self.handbook
 
 
-class FilialAgency(BaseModel):
+class FilialAgency(BaseModel, ImportedModel):
     filial_agency = models.CharField(max_length=100)
     locality_district = models.ForeignKey(
         LocalityDistrict,
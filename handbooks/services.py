@@ -1,7 +1,8 @@
-from django.db.models import QuerySet
+from django.db.models import Count, QuerySet
 
 from .models import Client
 from accounts.models import CustomUser
+from objects.models import ClientMatch
 
 def clients_accessible_for_user(user: CustomUser, qs: QuerySet[Client]) -> QuerySet[Client]:
     """
@@ -60,3 +61,17 @@ def user_can_update_client_list(user: CustomUser, clients: QuerySet[Client]) ->
         return {client.id: user == client.realtor for client in clients}
 
     return {client.id: False for client in clients}
+
+
+def client_match_counts(clients: QuerySet[Client]) -> dict[int, int]:
+    """
+    Повертає кількість обʼєктів нерухомості, які підходять під критерії клієнтів
+    з <clients> (див. ClientMatch). Ключі - id клієнта, значення - кількість.
+    """
+    counts = (
+        ClientMatch.objects.filter(client__in=clients)
+        .values("client_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {row["client_id"]: row["count"] for row in counts}
@@ -160,3 +160,345 @@ class HandbooksTest(TestCase):
         if handbook in MODEL.keys():
             return MODEL[handbook].objects.first()
         return Handbook.objects.filter(type=HANDBOOKS_QUERYSET[handbook]).first()"""
+
+
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from accounts.models import CustomUser, HistoryChange
+from handbooks.management.commands import fill_db
+from handbooks.models import Client, District, Region, Street
+from handbooks.xml_records import (
+    RecordStream,
+    iter_elements,
+    parse_bool,
+    parse_date,
+    read_records,
+)
+from objects.choices import RealEstateType
+from objects.models import Apartment, RealEstateSearchIndex
+from utils.count_cache import CachedCountPaginator, cached_count
+
+
+class CountCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            Region.objects.create(region=f"Region {i}")
+
+    def test_count_cached_until_model_changes(self):
+        qs = Region.objects.filter(on_delete=False)
+        with self.assertNumQueries(1):
+            self.assertEqual(cached_count(qs), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(Region.objects.filter(on_delete=False)), 3)
+            self.assertEqual(CachedCountPaginator(qs, 2).num_pages, 2)
+
+        # мʼяке видалення теж змінює версію моделі
+        Region.objects.first().delete()
+        self.assertEqual(cached_count(qs), 2)
+
+        Region.objects.create(region="New")
+        self.assertEqual(cached_count(qs), 3)
+
+    def test_filters_have_own_keys(self):
+        self.assertEqual(cached_count(Region.objects.filter(region="Region 1")), 1)
+        self.assertEqual(cached_count(Region.objects.filter(region="Region 2")), 1)
+        self.assertEqual(cached_count(Region.objects.filter(region__startswith="R")), 3)
+        self.assertEqual(cached_count(Region.objects.none()), 0)
+
+    def test_approximate_count_falls_back_to_exact(self):
+        qs = Region.objects.all()
+        self.assertEqual(cached_count(qs, approximate=True), 3)
+        self.assertEqual(CachedCountPaginator(qs, 2, approximate_count=True).count, 3)
+
+    def test_joined_and_subquery_models_in_key(self):
+        region = Region.objects.first()
+        District.objects.create(district="District", region=region)
+        joined = District.objects.filter(region__region=region.region)
+        self.assertEqual(cached_count(joined), 1)
+        region.region = "Renamed"
+        region.save()
+        self.assertEqual(cached_count(joined), 0)
+
+        subquery = Region.objects.filter(pk__in=District.objects.values("region"))
+        self.assertEqual(cached_count(subquery), 1)
+        District.objects.create(district="Other", region=Region.objects.last())
+        self.assertEqual(cached_count(subquery), 2)
+
+
+class GeographyImportTest(TestCase):
+    def test_import_geography(self):
+        command = fill_db.Command(stdout=StringIO())
+        sources = fill_db.read_sources("xml", jobs=1)
+        ids = command.import_geography(sources, batch_size=500)
+
+        self.assertEqual(Region.objects.count(), len(ids["regions"]))
+        self.assertEqual(Street.objects.count(), len(ids["streets"]))
+        self.assertGreater(len(ids["streets"]), 1000)
+
+        street = Street.objects.get(pk=ids["streets"]["1"])
+        self.assertEqual(street.street, " 411 батарея")
+        self.assertEqual(street.locality_id, ids["localities"]["33"])
+        self.assertEqual(street.locality_district_id, ids["locality_districts"]["1"])
+        self.assertIn("rows/s", command.stdout.getvalue())
+
+        # повторний імпорт замінює дані, а не додає їх
+        command.import_geography(sources, batch_size=500)
+        self.assertEqual(Street.objects.count(), len(ids["streets"]))
+
+    def test_parallel_read_matches_sequential(self):
+        sources = fill_db.read_sources("xml", jobs=1)
+        self.assertEqual(set(sources), set(fill_db.SOURCES))
+        self.assertTrue(all(sources.values()))
+        self.assertEqual(fill_db.read_sources("xml", jobs=4), sources)
+
+    def test_large_sources_streamed(self):
+        sources = fill_db.read_sources("xml", jobs=1)
+        for name in fill_db.STREAMED_SOURCES:
+            self.assertIsInstance(sources[name], RecordStream)
+        # кожен прохід читає файл заново і дає ті ж записи
+        streets = sources["streets"]
+        self.assertEqual(next(iter(streets)), next(iter(streets)))
+        self.assertEqual(
+            sum(1 for _ in streets), len(read_records(streets.path, streets.tag))
+        )
+
+    def test_record_values(self):
+        self.assertTrue(parse_bool(" true"))
+        self.assertFalse(parse_bool("false"))
+        self.assertFalse(parse_bool(None))
+        self.assertEqual(parse_date("01.02.2024", "%d.%m.%Y").month, 2)
+        self.assertIsNone(parse_date("0", "%d.%m.%Y"))
+
+    def test_iter_elements_drops_processed_elements(self):
+        elements, names = [], []
+        for element in iter_elements("xml/District16_02.xml", "District"):
+            elements.append(element)
+            names.append(element.findtext("Name"))
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(names))
+        # після обробки елементи очищені
+        self.assertTrue(all(len(element) == 0 for element in elements))
+
+
+class SyncImportTest(TestCase):
+    def setUp(self):
+        self.xml_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.xml_dir)
+        for name in os.listdir("xml"):
+            shutil.copy(os.path.join("xml", name), self.xml_dir)
+
+    def read_sources(self):
+        return fill_db.read_sources(self.xml_dir, jobs=1)
+
+    def test_sync_geography(self):
+        command = fill_db.Command(stdout=StringIO())
+        ids = command.import_geography(self.read_sources(), batch_size=500)
+        street = Street.objects.get(pk=ids["streets"]["1"])
+
+        command.stdout = StringIO()
+        sources = self.read_sources()
+        self.assertEqual(command.import_geography(sources, 500, sync=True), ids)
+        self.assertIn(
+            f"0 created, 0 updated, {len(ids['streets'])} unchanged, 0 deleted",
+            command.stdout.getvalue(),
+        )
+
+        # вулицю перейменовано, а вулицю 2106 видалено з вивантаження
+        path = os.path.join(self.xml_dir, "Streets16_02.xml")
+        with open(path, encoding="utf-8-sig") as file:
+            content = file.read()
+        content = content.replace("<Name> 411 батарея</Name>", "<Name>Нова</Name>")
+        content = content.replace("<ID>2106</ID>", "<ID>removed</ID>")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+        command.stdout = StringIO()
+        new_ids = command.import_geography(self.read_sources(), 500, sync=True)
+        self.assertIn("1 created, 1 updated", command.stdout.getvalue())
+        self.assertIn("1 deleted", command.stdout.getvalue())
+        self.assertEqual(new_ids["streets"]["1"], street.pk)
+        self.assertEqual(Street.objects.get(pk=street.pk).street, "Нова")
+        self.assertTrue(Street.objects.get(pk=ids["streets"]["2106"]).on_delete)
+
+    def test_sync_keeps_objects_and_history(self):
+        CustomUser.objects.create_user(email="testuser@gmail.com", password="secret")
+        call_command("fill_db", xml_dir=self.xml_dir, stdout=StringIO())
+        apartment = Apartment.objects.first()
+        self.assertIsNotNone(apartment.external_id)
+        self.assertTrue(
+            RealEstateSearchIndex.objects.filter(object_id=apartment.pk).exists()
+        )
+        history_count = apartment.history.count()
+
+        out = StringIO()
+        call_command("fill_db", xml_dir=self.xml_dir, sync=True, stdout=out)
+        self.assertIn("Apartment: 0 created, 0 updated", out.getvalue())
+        self.assertEqual(Apartment.objects.get(pk=apartment.pk).price, apartment.price)
+        self.assertEqual(apartment.history.count(), history_count)
+
+        Apartment.objects.filter(pk=apartment.pk).update(price=1)
+        call_command("fill_db", xml_dir=self.xml_dir, sync=True, stdout=StringIO())
+        # змінений в базі рядок не оновлюється, поки не змінився в вивантаженні
+        self.assertEqual(Apartment.objects.get(pk=apartment.pk).price, 1)
+
+        path = os.path.join(self.xml_dir, "Catalog_22_02.xml")
+        with open(path, encoding="utf-8-sig") as file:
+            content = file.read()
+        start = content.index(f"<ID>{apartment.external_id}</ID>")
+        end = content.index("</Object>", start)
+        block = content[start:end].replace(
+            f"<price>{apartment.price}</price>", "<price>5</price>"
+        )
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content[:start] + block + content[end:])
+
+        out = StringIO()
+        call_command("fill_db", xml_dir=self.xml_dir, sync=True, stdout=out)
+        self.assertIn("Apartment: 0 created, 1 updated", out.getvalue())
+        self.assertEqual(Apartment.objects.get(pk=apartment.pk).price, 5)
+        self.assertEqual(apartment.history.count(), history_count + 1)
+        change = HistoryChange.for_object(apartment).get(field="price")
+        self.assertEqual(change.old_value, str(apartment.price))
+        self.assertEqual(change.new_value, "5")
+
+    def test_search_index_sync_queries(self):
+        CustomUser.objects.create_user(email="testuser@gmail.com", password="secret")
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("fill_db", xml_dir=self.xml_dir, stdout=StringIO())
+        pks = list(Apartment.objects.order_by("pk").values_list("pk", flat=True))
+        self.assertGreater(len(pks), 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            buyer = Client.objects.create(
+                email="buyer@gmail.com", first_name="Buyer", phone="067",
+                realtor=CustomUser.objects.first(), object_type=RealEstateType.APARTMENT,
+            )
+        expected = set(
+            buyer.real_estate_matches.values_list("object_id", flat=True)
+        )
+        self.assertTrue(expected)
+
+        # кількість запитів однакова для одного і для всіх обʼєктів
+        on_change = fill_db.sync_search_index(Apartment)
+        with self.assertNumQueries(13):
+            on_change([min(expected)])
+        with self.assertNumQueries(13):
+            on_change(pks)
+        self.assertEqual(
+            set(buyer.real_estate_matches.values_list("object_id", flat=True)), expected
+        )
+        self.assertEqual(
+            RealEstateSearchIndex.objects.filter(
+                real_estate_type=RealEstateType.APARTMENT
+            ).count(),
+            Apartment.objects.filter(on_delete=False).count(),
+        )
+
+    def test_unresolved_references_are_reported(self):
+        path = os.path.join(self.xml_dir, "Catalog_22_02.xml")
+        with open(path, encoding="utf-8-sig") as file:
+            content = file.read()
+        # у першого обʼєкта невідома вулиця, в останнього - стан
+        content = content.replace("<street>", "<street>999999", 1)
+        head, _, tail = content.rpartition("<condition>жилое состояние</condition>")
+        content = f"{head}<condition>unknown</condition>{tail}"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        objects_count = content.count("<Object>")
+
+        CustomUser.objects.create_user(email="testuser@gmail.com", password="secret")
+        out = StringIO()
+        call_command("fill_db", xml_dir=self.xml_dir, stdout=out)
+        self.assertIn(f"{objects_count - 1} rows", out.getvalue())
+        self.assertIn("1 skipped", out.getvalue())
+        self.assertIn("Parsed 8 files", out.getvalue())
+        self.assertIn("Unresolved street: 1", out.getvalue())
+        self.assertIn("'unknown' x1", out.getvalue())
+
+
+class DryRunImportTest(TestCase):
+    def setUp(self):
+        self.xml_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.xml_dir)
+        for name in os.listdir("xml"):
+            shutil.copy(os.path.join("xml", name), self.xml_dir)
+        self.report = os.path.join(self.xml_dir, "report.json")
+
+    def test_valid_files(self):
+        out = StringIO()
+        call_command(
+            "fill_db", xml_dir=self.xml_dir, dry_run=True, report=self.report,
+            profile=True, stdout=out,
+        )
+        self.assertFalse(Region.objects.exists())
+        self.assertIn("0 errors", out.getvalue())
+        self.assertIn("Validate", out.getvalue())
+        with open(self.report, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["errors"], 0)
+
+    def test_broken_reference_stops_import(self):
+        path = os.path.join(self.xml_dir, "Streets16_02.xml")
+        with open(path, encoding="utf-8-sig") as file:
+            content = file.read()
+        content = content.replace("<TownId>", "<TownId>999999", 1)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "fill_db", xml_dir=self.xml_dir, dry_run=True, report=self.report,
+                stdout=StringIO(),
+            )
+        with open(self.report, encoding="utf-8") as file:
+            report = json.load(file)
+        self.assertEqual(report["errors"], 1)
+        issue = report["issues"][0]
+        self.assertEqual(issue["source"], "streets")
+        self.assertEqual(issue["field"], "TownId")
+        self.assertTrue(issue["value"].startswith("999999"))
+
+        # без --dry-run імпорт зупиняється до змін у базі
+        with self.assertRaises(CommandError):
+            call_command("fill_db", xml_dir=self.xml_dir, stdout=StringIO())
+        self.assertFalse(Region.objects.exists())
+
+
+class GeographySnapshotTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "geography.json.gz")
+        command = fill_db.Command(stdout=StringIO())
+        self.ids = command.import_geography(
+            fill_db.read_sources("xml", jobs=1), batch_size=500
+        )
+
+    def test_export_and_load(self):
+        street = Street.objects.get(pk=self.ids["streets"]["1"])
+        streets = list(Street.objects.order_by("pk").values())
+        call_command("export_geography", self.path, stdout=StringIO())
+        with open(self.path, "rb") as file:
+            content = file.read()
+        # знімок тієї ж бази не змінюється
+        call_command("export_geography", self.path, stdout=StringIO())
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), content)
+
+        with self.assertRaises(CommandError):
+            call_command("load_geography", self.path, stdout=StringIO())
+
+        Street.objects.filter(pk=street.pk).update(street="Змінена")
+        call_command("load_geography", self.path, replace=True, stdout=StringIO())
+        self.assertEqual(list(Street.objects.order_by("pk").values()), streets)
+        self.assertEqual(Street.objects.get(pk=street.pk).street, street.street)
+        # після явних pk нові записи отримують наступні pk
+        region = Region.objects.create(region="New")
+        self.assertGreater(region.pk, max(self.ids["regions"].values()))
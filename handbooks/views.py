@@ -40,7 +40,7 @@ from objects.mixins import DefaultUserInCreateViewMixin
 from .utils import get_sale_client_list_context
 from utils.mixins.mixins import (
     CustomLoginRequiredMixin,
-    SearchByIdMixin, CustomPaginateOnPageMixin,
+    SearchByIdMixin, CustomPaginateOnPageMixin, CachedCountPaginateMixin,
 )
 from utils.views import (
     CustomCreateView,
@@ -64,7 +64,7 @@ def sale_redirect(request, lang):
     return render(request, "403.html", kwargs)
 
 
-class RegionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class RegionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список областей"""
 
     queryset = Region.objects.filter(on_delete=False)
@@ -84,7 +84,7 @@ class RegionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchBy
         return context
 
 
-class DistrictListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class DistrictListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список обласних районів"""
 
     queryset = District.objects.filter(on_delete=False).select_related()
@@ -104,7 +104,7 @@ class DistrictListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Search
         return context
 
 
-class LocalityListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class LocalityListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список міст"""
 
     queryset = Locality.objects.filter(on_delete=False).select_related()
@@ -124,7 +124,7 @@ class LocalityListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Search
         return context
 
 
-class LocalityDistrictListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class LocalityDistrictListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список районів міст"""
 
     queryset = LocalityDistrict.objects.filter(on_delete=False).select_related()
@@ -144,13 +144,14 @@ class LocalityDistrictListView(CustomLoginRequiredMixin, PermissionRequiredMixin
         return context
 
 
-class StreetListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class StreetListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список вулиць"""
 
     queryset = Street.objects.filter(on_delete=False).select_related()
     template_name = "handbooks/street_list.html"
     permission_required = "handbooks.view_handbooks"
     paginate_by = 10
+    approximate_count = True
 
     def get_context_data(self, **kwargs):
         activate(self.kwargs["lang"])
@@ -164,7 +165,7 @@ class StreetListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchBy
         return context
 
 
-class WithdrawalReasonListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class WithdrawalReasonListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=1)
     template_name = "handbooks/handbook_list.html"
     permission_required = "handbooks.view_handbooks"
@@ -188,7 +189,7 @@ class WithdrawalReasonListView(CustomLoginRequiredMixin, PermissionRequiredMixin
         return context
 
 
-class ConditionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class ConditionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=2)
     template_name = "handbooks/handbook_list.html"
     permission_required = "handbooks.view_handbooks"
@@ -212,7 +213,7 @@ class ConditionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Searc
         return context
 
 
-class MaterialListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class MaterialListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=3)
     template_name = "handbooks/handbook_list.html"
     permission_required = "handbooks.view_handbooks"
@@ -236,7 +237,7 @@ class MaterialListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Search
         return context
 
 
-class SeparationListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class SeparationListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=4)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -260,7 +261,7 @@ class SeparationListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Sear
         return context
 
 
-class AgencyListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class AgencyListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=5)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -284,7 +285,7 @@ class AgencyListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchBy
         return context
 
 
-class AgencySalesListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class AgencySalesListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=6)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -308,7 +309,7 @@ class AgencySalesListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Sea
         return context
 
 
-class NewBuildingNameListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class NewBuildingNameListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=7)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -332,7 +333,7 @@ class NewBuildingNameListView(CustomLoginRequiredMixin, PermissionRequiredMixin,
         return context
 
 
-class StairListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class StairListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=8)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -356,7 +357,7 @@ class StairListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByI
         return context
 
 
-class HeatingListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class HeatingListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=9)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -380,7 +381,7 @@ class HeatingListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchB
         return context
 
 
-class LayoutListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class LayoutListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=10)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -404,7 +405,7 @@ class LayoutListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchBy
         return context
 
 
-class HouseTypeListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class HouseTypeListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=11)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -428,7 +429,7 @@ class HouseTypeListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Searc
         return context
 
 
-class ComplexListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class ComplexListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     queryset = Handbook.objects.filter(on_delete=False, type=12)
     permission_required = "handbooks.view_handbooks"
     template_name = "handbooks/handbook_list.html"
@@ -452,7 +453,7 @@ class ComplexListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchB
         return context
 
 
-class FilialAgencyListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class FilialAgencyListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список філіалів"""
 
     queryset = FilialAgency.objects.filter(on_delete=False).select_related()
@@ -472,7 +473,7 @@ class FilialAgencyListView(CustomLoginRequiredMixin, PermissionRequiredMixin, Se
         return context
 
 
-class FilialReportListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, ListView):
+class FilialReportListView(CustomLoginRequiredMixin, PermissionRequiredMixin, SearchByIdMixin, CachedCountPaginateMixin, ListView):
     """Список філіальних звітів"""
 
     queryset = FilialReport.objects.filter(on_delete=False).select_related()
@@ -0,0 +1,91 @@
+"""
+Читання xml вивантажень основної системи у прості записи: словники
+"тег дочірнього елемента -> текст". Модуль не залежить від Django,
+тому файли можна читати паралельно в окремих процесах (fill_db --jobs).
+Дерево xml в памʼяті не тримається. Невеликі файли читаються в списки записів,
+а великі (вулиці, каталог обʼєктів) - в RecordStream, який при кожному проході
+читає записи з файлу по одному, тому памʼять не залежить від їх кількості.
+"""
+
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from datetime import datetime
+
+Record = dict[str, str | None]
+
+
+def iter_elements(path: str, tag: str) -> Iterator[ET.Element]:
+    """
+    Повертає елементи <tag> з xml файлу <path> по одному під час читання файлу.
+    Оброблені елементи видаляються з дерева, тому памʼять не залежить
+    від розміру файлу.
+    """
+    parents = []
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == tag:
+            yield element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
+
+def element_record(element: ET.Element) -> Record:
+    return {child.tag: child.text for child in element}
+
+
+def iter_records(path: str, tag: str) -> Iterator[Record]:
+    """Записи елементів <tag> з xml файлу <path> по одному"""
+    for element in iter_elements(path, tag):
+        yield element_record(element)
+
+
+def read_records(path: str, tag: str) -> list[Record]:
+    """Записи всіх елементів <tag> з xml файлу <path> (всі одразу в памʼяті)"""
+    return list(iter_records(path, tag))
+
+
+class RecordStream:
+    """
+    Записи елементів <tag> з xml файлу <path>, які не зберігаються в памʼяті:
+    кожен прохід (for) читає файл заново.
+    """
+
+    def __init__(self, path: str, tag: str):
+        self.path = path
+        self.tag = tag
+
+    def __iter__(self) -> Iterator[Record]:
+        return iter_records(self.path, self.tag)
+
+    def __eq__(self, other):
+        if not isinstance(other, RecordStream):
+            return NotImplemented
+        return (self.path, self.tag) == (other.path, other.tag)
+
+    def __repr__(self):
+        return f"RecordStream({self.path!r}, {self.tag!r})"
+
+
+def read_handbook_records(path: str, sections: list[str]) -> list[Record]:
+    """Записи довідників з розділів <sections> файлу довідників"""
+    root = ET.parse(path).getroot()
+    return [
+        element_record(element)
+        for section in sections
+        for element in root.find(f".//{section}").findall("Element")
+    ]
+
+
+def parse_date(value: str | None, date_format: str) -> datetime | None:
+    try:
+        return datetime.strptime(value, date_format) if value else None
+    except ValueError:
+        return None
+
+
+def parse_bool(value: str | None) -> bool:
+    return value is not None and value.strip().lower() == "true"
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ImagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "images"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save, pre_save
+        from .models import RealEstateImage
+        from .signals import (
+            create_derivatives,
+            remove_derivatives,
+            reset_derivatives,
+            update_cover_image,
+        )
+        post_save.connect(update_cover_image, sender=RealEstateImage)
+        post_delete.connect(update_cover_image, sender=RealEstateImage)
+        pre_save.connect(reset_derivatives, sender=RealEstateImage)
+        post_save.connect(create_derivatives, sender=RealEstateImage)
+        post_delete.connect(remove_derivatives, sender=RealEstateImage)
@@ -0,0 +1,128 @@
+"""
+Зменшені копії (похідні) зображень нерухомості: мініатюра, картка та pdf,
+кожна у форматах JPEG та WebP. Зберігаються поруч з оригіналом
+(images/photo.png -> images/photo.png_card.jpg, images/photo.png_card.webp)
+та створюються у фоновому пулі потоків після збереження зображення.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage, default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from utils.model_versions import bump_model_version, bump_object_version
+
+logger = logging.getLogger(__name__)
+
+# назва розміру -> максимальні ширина та висота
+SIZES = {
+    "thumbnail": (200, 200),
+    "card": (600, 400),
+    "pdf": (1200, 1200),
+}
+
+# формат -> (розширення файлу, параметри збереження Pillow)
+FORMATS = {
+    "jpeg": ("jpg", {"quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("webp", {"quality": 80, "method": 4}),
+}
+
+_executor = None
+
+
+def derivative_name(name: str, size: str, image_format: str = "jpeg") -> str:
+    """
+    Повертає імʼя файлу похідного зображення для оригіналу <name>.
+    Розширення оригіналу зберігається, тому photo.jpg та photo.png мають різні копії.
+    """
+    return f"{name}_{size}.{FORMATS[image_format][0]}"
+
+
+def derivative_names(name: str) -> list[str]:
+    return [
+        derivative_name(name, size, image_format)
+        for size in SIZES
+        for image_format in FORMATS
+    ]
+
+
+def generate_derivatives(name: str, storage: Storage = default_storage) -> list[str]:
+    """Створює всі похідні зображення для оригіналу <name> та повертає їх імена"""
+    with storage.open(name, "rb") as file:
+        original = Image.open(file)
+        # JPEG декодується одразу в зменшеному масштабі, але не менше найбільшого розміру
+        original.draft("RGB", max(SIZES.values()))
+        original = ImageOps.exif_transpose(original).convert("RGB")
+
+    created = []
+    for size, dimensions in SIZES.items():
+        image = original.copy()
+        image.thumbnail(dimensions, Image.Resampling.LANCZOS)
+        for image_format, (_, options) in FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, format=image_format.upper(), **options)
+            path = derivative_name(name, size, image_format)
+            if storage.exists(path):
+                storage.delete(path)
+            created.append(storage.save(path, ContentFile(buffer.getvalue())))
+    return created
+
+
+def delete_derivatives(name: str, storage: Storage = default_storage) -> None:
+    for path in derivative_names(name):
+        if storage.exists(path):
+            storage.delete(path)
+
+
+def process_image(image_id: int) -> bool:
+    """
+    Створює похідні зображення для RealEstateImage з id <image_id>
+    та позначає, що вони готові. Повертає False, якщо зображення немає.
+    """
+    from .models import RealEstateImage
+
+    image = RealEstateImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return False
+    generate_derivatives(image.image.name, image.image.storage)
+    # якщо за цей час файл замінили, його похідні створить наступне завдання
+    updated = RealEstateImage.objects.filter(pk=image_id, image=image.image.name).update(
+        has_derivatives=True
+    )
+    if updated:
+        # update() не надсилає post_save, а сторінки мають показати нові копії
+        bump_model_version(RealEstateImage, image)
+        if (model := image.content_type.model_class()) is not None:
+            bump_object_version(model, image.object_id)
+    return True
+
+
+def process_image_in_worker(image_id: int) -> bool:
+    """Виконує process_image у фоновому потоці та закриває його зʼєднання з базою"""
+    try:
+        return process_image(image_id)
+    except Exception:
+        logger.exception("Cannot generate derivatives for image %s", image_id)
+        return False
+    finally:
+        connections.close_all()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "IMAGE_DERIVATIVE_WORKERS", 2),
+            thread_name_prefix="image-derivatives",
+        )
+    return _executor
+
+
+def schedule_derivatives(image_id: int) -> None:
+    """Додає створення похідних зображень у фоновий пул після коміту транзакції"""
+    transaction.on_commit(lambda: get_executor().submit(process_image_in_worker, image_id))
@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from images.derivatives import process_image_in_worker
+from images.models import RealEstateImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Створює зменшені копії (мініатюра, картка, pdf у форматах JPEG та WebP) "
+        "для зображень нерухомості, у яких їх ще немає"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--force", action="store_true", help="Перестворити копії для всіх зображень"
+        )
+
+    def handle(self, *args, **options):
+        qs = RealEstateImage.objects.all()
+        if not options["force"]:
+            qs = qs.filter(has_derivatives=False)
+        image_ids = list(qs.values_list("id", flat=True))
+        self.stdout.write(f"Processing {len(image_ids)} images")
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            results = executor.map(process_image_in_worker, image_ids)
+            for done, result in enumerate(results, 1):
+                if not result:
+                    failed += 1
+                if done % 100 == 0:
+                    self.stdout.write(f"{done}/{len(image_ids)}")
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Failed: {failed}"))
+        self.stdout.write(self.style.SUCCESS("Image derivatives generated successfully!"))
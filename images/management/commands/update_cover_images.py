@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from images.services import update_cover_images
+from objects.models import Apartment, Commerce, House, Land
+
+
+class Command(BaseCommand):
+    help = "Оновлює головне зображення (cover_image) всіх обʼєктів нерухомості"
+
+    def handle(self, *args, **options):
+        for model in (Apartment, Commerce, House, Land):
+            updated = update_cover_images(model)
+            self.stdout.write(f"{model.__name__}: {updated}")
+
+        self.stdout.write(self.style.SUCCESS("Cover images updated successfully!"))
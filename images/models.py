@@ -2,6 +2,8 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
+from .derivatives import derivative_name
+
 
 class RealEstateImage(models.Model):
     """Зображення обʼєкта нерухомості"""
@@ -10,7 +12,18 @@ class RealEstateImage(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey("content_type", "object_id")
+    # чи створені зменшені копії зображення (див. images.derivatives)
+    has_derivatives = models.BooleanField(default=False, editable=False)
 
     class Meta:
         default_permissions = ("add", "change", "view")
         indexes = [models.Index(fields=["content_type", "object_id"])]
+
+    def derivative_url(self, size: str, image_format: str = "jpeg") -> str:
+        """
+        Повертає URL зменшеної копії зображення розміру <size>
+        (або оригіналу, якщо копії ще не створені).
+        """
+        if not self.has_derivatives:
+            return self.image.url
+        return self.image.storage.url(derivative_name(self.image.name, size, image_format))
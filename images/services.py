@@ -0,0 +1,53 @@
+from collections import defaultdict
+from collections.abc import Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Model, OuterRef, Prefetch, Subquery, prefetch_related_objects
+
+from .models import RealEstateImage
+
+
+def prefetch_real_estate_images(objects: Iterable[Model]) -> list[Model]:
+    """
+    Завантажує зображення для обʼєктів нерухомості <objects> різних типів
+    одним запитом на кожен тип замість запиту на кожен обʼєкт.
+    Після цього obj.images.all() не звертається до бази даних.
+    """
+    objects = list(objects)
+    objects_by_model = defaultdict(list)
+    for obj in objects:
+        objects_by_model[type(obj)].append(obj)
+
+    for model_objects in objects_by_model.values():
+        prefetch_related_objects(
+            model_objects,
+            Prefetch("images", queryset=RealEstateImage.objects.order_by("id")),
+        )
+    return objects
+
+
+def real_estate_cards(objects: Iterable[Model]) -> list[dict]:
+    """
+    Повертає картки обʼєктів нерухомості для списків: обʼєкт та його головне
+    зображення (cover_image, для нього варто зробити select_related).
+    """
+    return [
+        {"object": obj, "image": obj.cover_image}
+        for obj in prefetch_real_estate_images(objects)
+    ]
+
+
+def update_cover_images(model: type[Model], **filters) -> int:
+    """
+    Оновлює cover_image (перше зображення) для обʼєктів моделі <model>,
+    які відповідають <filters>, одним запитом.
+    """
+    first_image = (
+        RealEstateImage.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=OuterRef("pk"),
+        )
+        .order_by("id")
+        .values("id")[:1]
+    )
+    return model.objects.filter(**filters).update(cover_image=Subquery(first_image))
@@ -0,0 +1,38 @@
+def update_cover_image(sender, instance, **kwargs):
+    """
+    Оновлює головне зображення обʼєкта нерухомості при зміні його зображень
+    та версію обʼєкта для кешу.
+    """
+    from utils.model_versions import bump_object_version
+    from .services import update_cover_images
+
+    model = instance.content_type.model_class()
+    if model is None or not hasattr(model, "cover_image"):
+        return
+    update_cover_images(model, pk=instance.object_id)
+    # зображення показуються на сторінці обʼєкта, тому змінюємо і його версію
+    bump_object_version(model, instance.object_id)
+
+
+def reset_derivatives(sender, instance, **kwargs):
+    """Позначає, що для нового файлу зображення похідні ще не створені"""
+    if instance.image and not instance.image._committed:
+        instance.has_derivatives = False
+
+
+def create_derivatives(sender, instance, **kwargs):
+    from .derivatives import schedule_derivatives
+
+    if instance.image and not instance.has_derivatives:
+        schedule_derivatives(instance.pk)
+
+
+def remove_derivatives(sender, instance, **kwargs):
+    """Видаляє похідні зображення, коли видалення зображення збережене в базі"""
+    from django.db import transaction
+
+    from .derivatives import delete_derivatives
+
+    if instance.image:
+        name, storage = instance.image.name, instance.image.storage
+        transaction.on_commit(lambda: delete_derivatives(name, storage))
@@ -0,0 +1,40 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from images.models import RealEstateImage
+
+register = template.Library()
+
+
+@register.filter(name="derivative_url")
+def derivative_url(image: RealEstateImage | None, size: str) -> str:
+    """URL зменшеної JPEG копії зображення розміру <size>"""
+    if image is None:
+        return ""
+    return image.derivative_url(size)
+
+
+@register.simple_tag
+def picture(image: RealEstateImage | None, size: str, **attrs) -> str:
+    """
+    Виводить <picture> зі зменшеними копіями зображення розміру <size>:
+    WebP для браузерів, які його підтримують, та JPEG для інших.
+    Атрибути <attrs> додаються до <img>.
+    """
+    if image is None:
+        return ""
+    if not image.has_derivatives:
+        return format_html('<img src="{}"{}>', image.image.url, flatatt(attrs))
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp"><img src="{}"{}></picture>',
+        image.derivative_url(size, "webp"),
+        image.derivative_url(size),
+        flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def thumbnail(image: RealEstateImage | None, **attrs) -> str:
+    """Виводить <picture> з мініатюрою зображення (див. picture)"""
+    return picture(image, "thumbnail", **attrs)
@@ -1,10 +1,24 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
 from django.urls import reverse_lazy
 
 from accounts.models import CustomUser
+from images.derivatives import derivative_name, derivative_names, process_image
+from images.models import RealEstateImage
+from images.services import real_estate_cards
 from objects.models import Apartment
+from objects.tests import create_apartment
+from utils.model_versions import model_version, object_version
 
 
 class ImagesTest(TestCase):
@@ -108,3 +122,126 @@ class ImagesTest(TestCase):
         self.user.user_permissions.add(permission)
         self.user.save()
         self.user.refresh_from_db()
+
+
+class CoverImageTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.apartment = create_apartment(self.user)
+
+    def add_image(self, apartment, name):
+        return RealEstateImage.objects.create(image=f"images/{name}", content_object=apartment)
+
+    def test_cover_image_kept_in_sync(self):
+        self.assertIsNone(self.apartment.cover_image)
+
+        first = self.add_image(self.apartment, "first.jpg")
+        second = self.add_image(self.apartment, "second.jpg")
+        self.apartment.refresh_from_db()
+        self.assertEqual(self.apartment.cover_image, first)
+
+        first.delete()
+        self.apartment.refresh_from_db()
+        self.assertEqual(self.apartment.cover_image, second)
+
+        second.delete()
+        self.apartment.refresh_from_db()
+        self.assertIsNone(self.apartment.cover_image)
+
+    def test_cards_without_extra_queries(self):
+        for i in range(3):
+            apartment = create_apartment(self.user, house=str(i))
+            self.add_image(apartment, f"{i}_1.jpg")
+            self.add_image(apartment, f"{i}_2.jpg")
+        ContentType.objects.get_for_model(Apartment)
+
+        qs = Apartment.objects.select_related("cover_image")
+        with self.assertNumQueries(2):
+            cards = real_estate_cards(qs)
+        with self.assertNumQueries(0):
+            for card in cards:
+                images = list(card["object"].images.all())
+                self.assertEqual(card["image"], images[0] if images else None)
+        self.assertEqual(sum(len(card["object"].images.all()) for card in cards), 6)
+
+
+class ImageDerivativesTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        buffer = BytesIO()
+        Image.new("RGB", (3000, 2000), "red").save(buffer, format="JPEG")
+        upload = SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+        # індекс критеріїв власника оновлюється після коміту окремо від зображення
+        with self.captureOnCommitCallbacks(execute=True):
+            apartment = create_apartment(user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.image = RealEstateImage.objects.create(
+                image=upload, content_object=apartment
+            )
+        self.assertEqual(len(callbacks), 1)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_generate_derivatives(self):
+        self.assertEqual(self.image.derivative_url("card"), self.image.image.url)
+
+        self.assertTrue(process_image(self.image.id))
+        self.image.refresh_from_db()
+        self.assertTrue(self.image.has_derivatives)
+
+        names = derivative_names(self.image.image.name)
+        self.assertEqual(len(names), 6)
+        self.assertTrue(all(default_storage.exists(name) for name in names))
+        with default_storage.open(names[0]) as file:
+            self.assertEqual(Image.open(file).size, (200, 133))
+        with default_storage.open(names[2]) as file:
+            self.assertEqual(Image.open(file).size, (600, 400))
+        self.assertTrue(
+            self.image.derivative_url("card", "webp").endswith(".jpg_card.webp")
+        )
+
+        html = Template(
+            '{% load images_tags %}{% picture image "pdf" alt="img" %}'
+        ).render(Context({"image": self.image}))
+        self.assertIn(".jpg_pdf.webp", html)
+        self.assertIn('alt="img"', html)
+
+        html = Template(
+            '{% load images_tags %}{% thumbnail image alt="img" %}'
+        ).render(Context({"image": self.image}))
+        self.assertIn(".jpg_thumbnail.webp", html)
+        self.assertIn(".jpg_thumbnail.jpg", html)
+
+    def test_versions_bumped_after_processing(self):
+        versions = model_version(RealEstateImage), object_version(
+            Apartment, self.image.object_id
+        )
+        process_image(self.image.id)
+        # update() в обхід post_save, але кеш сторінок має інвалідуватись
+        self.assertNotEqual(model_version(RealEstateImage), versions[0])
+        self.assertNotEqual(object_version(Apartment, self.image.object_id), versions[1])
+
+    def test_names_keep_original_extension(self):
+        self.assertNotEqual(
+            derivative_name("images/photo.jpg", "card"),
+            derivative_name("images/photo.png", "card"),
+        )
+
+    def test_delete_removes_derivatives(self):
+        process_image(self.image.id)
+        names = derivative_names(self.image.image.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.image.delete()
+            # до коміту файли залишаються, бо видалення можуть відкотити
+            self.assertTrue(all(default_storage.exists(name) for name in names))
+        self.assertFalse(any(default_storage.exists(name) for name in names))
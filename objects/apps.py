@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class ObjectsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "objects"
+
+    def ready(self):
+        from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+        from handbooks.models import Client
+        from .full_text_search import create_full_text_index
+        from .models import Apartment, Commerce, House, Land
+        from .signals import (
+            remove_from_search_index,
+            update_client_criteria_index,
+            update_client_criteria_index_m2m,
+        )
+        post_migrate.connect(create_full_text_index, sender=self)
+        for model in (Apartment, Commerce, House, Land):
+            post_delete.connect(remove_from_search_index, sender=model)
+        post_save.connect(update_client_criteria_index, sender=Client)
+        for field in (
+            Client.locality, Client.locality_district, Client.street, Client.condition
+        ):
+            m2m_changed.connect(update_client_criteria_index_m2m, sender=field.through)
@@ -18,6 +18,15 @@ class RealEstateType(models.IntegerChoices):
     LAND = 4, _("Land")
 
 
+class ShowingActJobStatus(models.IntegerChoices):
+    """Статус завдання створення pdf файлу акту показу"""
+
+    PENDING = 1, _("Pending")
+    RUNNING = 2, _("Running")
+    DONE = 3, _("Done")
+    FAILED = 4, _("Failed")
+
+
 class RealEstateStatus(models.IntegerChoices):
     """Статус обʼєкта нерухомості"""
 
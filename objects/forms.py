@@ -12,7 +12,8 @@ from objects.choices import (
     ApartmentRubric,
     CommerceRubric,
     HouseRubric,
-    LandRubric
+    LandRubric,
+    RealEstateType,
 )
 
 
@@ -566,3 +567,31 @@ class HouseVerifyAddressForm(BaseVerifyAddressForm):
     housing = forms.CharField(
         error_messages={"required": _("You did not specify a housing")}
     )
+
+
+class ChangesReportFilterForm(forms.Form):
+    """Фільтри звіту змін нерухомості"""
+
+    date_from = forms.DateField(
+        label=_("Date from"),
+        widget=forms.DateInput(attrs={"class": "customtxt", "type": "date"}),
+        required=False,
+    )
+    date_to = forms.DateField(
+        label=_("Date to"),
+        widget=forms.DateInput(attrs={"class": "customtxt", "type": "date"}),
+        required=False,
+    )
+    user = forms.ModelChoiceField(
+        label=_("User"),
+        queryset=CustomUser.objects.all(),
+        required=False,
+        widget=forms.Select(attrs={"data-live-search": "true"}),
+    )
+    real_estate_type = forms.TypedChoiceField(
+        coerce=int,
+        label=_("Object type"),
+        choices=[("", "---------"), *RealEstateType.choices],
+        empty_value=None,
+        required=False,
+    )
@@ -0,0 +1,191 @@
+"""
+Повнотекстовий пошук нерухомості за адресою, коментарем та описом.
+На SQLite індекс - віртуальна таблиця FTS5, на PostgreSQL - таблиця з tsvector
+та GIN індексом. Індекс оновлюється при збереженні обʼєкта нерухомості.
+Для інших баз даних використовується пошук через icontains.
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q, QuerySet
+
+FTS_TABLE = "objects_real_estate_fts"
+
+DOCUMENT_FIELDS = (
+    "locality__district__region__region",
+    "locality__district__district",
+    "locality__locality",
+    "street__locality_district__district",
+    "street__street",
+    "house",
+    "comment",
+    "description",
+)
+
+
+def is_supported() -> bool:
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def create_full_text_index(sender, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+    """Створює таблицю повнотекстового індексу (обробник сигналу post_migrate)"""
+    db_connection = connections[using]
+    with db_connection.cursor() as cursor:
+        if db_connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "body, real_estate_type UNINDEXED, object_id UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        elif db_connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {FTS_TABLE} ("
+                "real_estate_type smallint NOT NULL, "
+                "object_id integer NOT NULL, "
+                "document tsvector NOT NULL, "
+                "PRIMARY KEY (real_estate_type, object_id))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document_idx "
+                f"ON {FTS_TABLE} USING GIN (document)"
+            )
+
+
+def document_from_values(values: dict) -> str:
+    """Складає текст документа з значень полів DOCUMENT_FIELDS"""
+    return " ".join(str(values[field]) for field in DOCUMENT_FIELDS if values.get(field))
+
+
+def sync(real_estate) -> None:
+    """Оновлює (або видаляє) документ обʼєкта нерухомості в індексі"""
+    if not is_supported():
+        return
+    if real_estate.on_delete:
+        remove(real_estate)
+        return
+
+    values = (
+        type(real_estate).objects.filter(pk=real_estate.pk).values(*DOCUMENT_FIELDS).first()
+    )
+    document = document_from_values(values)
+    remove(real_estate)
+    insert_documents([(real_estate.real_estate_type, real_estate.pk, document)])
+
+
+def remove(real_estate) -> None:
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE real_estate_type = %s AND object_id = %s",
+            [real_estate.real_estate_type, real_estate.pk],
+        )
+
+
+def sync_many(model, pks: list[int]) -> None:
+    """Оновлює (або видаляє) документи обʼєктів <pks> моделі <model> в індексі"""
+    if not is_supported() or not pks:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE real_estate_type = %s "
+            f"AND object_id IN ({', '.join(['%s'] * len(pks))})",
+            [model.real_estate_type, *pks],
+        )
+    qs = model.objects.filter(pk__in=pks, on_delete=False).values("pk", *DOCUMENT_FIELDS)
+    rows = [
+        (model.real_estate_type, values["pk"], document_from_values(values))
+        for values in qs
+    ]
+    if rows:
+        insert_documents(rows)
+
+
+def insert_documents(rows: list[tuple[int, int, str]]) -> None:
+    """Додає документи (тип нерухомості, id обʼєкта, текст) до індексу"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (real_estate_type, object_id, body) "
+                "VALUES (%s, %s, %s)",
+                rows,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (real_estate_type, object_id, document) "
+                "VALUES (%s, %s, to_tsvector('simple', %s))",
+                rows,
+            )
+
+
+def rebuild(models, batch_size: int = 1000) -> None:
+    """Повністю перебудовує індекс для всіх обʼєктів моделей <models>"""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    for model in models:
+        rows = []
+        qs = model.objects.filter(on_delete=False).values("pk", *DOCUMENT_FIELDS)
+        for values in qs.iterator(chunk_size=batch_size):
+            rows.append((model.real_estate_type, values["pk"], document_from_values(values)))
+            if len(rows) >= batch_size:
+                insert_documents(rows)
+                rows = []
+        if rows:
+            insert_documents(rows)
+
+
+def match_query(key_word: str) -> str | None:
+    """
+    Запит повнотекстового пошуку: всі слова з <key_word> як префікси
+    (синтаксис FTS5 на SQLite, to_tsquery на PostgreSQL).
+    """
+    words = re.findall(r"\w+", key_word)
+    if not words:
+        return None
+    if connection.vendor == "sqlite":
+        return " ".join(f'"{word}"*' for word in words)
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def filter_by_key_word(qs: QuerySet, real_estate_type: int, key_word: str) -> QuerySet:
+    """
+    Фільтрує нерухомість <qs> за ключовим словом та сортує за релевантністю.
+    Таблиця індексу приєднується до <qs> в тому ж запиті, тому решта фільтрів
+    та пагінація застосовуються до всіх знайдених обʼєктів.
+    Якщо база даних не підтримує повнотекстовий індекс, шукає через icontains.
+    """
+    if not is_supported():
+        condition = Q()
+        for field in DOCUMENT_FIELDS:
+            condition |= Q(**{f"{field}__icontains": key_word})
+        return qs.filter(condition)
+
+    query = match_query(key_word)
+    if query is None:
+        return qs.none()
+
+    # QuerySet.extra - єдиний спосіб приєднати таблицю, яка не є моделлю
+    table = connection.ops.quote_name(qs.model._meta.db_table)
+    where = [f"{FTS_TABLE}.object_id = {table}.id", f"{FTS_TABLE}.real_estate_type = %s"]
+    if connection.vendor == "sqlite":
+        # rank у FTS5 (bm25) тим менший, чим документ релевантніший
+        qs = qs.extra(
+            select={"fts_rank": f"{FTS_TABLE}.rank"},
+            tables=[FTS_TABLE],
+            where=[*where, f"{FTS_TABLE} MATCH %s"],
+            params=[real_estate_type, query],
+        )
+        return qs.order_by("fts_rank", "pk")
+
+    qs = qs.extra(
+        select={"fts_rank": f"ts_rank({FTS_TABLE}.document, to_tsquery('simple', %s))"},
+        select_params=[query],
+        tables=[FTS_TABLE],
+        where=[*where, f"{FTS_TABLE}.document @@ to_tsquery('simple', %s)"],
+        params=[real_estate_type, query],
+    )
+    return qs.order_by("-fts_rank", "pk")
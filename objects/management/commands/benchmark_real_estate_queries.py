@@ -0,0 +1,171 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts.models import CustomUser
+from handbooks.models import (
+    Client,
+    District,
+    FilialAgency,
+    Handbook,
+    Locality,
+    LocalityDistrict,
+    Region,
+    Street,
+)
+from objects.choices import RealEstateStatus, RealEstateType
+from objects.models import Apartment, RealEstateSearchIndex
+from objects.services import real_estate_search_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Заповнює базу тестовими квартирами та виводить EXPLAIN і час запитів "
+        "списку, вибірки та каталогу без індексів нерухомості та пошукового індексу "
+        "і з ними. "
+        "Всі зміни відкочуються після завершення."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        # SQLite не дозволяє змінювати схему всередині transaction.atomic(),
+        # якщо перевірка зовнішніх ключів увімкнена
+        with connection.constraint_checks_disabled(), transaction.atomic():
+            user, localities = self.seed(options["count"])
+            queries = self.get_queries(user, localities)
+
+            # списки шукають по RealEstateSearchIndex, вибірка та каталог - по Apartment
+            indexes = [
+                (model, index)
+                for model in (Apartment, RealEstateSearchIndex)
+                for index in model._meta.indexes
+            ]
+            with connection.schema_editor(atomic=False) as editor:
+                for model, index in indexes:
+                    editor.remove_index(model, index)
+            before = self.run_queries(queries, options["repeat"])
+
+            with connection.schema_editor(atomic=False) as editor:
+                for model, index in indexes:
+                    editor.add_index(model, index)
+            after = self.run_queries(queries, options["repeat"])
+
+            for name in queries:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                for label, results in (("before", before), ("after", after)):
+                    plan, elapsed = results[name]
+                    self.stdout.write(f"  {label}: {elapsed:.2f} ms")
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+
+            transaction.set_rollback(True)
+
+    def seed(self, count: int) -> tuple[CustomUser, list[Locality]]:
+        """Створює <count> квартир з випадковими статусом, ціною та адресою"""
+        self.stdout.write(f"Seeding {count} apartments")
+        user = CustomUser.objects.create(email="benchmark@example.com")
+        region = Region.objects.create(region="Benchmark")
+        district = District.objects.create(district="Benchmark", region=region)
+        localities = Locality.objects.bulk_create(
+            Locality(locality=f"Locality {i}", district=district) for i in range(20)
+        )
+        locality_districts = LocalityDistrict.objects.bulk_create(
+            LocalityDistrict(
+                district=f"District {i}",
+                locality=locality,
+                prefix_to_site="",
+                is_subdistrict=False,
+                new_building_district=1,
+            )
+            for i, locality in enumerate(localities)
+        )
+        streets = Street.objects.bulk_create(
+            Street(
+                street=f"Street {i}",
+                locality=locality_district.locality,
+                locality_district=locality_district,
+            )
+            for i, locality_district in enumerate(locality_districts * 10)
+        )
+        filial = FilialAgency.objects.create(
+            filial_agency="Benchmark", locality_district=locality_districts[0]
+        )
+        handbook = Handbook.objects.create(handbook="Benchmark", type=5)
+        owner = Client.objects.create(
+            email="benchmark@example.com", first_name="Benchmark", phone="0", realtor=user
+        )
+        realtors = [user] + list(
+            CustomUser.objects.bulk_create(
+                CustomUser(email=f"benchmark{i}@example.com") for i in range(20)
+            )
+        )
+
+        apartments = []
+        for i in range(count):
+            street = random.choice(streets)
+            apartments.append(
+                Apartment(
+                    locality_id=street.locality_id,
+                    street=street,
+                    house=str(i),
+                    realtor=random.choice(realtors),
+                    agency=handbook,
+                    filial=filial,
+                    owner=owner,
+                    price=random.randint(10_000, 500_000),
+                    status=random.choice(RealEstateStatus.values),
+                    apartment=str(i),
+                    living_square=random.randint(10, 100),
+                    complex=handbook,
+                    on_delete=random.random() < 0.05,
+                )
+            )
+        apartments = Apartment.objects.bulk_create(apartments, batch_size=1000)
+        # bulk_create не викликає save(), тому рядки пошукового індексу створюємо окремо
+        RealEstateSearchIndex.sync_many(
+            Apartment, [apartment.pk for apartment in apartments]
+        )
+        return user, localities
+
+    @staticmethod
+    def get_queries(user: CustomUser, localities: list[Locality]) -> dict:
+        """Запити, які відповідають фільтрам списку, вибірки та каталогу"""
+        return {
+            # як у списку квартир: "мої обʼєкти" у продажу, сортування за ціною
+            "list": real_estate_search_queryset(RealEstateType.APARTMENT).filter(
+                status__in=[RealEstateStatus.ON_SALE],
+                realtor=user,
+            ).order_by("-price", "-object_id")[:10],
+            "selection": Apartment.objects.filter(
+                status__in=(RealEstateStatus.ON_SALE, RealEstateStatus.DEPOSIT),
+                on_delete=False,
+                locality__in=localities[:2],
+                price__gte=100_000,
+                price__lte=200_000,
+            )[:10],
+            "catalog": Apartment.objects.filter(
+                on_delete=False, price__gte=100_000, price__lte=120_000
+            ).exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)[:15],
+        }
+
+    @staticmethod
+    def run_queries(queries: dict, repeat: int) -> dict[str, tuple[str, float]]:
+        """Повертає EXPLAIN та середній час виконання (мс) для кожного запиту"""
+        with connection.cursor() as cursor:
+            # оновлюємо статистику, щоб планувальник враховував нові індекси
+            cursor.execute("ANALYZE")
+
+        results = {}
+        for name, qs in queries.items():
+            plan = qs.explain()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                list(qs.all())
+            elapsed = (time.perf_counter() - start) * 1000 / repeat
+            results[name] = (plan, elapsed)
+        return results
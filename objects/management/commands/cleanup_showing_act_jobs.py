@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from objects import showing_act_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Видаляє завершені завдання актів показу, старші за "
+        "SHOWING_ACT_PDF_JOB_RETENTION секунд, та втрачені завдання разом з pdf файлами"
+    )
+
+    def handle(self, *args, **options):
+        count = showing_act_jobs.cleanup_jobs()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} showing act jobs"))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from handbooks.models import Client
+from objects import full_text_search
+from objects.choices import RealEstateStatus
+from objects.models import (
+    Apartment,
+    ClientCriteriaIndex,
+    ClientMatch,
+    Commerce,
+    House,
+    Land,
+    RealEstateSearchIndex,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Перебудовує пошуковий індекс нерухомості (RealEstateSearchIndex), "
+        "повнотекстовий індекс та індекс критеріїв клієнтів для зворотного підбору"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            RealEstateSearchIndex.objects.all().delete()
+            for model in (Apartment, Commerce, House, Land):
+                self.stdout.write(f"Indexing {model.__name__}")
+                rows = []
+                qs = model.objects.select_related("street").iterator(chunk_size=batch_size)
+                for real_estate in qs:
+                    rows.append(
+                        RealEstateSearchIndex(
+                            real_estate_type=model.real_estate_type,
+                            object_id=real_estate.id,
+                            **RealEstateSearchIndex.index_values(real_estate),
+                        )
+                    )
+                    if len(rows) >= batch_size:
+                        RealEstateSearchIndex.objects.bulk_create(rows)
+                        rows = []
+                RealEstateSearchIndex.objects.bulk_create(rows)
+
+            self.stdout.write("Rebuilding full text index")
+            full_text_search.rebuild((Apartment, Commerce, House, Land), batch_size)
+
+            self.stdout.write("Rebuilding client criteria index")
+            ClientCriteriaIndex.objects.all().delete()
+            for client in Client.objects.filter(on_delete=False).iterator(batch_size):
+                ClientCriteriaIndex.sync(client, match=False)
+
+            self.stdout.write("Matching clients")
+            for model in (Apartment, Commerce, House, Land):
+                qs = model.objects.filter(
+                    on_delete=False, status=RealEstateStatus.ON_SALE
+                ).select_related("street")
+                for real_estate in qs.iterator(batch_size):
+                    ClientMatch.sync(real_estate)
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt successfully!"))
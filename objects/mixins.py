@@ -1,10 +1,20 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
 from django.views.generic.base import ContextMixin
-from django.utils.translation import activate
+from django.utils.translation import activate, gettext as _, gettext_lazy
 
 from images.forms import RealEstateImageFormSet
 from images.models import RealEstateImage
+from utils.mixins.mixins import CSVExportMixin, KeysetPaginateMixin
+from utils.model_versions import model_version, object_version
 
-from .choices import RealEstateType
+from .choices import RealEstateStatus, RealEstateType
+from .models import RealEstateSearchIndex
 
 
 class RealEstateCreateContextMixin(ContextMixin):
@@ -69,8 +79,171 @@ class RealEstateListContextMixin(ContextMixin):
         return context
 
 
+class RealEstateKeysetPaginateMixin(KeysetPaginateMixin):
+    """
+    Пагінація за курсором для списків нерухомості (рядків пошукового індексу).
+    Для кожного поля сортування є індекс (real_estate_type, поле, object_id).
+    """
+
+    sort_fields = {
+        "id": "object_id",
+        "price": "price",
+        "locality": "locality_id",
+        "street": "street_id",
+    }
+    tie_breaker = "object_id"
+
+
+class RealEstateCSVExportMixin(CSVExportMixin):
+    """Експорт у CSV списку нерухомості (рядків пошукового індексу)"""
+
+    csv_header = (
+        gettext_lazy("Id"), gettext_lazy("Rubric"), gettext_lazy("Locality"),
+        gettext_lazy("Street"), gettext_lazy("Price"), gettext_lazy("Square"),
+        gettext_lazy("Status"), gettext_lazy("Realtor"), gettext_lazy("Exclusive"),
+        gettext_lazy("In selection"),
+    )
+    csv_fields = (
+        "real_estate_type", "object_id", "rubric", "locality__locality", "street__street",
+        "price", "square", "status", "realtor__email", "exclusive", "in_selection",
+    )
+    csv_ordering = ("object_id",)
+
+    def get_csv_rows(self, queryset):
+        # назви перекладаються тут, бо рядки пишуться вже після виходу з view
+        rubrics = {
+            (real_estate_type, value): str(label)
+            for real_estate_type, choices in RealEstateSearchIndex.RUBRIC_CHOICES.items()
+            for value, label in choices.choices
+        }
+        statuses = {value: str(label) for value, label in RealEstateStatus.choices}
+        yes_no = {True: _("Yes"), False: _("No")}
+
+        def csv_row(row):
+            (
+                real_estate_type, object_id, rubric, locality, street,
+                price, square, status, realtor, exclusive, in_selection,
+            ) = row
+            return (
+                object_id, rubrics.get((real_estate_type, rubric), rubric), locality,
+                street, price, square, statuses.get(status, status), realtor,
+                yes_no[exclusive], yes_no[in_selection],
+            )
+
+        return map(csv_row, super().get_csv_rows(queryset))
+
+
 class DefaultUserInCreateViewMixin:
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
         return kwargs
+
+
+class CatalogCacheMixin:
+    """
+    Кешує сторінки каталогу для анонімних відвідувачів.
+    Ключ - сторінка, мова, GET параметри та версії моделей з <get_cache_models>
+    (і версія самого обʼєкта для сторінки деталей), тому кеш інвалідується
+    при зміні будь-якого з них. Останню вдалу відповідь також зберігаємо окремо
+    та повертаємо її, якщо база даних недоступна.
+    """
+
+    cache_models = ()
+    cache_timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", 600)
+    # скільки зберігати останню вдалу відповідь (stale-while-revalidate/stale-if-error)
+    stale_timeout = getattr(settings, "CATALOG_CACHE_STALE_TIMEOUT", 24 * 60 * 60)
+    stale_if_error = getattr(settings, "CATALOG_CACHE_STALE_IF_ERROR", True)
+    max_age = getattr(settings, "CATALOG_CACHE_MAX_AGE", 60)
+
+    def get_cache_models(self):
+        return self.cache_models
+
+    def get_cache_object(self):
+        """(модель, pk) обʼєкта сторінки, від якого залежить кеш, або None"""
+        return None
+
+    def get_cache_key(self) -> str:
+        params = sorted(
+            (key, value)
+            for key, values in self.request.GET.lists()
+            for value in values
+            if value != ""
+        )
+        page_key = hashlib.sha1(
+            repr((self.request.path, self.kwargs.get("lang"), params)).encode()
+        ).hexdigest()
+
+        versions = [model_version(model) for model in self.get_cache_models()]
+        if (cache_object := self.get_cache_object()) is not None:
+            versions.append(object_version(*cache_object))
+        return f"catalog:{page_key}:" + ".".join(map(str, versions))
+
+    def get_stale_cache_key(self, cache_key: str) -> str:
+        return "stale-" + cache_key.rsplit(":", 1)[0]
+
+    def is_cacheable_request(self, request) -> bool:
+        if request.method not in ("GET", "HEAD"):
+            return False
+        try:
+            return not request.user.is_authenticated
+        except DatabaseError:
+            return True
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        cache_key = self.get_cache_key()
+        stale_cache_key = self.get_stale_cache_key(cache_key)
+
+        content = cache.get(cache_key)
+        if content is not None:
+            return self.cached_response(content)
+
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        except DatabaseError:
+            content = cache.get(stale_cache_key)
+            if content is None or not self.stale_if_error:
+                raise
+            return self.cached_response(content)
+
+        if response.status_code == 200:
+            cache.set(cache_key, response.content, self.cache_timeout)
+            cache.set(stale_cache_key, response.content, self.stale_timeout)
+            self.patch_cache_control(response)
+        return response
+
+    def cached_response(self, content: bytes) -> HttpResponse:
+        response = HttpResponse(content)
+        self.patch_cache_control(response)
+        return response
+
+    def patch_cache_control(self, response) -> None:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=self.max_age,
+            stale_while_revalidate=self.stale_timeout,
+            stale_if_error=self.stale_timeout,
+        )
+
+
+class RealEstateDetailCacheMixin(CatalogCacheMixin):
+    """
+    Кеш сторінки деталей обʼєкта нерухомості: залежить від самого обʼєкта
+    (та його зображень) і від довідників, які показуються у формі.
+    """
+
+    def get_cache_models(self):
+        return [
+            field.queryset.model
+            for field in self.form_class.base_fields.values()
+            if hasattr(field, "queryset")
+        ]
+
+    def get_cache_object(self):
+        return self.queryset.model, self.kwargs["pk"]
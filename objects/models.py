@@ -1,19 +1,25 @@
 import datetime
+import uuid
+from collections import defaultdict
 
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from simple_history.models import HistoricalRecords
 
 from accounts.models import CustomUser
-from handbooks.models import Client, Handbook, Locality, Street
+from estate_agency.models import ImportedModel
+from handbooks.models import Client, Handbook, Locality, LocalityDistrict, Street
 from images.models import RealEstateImage
 
+from . import full_text_search
 from .choices import RealEstateStatus, LandTarget, LandDisposition, LandRubric, HouseRubric, CommerceRubric, \
-    ApartmentRubric, RealEstateDocument, RealEstateCommunication, HouseRoomsNumberRubric
+    ApartmentRubric, RealEstateDocument, RealEstateCommunication, HouseRoomsNumberRubric, RealEstateType, \
+    ShowingActJobStatus
 
 
-class BaseRealEstate(models.Model):
+class BaseRealEstate(ImportedModel):
     """
     Базовий клас, який містить спільні поля для
     обʼєктів нерухомості: квартири, комерції та будинку.
@@ -22,6 +28,26 @@ class BaseRealEstate(models.Model):
     class Meta:
         abstract = True
         default_permissions = ()
+        # індекси під фільтри вибірки, каталогу та підбору для клієнтів
+        # (списки шукають по RealEstateSearchIndex);
+        # часткові, бо видалені обʼєкти ніде не показуються
+        indexes = [
+            models.Index(
+                fields=["status", "price"],
+                condition=models.Q(on_delete=False),
+                name="%(class)s_status_price_idx",
+            ),
+            models.Index(
+                fields=["locality", "status", "price"],
+                condition=models.Q(on_delete=False),
+                name="%(class)s_locality_status_idx",
+            ),
+            models.Index(
+                fields=["street", "status"],
+                condition=models.Q(on_delete=False),
+                name="%(class)s_street_status_idx",
+            ),
+        ]
 
     creation_date = models.DateField(
         verbose_name=_("Creation date"), default=datetime.date.today
@@ -201,12 +227,30 @@ class BaseRealEstate(models.Model):
     comment = models.TextField(verbose_name=_("Comment"), null=True, blank=True)
 
     in_selection = models.BooleanField(default=False, verbose_name=_("In selection"))
+    on_delete = models.BooleanField(default=False)
 
     images = GenericRelation(
         RealEstateImage, related_query_name="%(app_label)s_%(class)s"
     )
+    # перше зображення обʼєкта (оновлюється при зміні зображень, див. images.signals)
+    cover_image = models.ForeignKey(
+        RealEstateImage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
     history = HistoricalRecords(inherit=True)
 
+    real_estate_type = None
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        RealEstateSearchIndex.sync(self)
+        full_text_search.sync(self)
+        ClientMatch.sync(self)
+
     def delete(self):
         self.on_delete = True
         self.save()
@@ -215,6 +259,8 @@ class BaseRealEstate(models.Model):
 class Apartment(BaseRealEstate):
     """Квартира"""
 
+    real_estate_type = RealEstateType.APARTMENT
+
     class Meta(BaseRealEstate.Meta):
         """
         permissions = (
@@ -299,6 +345,8 @@ class Apartment(BaseRealEstate):
 class Commerce(BaseRealEstate):
     """Комерційна нерухомість"""
 
+    real_estate_type = RealEstateType.COMMERCE
+
     rubric = models.PositiveSmallIntegerField(
         choices=CommerceRubric.choices, verbose_name=_("Rubric"), default=CommerceRubric.RESIDENTIAL
     )
@@ -333,6 +381,8 @@ class Commerce(BaseRealEstate):
 class House(BaseRealEstate):
     """Приватний будинок"""
 
+    real_estate_type = RealEstateType.HOUSE
+
     rubric = models.PositiveSmallIntegerField(
         choices=HouseRubric.choices, verbose_name=_("Rubric"), default=HouseRubric.HOUSE
     )
@@ -361,6 +411,8 @@ class House(BaseRealEstate):
 class Land(BaseRealEstate):
     """Приватна ділянка"""
 
+    real_estate_type = RealEstateType.LAND
+
     rubric = models.PositiveSmallIntegerField(
         choices=LandRubric.choices, verbose_name=_("Rubric"), default=LandRubric.LAND
     )
@@ -384,9 +436,523 @@ class Land(BaseRealEstate):
     own_parking = models.BooleanField(default=False, verbose_name=_("Own parking"))
 
 
+# нерухомість, яка показується у списках (умова часткових індексів пошукового індексу)
+LISTED_REAL_ESTATE = ~models.Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
+
+
+class RealEstateSearchIndex(models.Model):
+    """
+    Денормалізована таблиця для пошуку нерухомості всіх типів.
+    Містить лише поля, за якими фільтруються та сортуються списки,
+    тому списки не потребують join-ів з таблицями кожного типу.
+    Рядки оновлюються при збереженні та видаленні обʼєкта нерухомості.
+    """
+
+    RUBRIC_CHOICES = {
+        RealEstateType.APARTMENT: ApartmentRubric,
+        RealEstateType.COMMERCE: CommerceRubric,
+        RealEstateType.HOUSE: HouseRubric,
+        RealEstateType.LAND: LandRubric,
+    }
+
+    real_estate_type = models.PositiveSmallIntegerField(choices=RealEstateType.choices)
+    object_id = models.PositiveIntegerField()
+
+    status = models.PositiveSmallIntegerField(choices=RealEstateStatus.choices)
+    price = models.IntegerField()
+    square = models.IntegerField(null=True, blank=True)
+    rubric = models.PositiveSmallIntegerField()
+    realtor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+    filial = models.ForeignKey(
+        "handbooks.FilialAgency", on_delete=models.CASCADE, related_name="+"
+    )
+    locality = models.ForeignKey(Locality, on_delete=models.CASCADE, related_name="+")
+    locality_district = models.ForeignKey(
+        LocalityDistrict, on_delete=models.CASCADE, related_name="+"
+    )
+    street = models.ForeignKey(Street, on_delete=models.CASCADE, related_name="+")
+    exclusive = models.BooleanField(default=False)
+    in_selection = models.BooleanField(default=False)
+    on_site = models.BooleanField(default=True)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["real_estate_type", "object_id"],
+                name="unique_real_estate_search_index",
+            ),
+        ]
+        # часткові, бо списки не показують повністю зняті обʼєкти
+        indexes = [
+            models.Index(
+                fields=["real_estate_type", "status", "price"],
+                condition=LISTED_REAL_ESTATE,
+                name="search_status_price_idx",
+            ),
+            models.Index(
+                fields=["real_estate_type", "realtor", "status"],
+                condition=LISTED_REAL_ESTATE,
+                name="search_realtor_status_idx",
+            ),
+            models.Index(
+                fields=["real_estate_type", "locality_district"],
+                condition=LISTED_REAL_ESTATE,
+                name="search_locality_district_idx",
+            ),
+            # індекси для пагінації за курсором (див. RealEstateKeysetPaginateMixin)
+            models.Index(
+                fields=["real_estate_type", "price", "object_id"],
+                condition=LISTED_REAL_ESTATE,
+                name="search_price_keyset_idx",
+            ),
+            models.Index(
+                fields=["real_estate_type", "locality", "object_id"],
+                condition=LISTED_REAL_ESTATE,
+                name="search_locality_keyset_idx",
+            ),
+            models.Index(
+                fields=["real_estate_type", "street", "object_id"],
+                condition=LISTED_REAL_ESTATE,
+                name="search_street_keyset_idx",
+            ),
+        ]
+
+    def get_rubric_display(self):
+        rubric_choices = self.RUBRIC_CHOICES.get(self.real_estate_type)
+        return dict(rubric_choices.choices).get(self.rubric, self.rubric)
+
+    @classmethod
+    def sync(cls, real_estate: BaseRealEstate) -> None:
+        """Оновлює (або видаляє) рядок індексу для обʼєкта нерухомості"""
+        if real_estate.on_delete:
+            cls.remove(real_estate)
+            return
+
+        cls.objects.update_or_create(
+            real_estate_type=real_estate.real_estate_type,
+            object_id=real_estate.id,
+            defaults=cls.index_values(real_estate),
+        )
+
+    @classmethod
+    def sync_many(cls, model: type[BaseRealEstate], pks: list[int]) -> None:
+        """Оновлює (або видаляє) рядки індексу для обʼєктів <pks> моделі <model>"""
+        cls.objects.filter(
+            real_estate_type=model.real_estate_type, object_id__in=pks
+        ).delete()
+        objects = model.objects.filter(pk__in=pks, on_delete=False)
+        cls.objects.bulk_create(
+            cls(
+                real_estate_type=model.real_estate_type,
+                object_id=real_estate.id,
+                **cls.index_values(real_estate),
+            )
+            for real_estate in objects.select_related("street")
+        )
+
+    @staticmethod
+    def index_values(real_estate: BaseRealEstate) -> dict:
+        """Повертає значення полів індексу для обʼєкта нерухомості"""
+        return {
+            "status": real_estate.status,
+            "price": real_estate.price,
+            "square": real_estate.square,
+            "rubric": real_estate.rubric,
+            "realtor_id": real_estate.realtor_id,
+            "filial_id": real_estate.filial_id,
+            "locality_id": real_estate.locality_id,
+            "locality_district_id": real_estate.street.locality_district_id,
+            "street_id": real_estate.street_id,
+            "exclusive": real_estate.exclusive,
+            "in_selection": real_estate.in_selection,
+            "on_site": real_estate.on_site,
+        }
+
+    @classmethod
+    def remove(cls, real_estate: BaseRealEstate) -> None:
+        cls.objects.filter(
+            real_estate_type=real_estate.real_estate_type, object_id=real_estate.id
+        ).delete()
+
+
+class ClientCriteriaIndex(models.Model):
+    """
+    Індекс критеріїв клієнтів для зворотного підбору (пошуку клієнтів для обʼєкта).
+    Для кожного клієнта зберігається по рядку на кожне значення найвибірковішого
+    з його критеріїв розташування: вулиці, райони або населені пункти
+    (якщо нічого не вказано - один рядок з location_kind ANY).
+    Межі ціни та поверху зберігаються як інтервали без NULL, тому пошук
+    кандидатів для обʼєкта - це кілька пошуків по індексу замість перебору клієнтів.
+    Інші критерії розташування та стан перевіряються для кандидатів окремо.
+    """
+
+    ANY = 0
+    LOCALITY = 1
+    LOCALITY_DISTRICT = 2
+    STREET = 3
+
+    MAX_VALUE = 2147483647
+
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="+")
+    object_type = models.PositiveSmallIntegerField(choices=RealEstateType.choices)
+    location_kind = models.PositiveSmallIntegerField()
+    location_id = models.PositiveIntegerField(default=0)
+    price_from = models.IntegerField()
+    price_to = models.IntegerField()
+    floor_min = models.PositiveIntegerField()
+    floor_max = models.PositiveIntegerField()
+
+    class Meta:
+        default_permissions = ()
+        indexes = [
+            models.Index(fields=["object_type", "location_kind", "location_id", "price_from"]),
+        ]
+
+    @classmethod
+    def sync(cls, client: Client, match: bool = True) -> None:
+        """
+        Перебудовує рядки індексу для клієнта, а якщо <match> - також його збіги
+        з обʼєктами в продажу (див. ClientMatch.sync_client).
+        """
+        cls.objects.filter(client=client).delete()
+        if client.on_delete:
+            ClientMatch.objects.filter(client=client).delete()
+            return
+
+        locations = {
+            location_kind: list(getattr(client, field_name).values_list("id", flat=True))
+            for location_kind, field_name in (
+                (cls.STREET, "street"),
+                (cls.LOCALITY_DISTRICT, "locality_district"),
+                (cls.LOCALITY, "locality"),
+            )
+        }
+        # критерії розташування від найвибірковішого до найзагальнішого
+        for location_kind, location_ids in locations.items():
+            if location_ids:
+                break
+        else:
+            location_kind, location_ids = cls.ANY, [0]
+
+        cls.objects.bulk_create(
+            cls(
+                client=client,
+                object_type=client.object_type,
+                location_kind=location_kind,
+                location_id=location_id,
+                price_from=client.price_from if client.price_from is not None else 0,
+                price_to=client.price_to if client.price_to is not None else cls.MAX_VALUE,
+                floor_min=client.floor_min or 0,
+                floor_max=client.floor_max if client.floor_max is not None else cls.MAX_VALUE,
+            )
+            for location_id in location_ids
+        )
+        if match:
+            ClientMatch.sync_client(client, locations)
+
+    @classmethod
+    def candidates(cls, real_estate: BaseRealEstate) -> models.QuerySet:
+        """
+        Повертає id клієнтів, які підходять під обʼєкт нерухомості
+        за типом, ціною, поверхом та хоча б одним критерієм розташування.
+        """
+        location = (
+            models.Q(location_kind=cls.ANY)
+            | models.Q(location_kind=cls.LOCALITY, location_id=real_estate.locality_id)
+            | models.Q(
+                location_kind=cls.LOCALITY_DISTRICT,
+                location_id=real_estate.street.locality_district_id,
+            )
+            | models.Q(location_kind=cls.STREET, location_id=real_estate.street_id)
+        )
+        qs = cls.objects.filter(
+            location,
+            object_type=real_estate.real_estate_type,
+            price_from__lte=real_estate.price,
+            price_to__gte=real_estate.price,
+        )
+        if real_estate.floor is None:
+            # якщо поверх невідомий, підходять лише клієнти без обмежень поверху
+            qs = qs.filter(floor_min=0, floor_max=cls.MAX_VALUE)
+        else:
+            qs = qs.filter(floor_min__lte=real_estate.floor, floor_max__gte=real_estate.floor)
+        return qs.values("client_id")
+
+
+class ClientMatch(models.Model):
+    """
+    Обʼєкт нерухомості, який підходить під критерії клієнта.
+    Оновлюється при збереженні обʼєкта нерухомості та клієнта (див. ClientCriteriaIndex).
+    """
+
+    MODEL_NAMES = {
+        RealEstateType.APARTMENT: "apartment",
+        RealEstateType.COMMERCE: "commerce",
+        RealEstateType.HOUSE: "house",
+        RealEstateType.LAND: "land",
+    }
+
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="real_estate_matches"
+    )
+    real_estate_type = models.PositiveSmallIntegerField(choices=RealEstateType.choices)
+    object_id = models.PositiveIntegerField()
+    price = models.IntegerField()
+    date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "real_estate_type", "object_id"],
+                name="unique_client_match",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["real_estate_type", "object_id"]),
+            # збіги клієнта від нових до старих (див. ClientMatchListView)
+            models.Index(fields=["client", "-date", "-id"]),
+        ]
+
+    @property
+    def model_name(self) -> str:
+        return self.MODEL_NAMES[self.real_estate_type]
+
+    @staticmethod
+    def m2m_criterion(field_name: str, value_id: int | None) -> models.Q:
+        """
+        Умова для критерію клієнта <field_name> (ManyToMany): критерій не вказаний
+        або серед його значень є <value_id>.
+        """
+        field = Client._meta.get_field(field_name)
+        related = field.remote_field.through.objects.filter(
+            **{field.m2m_field_name(): models.OuterRef("pk")}
+        )
+        return ~models.Exists(related) | models.Exists(
+            related.filter(**{f"{field.m2m_reverse_field_name()}_id": value_id})
+        )
+
+    @classmethod
+    def matching_clients(cls, real_estate: BaseRealEstate) -> models.QuerySet[Client]:
+        """Повертає клієнтів, які підходять під обʼєкт нерухомості"""
+        return Client.objects.filter(
+            cls.m2m_criterion("locality", real_estate.locality_id),
+            cls.m2m_criterion("locality_district", real_estate.street.locality_district_id),
+            cls.m2m_criterion("street", real_estate.street_id),
+            cls.m2m_criterion("condition", real_estate.condition_id),
+            id__in=ClientCriteriaIndex.candidates(real_estate),
+            on_delete=False,
+        )
+
+    @classmethod
+    def sync(cls, real_estate: BaseRealEstate) -> None:
+        """
+        Оновлює клієнтів, які підходять під обʼєкт нерухомості.
+        Шукаються лише для обʼєктів в продажу, для інших збіги видаляються.
+        """
+        if real_estate.on_delete or real_estate.status != RealEstateStatus.ON_SALE:
+            cls.remove(real_estate)
+            return
+
+        client_ids = list(cls.matching_clients(real_estate).values_list("id", flat=True))
+        matches = cls.objects.filter(
+            real_estate_type=real_estate.real_estate_type, object_id=real_estate.id
+        )
+        matches.exclude(client_id__in=client_ids).delete()
+        matches.exclude(price=real_estate.price).update(price=real_estate.price)
+        cls.objects.bulk_create(
+            [
+                cls(
+                    client_id=client_id,
+                    real_estate_type=real_estate.real_estate_type,
+                    object_id=real_estate.id,
+                    price=real_estate.price,
+                )
+                for client_id in client_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def sync_many(cls, model: type[BaseRealEstate], pks: list[int]) -> None:
+        """
+        Оновлює клієнтів, які підходять під обʼєкти <pks> моделі <model>,
+        за ті ж умови, що й sync, але кількість запитів не залежить від кількості
+        обʼєктів: рядки ClientCriteriaIndex та критерії клієнтів читаються один раз,
+        а обʼєкти перевіряються в памʼяті (для імпорту, див. fill_db).
+        """
+        real_estate_type = model.real_estate_type
+        objects = list(
+            model.objects.filter(
+                pk__in=pks, on_delete=False, status=RealEstateStatus.ON_SALE
+            ).values_list(
+                "id", "price", "floor", "locality_id", "street_id",
+                "street__locality_district_id", "condition_id",
+            )
+        )
+        rows = defaultdict(list)
+        if objects:
+            index = ClientCriteriaIndex.objects.filter(object_type=real_estate_type)
+            for client_id, location_kind, location_id, *limits in index.values_list(
+                "client_id", "location_kind", "location_id",
+                "price_from", "price_to", "floor_min", "floor_max",
+            ):
+                rows[location_kind, location_id].append((client_id, *limits))
+        client_ids = {row[0] for location_rows in rows.values() for row in location_rows}
+
+        # значення ManyToMany критеріїв клієнтів, порожня множина - критерій не вказаний
+        criteria = {}
+        for field_name in ("locality", "locality_district", "street", "condition"):
+            field = Client._meta.get_field(field_name)
+            values = defaultdict(set)
+            if client_ids:
+                for client_id, value_id in field.remote_field.through.objects.filter(
+                    **{f"{field.m2m_field_name()}_id__in": client_ids}
+                ).values_list(
+                    f"{field.m2m_field_name()}_id", f"{field.m2m_reverse_field_name()}_id"
+                ):
+                    values[client_id].add(value_id)
+            criteria[field_name] = values
+
+        matches = {}
+        for object_id, price, floor, *location, condition_id in objects:
+            locality_id, street_id, locality_district_id = location
+            values = {
+                "locality": locality_id,
+                "locality_district": locality_district_id,
+                "street": street_id,
+                "condition": condition_id,
+            }
+            for location_key in (
+                (ClientCriteriaIndex.ANY, 0),
+                (ClientCriteriaIndex.LOCALITY, locality_id),
+                (ClientCriteriaIndex.LOCALITY_DISTRICT, locality_district_id),
+                (ClientCriteriaIndex.STREET, street_id),
+            ):
+                for client_id, price_from, price_to, floor_min, floor_max in rows.get(
+                    location_key, ()
+                ):
+                    if not price_from <= price <= price_to:
+                        continue
+                    if floor is None:
+                        # якщо поверх невідомий, підходять лише клієнти без обмежень
+                        if floor_min != 0 or floor_max != ClientCriteriaIndex.MAX_VALUE:
+                            continue
+                    elif not floor_min <= floor <= floor_max:
+                        continue
+                    if all(
+                        not criteria[name][client_id]
+                        or value in criteria[name][client_id]
+                        for name, value in values.items()
+                    ):
+                        matches[client_id, object_id] = price
+
+        existing = cls.objects.filter(
+            real_estate_type=real_estate_type, object_id__in=pks
+        ).only("id", "client_id", "object_id", "price")
+        removed, repriced = [], []
+        for match in existing:
+            price = matches.pop((match.client_id, match.object_id), None)
+            if price is None:
+                removed.append(match.id)
+            elif price != match.price:
+                match.price = price
+                repriced.append(match)
+        if removed:
+            cls.objects.filter(id__in=removed).delete()
+        cls.objects.bulk_update(repriced, ["price"])
+        cls.objects.bulk_create(
+            cls(
+                client_id=client_id,
+                real_estate_type=real_estate_type,
+                object_id=object_id,
+                price=price,
+            )
+            for (client_id, object_id), price in matches.items()
+        )
+
+    @classmethod
+    def matching_real_estate(
+        cls, client: Client, locations: dict[int, list[int]]
+    ) -> models.QuerySet:
+        """
+        Повертає обʼєкти в продажу, які підходять під критерії клієнта - ті ж умови,
+        що й ClientCriteriaIndex.candidates та matching_clients, але з боку клієнта.
+        <locations> - id вулиць, районів та населених пунктів клієнта за видом.
+        """
+        model = {
+            RealEstateType.APARTMENT: Apartment,
+            RealEstateType.COMMERCE: Commerce,
+            RealEstateType.HOUSE: House,
+            RealEstateType.LAND: Land,
+        }[client.object_type]
+        qs = model.objects.filter(on_delete=False, status=RealEstateStatus.ON_SALE)
+
+        location_lookups = {
+            ClientCriteriaIndex.STREET: "street_id__in",
+            ClientCriteriaIndex.LOCALITY_DISTRICT: "street__locality_district_id__in",
+            ClientCriteriaIndex.LOCALITY: "locality_id__in",
+        }
+        for location_kind, location_ids in locations.items():
+            if location_ids:
+                qs = qs.filter(**{location_lookups[location_kind]: location_ids})
+        condition_ids = list(client.condition.values_list("id", flat=True))
+        if condition_ids:
+            qs = qs.filter(condition_id__in=condition_ids)
+
+        if client.price_from is not None:
+            qs = qs.filter(price__gte=client.price_from)
+        if client.price_to is not None:
+            qs = qs.filter(price__lte=client.price_to)
+        # без обмежень поверху підходять і обʼєкти з невідомим поверхом
+        if client.floor_min or client.floor_max is not None:
+            qs = qs.filter(floor__gte=client.floor_min or 0)
+            if client.floor_max is not None:
+                qs = qs.filter(floor__lte=client.floor_max)
+        return qs
+
+    @classmethod
+    def sync_client(cls, client: Client, locations: dict[int, list[int]]) -> None:
+        """Оновлює обʼєкти, які підходять під критерії клієнта"""
+        real_estate = dict(
+            cls.matching_real_estate(client, locations).values_list("id", "price")
+        )
+        matches = cls.objects.filter(client=client)
+        matches.exclude(
+            real_estate_type=client.object_type, object_id__in=real_estate
+        ).delete()
+        current = {match.object_id: match for match in matches.only("object_id", "price")}
+        repriced = []
+        for object_id, price in real_estate.items():
+            if object_id in current and current[object_id].price != price:
+                current[object_id].price = price
+                repriced.append(current[object_id])
+        cls.objects.bulk_update(repriced, ["price"])
+        cls.objects.bulk_create(
+            [
+                cls(
+                    client=client,
+                    real_estate_type=client.object_type,
+                    object_id=object_id,
+                    price=price,
+                )
+                for object_id, price in real_estate.items()
+                if object_id not in current
+            ]
+        )
+
+    @classmethod
+    def remove(cls, real_estate: BaseRealEstate) -> None:
+        cls.objects.filter(
+            real_estate_type=real_estate.real_estate_type, object_id=real_estate.id
+        ).delete()
+
+
 class Selection(models.Model):
     class Meta(BaseRealEstate.Meta):
         permissions = (("selection", "Selection"),)
+        indexes = []
 
     client = models.ForeignKey(Client, on_delete=models.CASCADE, verbose_name=_("Client"))
     date = models.DateField(default=datetime.date.today, verbose_name=_("Date"))
@@ -403,3 +969,33 @@ class Selection(models.Model):
     selected_lands = models.ManyToManyField(
         Land, blank=True, related_name="related_selected_lands"
     )
+
+
+class ShowingActJob(models.Model):
+    """
+    Завдання створення pdf файлу акту показу у фоновому процесі
+    (див. objects.showing_act_jobs)
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="+")
+    real_estate_type = models.PositiveSmallIntegerField(choices=RealEstateType.choices)
+    object_ids = models.JSONField()
+    pdf_type = models.PositiveSmallIntegerField()  # значення ShowingActPDFType
+    lang = models.CharField(max_length=10)
+    status = models.PositiveSmallIntegerField(
+        choices=ShowingActJobStatus.choices, default=ShowingActJobStatus.PENDING
+    )
+    file = models.FileField(upload_to="showing_acts/", null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        default_permissions = ()
+        indexes = [models.Index(fields=["status", "created"])]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (ShowingActJobStatus.DONE, ShowingActJobStatus.FAILED)
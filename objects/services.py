@@ -1,12 +1,32 @@
+import datetime
 from collections.abc import Iterable
 from typing import TypeVar
 
-from django.db.models import QuerySet
-
-from .choices import RealEstateType, RealEstateStatus, PermissionUpdateLevel
-from .models import BaseRealEstate, Apartment, Commerce, House, Selection, Land
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+
+from . import full_text_search
+from .choices import (
+    ApartmentRubric,
+    HouseRoomsNumberRubric,
+    PermissionUpdateLevel,
+    RealEstateStatus,
+    RealEstateType,
+)
+from .models import (
+    BaseRealEstate,
+    Apartment,
+    Commerce,
+    House,
+    Selection,
+    Land,
+    LISTED_REAL_ESTATE,
+    RealEstateSearchIndex,
+)
 from .forms import RealEstateSearchForm
-from accounts.models import CustomUser
+from accounts.models import CustomUser, HistoryChange
+from images.services import prefetch_real_estate_images
 
 
 T = TypeVar("T", bound=BaseRealEstate)
@@ -264,6 +284,78 @@ def can_interact_with_object(
     return p
 '''
 
+def is_empty_criterion(value) -> bool:
+    """
+    Перевіряє, чи критерій вибірки не заданий.
+    Для QuerySet перевірка виконується без запиту до бази даних.
+    """
+    if isinstance(value, QuerySet):
+        return value.query.is_empty()
+    return value is None or value == "" or value == [] or value is False
+
+
+def selection_queryset(
+    model_class: type[T],
+    criteria: dict,
+) -> QuerySet[T]:
+    """
+    Повертає нерухомість <model_class>, яка підходить під критерії вибірки клієнта
+    <criteria> (cleaned_data форми SelectionForm або відповідні поля Client).
+    Всі критерії, включно з not_first/not_last та ціною за квадратний метр,
+    перетворюються в один SQL запит.
+    """
+    qs = model_class.objects.filter(
+        status__in=(RealEstateStatus.ON_SALE, RealEstateStatus.DEPOSIT),
+        on_delete=False,
+    ).select_related("locality", "street", "house_type", "cover_image")
+
+    def get(name):
+        value = criteria.get(name)
+        return None if is_empty_criterion(value) else value
+
+    if (rooms_number := get("rooms_number")) is not None:
+        # для квартир кількість кімнат - це рубрика, для будинків - окреме поле
+        if model_class is Apartment:
+            qs = qs.filter(rubric=min(rooms_number, ApartmentRubric.MANY_ROOMS))
+        elif model_class is House:
+            qs = qs.filter(
+                rooms_number=min(rooms_number, HouseRoomsNumberRubric.FOUR_AND_MORE)
+            )
+
+    if (localities := get("locality")) is not None:
+        qs = qs.filter(locality__in=localities)
+    if (locality_districts := get("locality_district")) is not None:
+        qs = qs.filter(street__locality_district__in=locality_districts)
+    if (streets := get("street")) is not None:
+        qs = qs.filter(street__in=streets)
+    if (house := get("house")) is not None:
+        qs = qs.filter(house=house)
+
+    if (floor_min := get("floor_min")) is not None:
+        qs = qs.filter(floor__gte=floor_min)
+    if (floor_max := get("floor_max")) is not None:
+        qs = qs.filter(floor__lte=floor_max)
+    if get("not_first"):
+        qs = qs.exclude(floor=1)
+    if get("not_last"):
+        qs = qs.exclude(floor=F("storeys_number"))
+
+    if (price_from := get("price_from")) is not None:
+        qs = qs.filter(price__gte=price_from)
+    if (price_to := get("price_to")) is not None:
+        qs = qs.filter(price__lte=price_to)
+    if (square_meter_price_max := get("square_meter_price_max")) is not None:
+        qs = qs.filter(price__lte=F("square") * square_meter_price_max)
+
+    if (conditions := get("condition")) is not None:
+        qs = qs.filter(condition__in=conditions)
+
+    if (key_word := get("key_word")) is not None:
+        qs = full_text_search.filter_by_key_word(qs, model_class.real_estate_type, key_word)
+
+    return qs
+
+
 def selection_add_selected_objects(
     selection: Selection, object_type: int, *objects: BaseRealEstate
 ) -> None:
@@ -280,27 +372,95 @@ def selection_add_selected_objects(
         selection.selected_lands.add(*objects)
 
 
+def real_estate_search_queryset(
+    real_estate_type: int | None = None,
+) -> QuerySet[RealEstateSearchIndex]:
+    """
+    Повертає рядки пошукового індексу нерухомості, яка не знята повністю.
+    Якщо тип не вказано, повертаються обʼєкти всіх типів.
+    """
+    qs = RealEstateSearchIndex.objects.filter(LISTED_REAL_ESTATE)
+    if real_estate_type is not None:
+        qs = qs.filter(real_estate_type=real_estate_type)
+    return qs.select_related("locality", "street", "realtor").only(
+        "id", "real_estate_type", "object_id", "rubric", "price", "on_site",
+        "locality__locality", "street__street", "realtor__email",
+    )
+
+
+# звʼязки, які потрібні акту показу та короткому опису обʼєктів
+SHOWING_ACT_RELATED = (
+    "locality__district__region",
+    "street__locality_district",
+    "owner",
+    "house_type",
+    "layout",
+    "condition",
+    "cover_image",
+)
+
+
+def load_showing_act_objects(model_class: type[T], ids: Iterable[int]) -> list[T]:
+    """
+    Обʼєкти нерухомості для акту показу разом з усіма довідниками, адресою,
+    власником та зображеннями. Завжди два запити незалежно від кількості обʼєктів.
+    """
+    objects = model_class.objects.filter(
+        ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
+        id__in=ids,
+    ).select_related(*SHOWING_ACT_RELATED).order_by("id")
+    return prefetch_real_estate_images(objects)
+
+
+def changes_report_queryset(
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    user: CustomUser | None = None,
+    real_estate_type: int | None = None,
+) -> QuerySet[HistoryChange]:
+    """Повертає зміни полів нерухомості для звіту змін"""
+    if real_estate_type:
+        models = [real_estate_model_from_type(real_estate_type)]
+    else:
+        models = [Apartment, Commerce, House, Land]
+    content_types = ContentType.objects.get_for_models(*models).values()
+    qs = HistoryChange.objects.filter(content_type__in=content_types)
+    # межі дат як діапазон, щоб використовувався індекс за датою
+    if date_from:
+        qs = qs.filter(date__gte=start_of_day(date_from))
+    if date_to:
+        qs = qs.filter(date__lt=start_of_day(date_to + datetime.timedelta(days=1)))
+    if user:
+        qs = qs.filter(user=user)
+    return qs.select_related("user")
+
+
+def start_of_day(date: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
 def process_real_estate_search_form(
-    qs: QuerySet[BaseRealEstate],
+    qs: QuerySet[RealEstateSearchIndex],
     form: RealEstateSearchForm,
     user: CustomUser
-) -> QuerySet[BaseRealEstate]:
-    """Фільтрує нерухомість <qs> в залежності від значень полів форми <form>"""
+) -> QuerySet[RealEstateSearchIndex]:
+    """
+    Фільтрує рядки пошукового індексу нерухомості <qs>
+    в залежності від значень полів форми <form>
+    """
     if (id := form.cleaned_data.get("id")):
-        qs = qs.filter(pk=id)
+        qs = qs.filter(object_id=id)
     
     locality_district_vals = form.cleaned_data.get("locality_district")
     street_vals = form.cleaned_data.get("street")
     if street_vals:
         # якщо вказано вулиці,
         # шукаємо нерухомість лише за вулицями, без районів
-        print("streets", flush=True)
         qs = qs.filter(street__in=street_vals)
     elif locality_district_vals:
         # якщо вулиць не вказано, а райони вказано,
         # то шукаємо нерухомість за районами
-        print("locality_district", flush=True)
-        qs = qs.filter(street__locality_district__in=locality_district_vals)
+        qs = qs.filter(locality_district__in=locality_district_vals)
 
     if (price_min := form.cleaned_data.get("price_min")):
         qs = qs.filter(price__gte=price_min)
@@ -321,6 +481,6 @@ def process_real_estate_search_form(
         qs = qs.filter(exclusive=exclusive[0])
     
     if len((in_selection := form.cleaned_data.get("in_selection"))) == 1:
-        qs.filter(in_selection=in_selection[0])
+        qs = qs.filter(in_selection=in_selection[0])
 
-    return qs
\ No newline at end of file
+    return qs
@@ -0,0 +1,157 @@
+"""
+Кеш pdf файлів актів показу на диску.
+Ключ - хеш усіх вхідних даних акту (тип, обʼєкти, клієнт, рієлтор, мова, шаблон):
+версій обʼєктів та рієлтора з історії і значень полів довідників, адреси,
+власника та клієнта, які показуються в акті. Все читається з бази даних, тому ключ
+однаковий у всіх процесах, а після зміни будь-яких даних акт створюється наново,
+старий файл більше не використовується і з часом видаляється.
+Кеш переживає оновлення сервера, тому до ключа входять і FORMAT_VERSION
+та вміст шаблонів, стилів і перекладів акту.
+Розмір кешу обмежений SHOWING_ACT_PDF_CACHE_SIZE байтами, при переповненні
+видаляються файли, які найдовше не використовувались (LRU за часом зміни файлу).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Max
+from django.template import loader
+
+from utils.pdf_url_fetcher import static_path
+
+# збільшити, якщо акт змінюється не через шаблони, стилі чи переклади (наприклад, код)
+FORMAT_VERSION = 1
+TEMPLATES = ("showing_act_pdf_simple.html", "showing_act_pdf_owner_info.html")
+STYLESHEET = "css/showing_act_pdf.css"
+
+# поля повʼязаних обʼєктів, які показуються в акті (адреса, власник, довідники)
+RELATED_FIELDS = (
+    "locality__locality",
+    "street__street",
+    "owner__first_name",
+    "owner__last_name",
+    "owner__phone",
+    "house_type__handbook",
+    "layout__handbook",
+    "condition__handbook",
+)
+
+
+def cache_dir() -> str:
+    default = os.path.join(settings.BASE_DIR, "showing_act_cache")
+    return getattr(settings, "SHOWING_ACT_PDF_CACHE_DIR", default)
+
+
+def max_size() -> int:
+    return getattr(settings, "SHOWING_ACT_PDF_CACHE_SIZE", 200 * 1024 * 1024)
+
+
+@lru_cache(maxsize=64)
+def file_digest(path: str, mtime: int) -> str:
+    """Хеш вмісту файлу (<mtime> - щоб перечитати файл після зміни)"""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def assets_version(lang: str) -> list:
+    """Хеші шаблонів, стилів та перекладів мовою <lang>, з яких створюється акт"""
+    paths = [loader.get_template(name).origin.name for name in TEMPLATES]
+    paths.append(static_path(STYLESHEET))
+    for locale_path in settings.LOCALE_PATHS:
+        paths += [
+            os.path.join(locale_path, lang, "LC_MESSAGES", f"django.{extension}")
+            for extension in ("po", "mo")
+        ]
+    return [
+        file_digest(path, os.stat(path).st_mtime_ns) if os.path.exists(path) else None
+        for path in paths
+    ]
+
+
+def cache_key(model_class, object_ids, client, user, pdf_type: int, lang: str) -> str:
+    """Ключ кешу акту показу обʼєктів <object_ids> моделі <model_class>"""
+    object_ids = sorted({int(object_id) for object_id in object_ids})
+    # останній запис історії кожного обʼєкта змінюється при кожній його зміні
+    versions = list(
+        model_class.history.filter(id__in=object_ids)
+        .values("id")
+        .annotate(version=Max("history_id"))
+        .order_by("id")
+        .values_list("id", "version")
+    )
+    related = list(
+        model_class.objects.filter(id__in=object_ids)
+        .order_by("id")
+        .values_list("id", *RELATED_FIELDS)
+    )
+    user_version = user.history.aggregate(version=Max("history_id"))["version"]
+    filial = user.filials.order_by("pk").values_list("filial_agency", flat=True).first()
+    client_name = type(client).objects.filter(pk=client.pk).values_list(
+        "first_name", flat=True
+    ).first()
+    data = {
+        "model": model_class._meta.label_lower,
+        "objects": versions,
+        "related": related,
+        "client": [client.pk, client_name],
+        "user": [user.pk, user_version, filial],
+        "pdf_type": pdf_type,
+        "lang": lang,
+        "format": [FORMAT_VERSION, assets_version(lang)],
+    }
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+
+def cache_path(key: str) -> str:
+    return os.path.join(cache_dir(), f"{key}.pdf")
+
+
+def get(key: str) -> str | None:
+    """Повертає шлях до збереженого pdf файлу або None"""
+    path = cache_path(key)
+    try:
+        # час зміни файлу - час останнього використання для LRU
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def put(key: str, content: bytes) -> str:
+    """Зберігає pdf файл у кеш та видаляє старі файли, якщо кеш переповнений"""
+    os.makedirs(cache_dir(), exist_ok=True)
+    # записуємо в тимчасовий файл, щоб інший процес не прочитав файл частково
+    with tempfile.NamedTemporaryFile(
+        dir=cache_dir(), suffix=".tmp", delete=False
+    ) as file:
+        file.write(content)
+    path = cache_path(key)
+    os.replace(file.name, path)
+    evict()
+    return path
+
+
+def evict() -> None:
+    """Видаляє файли, які найдовше не використовувались, поки кеш більший за ліміт"""
+    files = []
+    for entry in os.scandir(cache_dir()):
+        if entry.name.endswith(".pdf"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_size():
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,182 @@
+"""
+Створення pdf файлів актів показу у фоновому пулі процесів.
+Запит лише створює завдання (ShowingActJob) і одразу повертає відповідь,
+а pdf рендериться в окремому процесі, тому WeasyPrint не займає веб-воркер.
+Кількість процесів та незавершених завдань (загалом і на користувача) обмежена.
+Завершені та втрачені завдання разом з їх файлами видаляються командою
+cleanup_showing_act_jobs через SHOWING_ACT_PDF_JOB_RETENTION секунд.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone, translation
+
+from . import showing_act_cache
+from .choices import ShowingActJobStatus
+from .models import ShowingActJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+class TooManyJobs(Exception):
+    """Перевищено ліміт незавершених завдань"""
+
+
+def max_jobs() -> int:
+    return getattr(settings, "SHOWING_ACT_PDF_MAX_JOBS", 20)
+
+
+def max_user_jobs() -> int:
+    return getattr(settings, "SHOWING_ACT_PDF_MAX_USER_JOBS", 3)
+
+
+def job_timeout() -> int:
+    """Через скільки секунд незавершене завдання вважається втраченим"""
+    return getattr(settings, "SHOWING_ACT_PDF_JOB_TIMEOUT", 10 * 60)
+
+
+def job_retention() -> int:
+    """Скільки секунд зберігаються завершені завдання та їх файли"""
+    return getattr(settings, "SHOWING_ACT_PDF_JOB_RETENTION", 24 * 60 * 60)
+
+
+def active_jobs():
+    """Незавершені завдання (без втрачених, наприклад, через перезапуск сервера)"""
+    return ShowingActJob.objects.filter(
+        status__in=(ShowingActJobStatus.PENDING, ShowingActJobStatus.RUNNING),
+        created__gte=timezone.now() - timedelta(seconds=job_timeout()),
+    )
+
+
+def create_job(
+    user, client, real_estate_type: int, object_ids, pdf_type: int, lang: str
+) -> ShowingActJob:
+    """
+    Створює завдання (<pdf_type> - значення ShowingActPDFType)
+    та додає його в пул процесів після коміту транзакції.
+    Якщо ліміти незавершених завдань перевищено, піднімає TooManyJobs.
+    """
+    with transaction.atomic():
+        # блокуємо користувача та незавершені завдання, щоб паралельні запити
+        # перевіряли ліміти по черзі і бачили щойно створені завдання
+        list(type(user).objects.select_for_update().filter(pk=user.pk).values("pk"))
+        jobs = active_jobs()
+        list(jobs.select_for_update().values("pk"))
+        if jobs.filter(user=user).count() >= max_user_jobs():
+            raise TooManyJobs("Too many showing act jobs for the user")
+        if jobs.count() >= max_jobs():
+            raise TooManyJobs("Too many showing act jobs")
+
+        job = ShowingActJob.objects.create(
+            user=user,
+            client=client,
+            real_estate_type=real_estate_type,
+            object_ids=[int(object_id) for object_id in object_ids],
+            pdf_type=pdf_type,
+            lang=lang,
+        )
+        transaction.on_commit(
+            lambda: get_executor().submit(render_job_in_worker, job.pk)
+        )
+    return job
+
+
+def cleanup_jobs() -> int:
+    """
+    Видаляє завершені завдання, старші за job_retention(), та втрачені завдання
+    разом з їх pdf файлами. Повертає кількість видалених завдань.
+    """
+    now = timezone.now()
+    expired = ShowingActJob.objects.filter(
+        Q(
+            status__in=(ShowingActJobStatus.DONE, ShowingActJobStatus.FAILED),
+            finished__lt=now - timedelta(seconds=job_retention()),
+        )
+        | Q(
+            status__in=(ShowingActJobStatus.PENDING, ShowingActJobStatus.RUNNING),
+            created__lt=now - timedelta(seconds=max(job_timeout(), job_retention())),
+        )
+    )
+    with transaction.atomic():
+        jobs = list(expired.only("pk", "file"))
+        ShowingActJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        # файли видаляємо лише після коміту, щоб не втратити їх при відкаті
+        names = [job.file.name for job in jobs if job.file]
+        transaction.on_commit(lambda: delete_files(names))
+    return len(jobs)
+
+
+def delete_files(names: list[str]) -> None:
+    for name in names:
+        ShowingActJob._meta.get_field("file").storage.delete(name)
+
+
+def render_job(job_id) -> None:
+    """Створює pdf файл завдання <job_id>"""
+    from utils.showing_act_pdf_service import ShowingActPDFService, ShowingActPDFType
+
+    from .services import load_showing_act_objects, real_estate_model_from_type
+
+    job = ShowingActJob.objects.select_related("user", "client").get(pk=job_id)
+    job.status = ShowingActJobStatus.RUNNING
+    job.save(update_fields=["status"])
+
+    model_class = real_estate_model_from_type(job.real_estate_type)
+    key = showing_act_cache.cache_key(
+        model_class, job.object_ids, job.client, job.user, job.pdf_type, job.lang
+    )
+    if path := showing_act_cache.get(key):
+        with open(path, "rb") as file:
+            content = file.read()
+    else:
+        objects = load_showing_act_objects(model_class, job.object_ids)
+        with translation.override(job.lang):
+            buffer = ShowingActPDFService().generate(
+                ShowingActPDFType(job.pdf_type), job.user, job.client, objects
+            )
+        content = buffer.read()
+        showing_act_cache.put(key, content)
+    job.file.save(f"{job.pk}.pdf", ContentFile(content), save=False)
+    job.status = ShowingActJobStatus.DONE
+    job.finished = timezone.now()
+    job.save(update_fields=["file", "status", "finished"])
+
+
+def render_job_in_worker(job_id) -> None:
+    """Виконує render_job у процесі пулу, помилку зберігає в завданні"""
+    try:
+        render_job(job_id)
+    except Exception as error:
+        logger.exception("Cannot render showing act job %s", job_id)
+        ShowingActJob.objects.filter(pk=job_id).update(
+            status=ShowingActJobStatus.FAILED, error=str(error), finished=timezone.now()
+        )
+    finally:
+        connections.close_all()
+
+
+def init_worker() -> None:
+    import django
+
+    django.setup()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, щоб процеси не успадковували зʼєднання з базою веб-воркера
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(settings, "SHOWING_ACT_PDF_WORKERS", 2),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+    return _executor
@@ -0,0 +1,61 @@
+def remove_from_search_index(sender, instance, **kwargs):
+    from . import full_text_search
+    from .models import ClientMatch, RealEstateSearchIndex
+
+    RealEstateSearchIndex.remove(instance)
+    full_text_search.remove(instance)
+    ClientMatch.remove(instance)
+
+
+class SyncClientCriteria:
+    """Перебудова індексу критеріїв клієнтів після коміту, один раз на клієнта"""
+
+    def __init__(self):
+        self.client_pks = set()
+        self.done = False
+
+    def __call__(self):
+        from handbooks.models import Client
+        from .models import ClientCriteriaIndex
+
+        self.done = True
+        for client in Client.objects.filter(pk__in=self.client_pks):
+            ClientCriteriaIndex.sync(client)
+
+
+def schedule_client_criteria_sync(client_pks) -> None:
+    """
+    Додає клієнтів до перебудови після коміту транзакції. Збереження клієнта
+    та кожне його ManyToMany поле потрапляють в одну перебудову.
+    """
+    from django.db import transaction
+
+    connection = transaction.get_connection()
+    pending = next(
+        (
+            func for _, func, _ in connection.run_on_commit
+            if isinstance(func, SyncClientCriteria) and not func.done
+        ),
+        None,
+    )
+    if pending is None:
+        pending = SyncClientCriteria()
+        pending.client_pks.update(client_pks)
+        # поза транзакцією виконується одразу
+        transaction.on_commit(pending)
+    else:
+        pending.client_pks.update(client_pks)
+
+
+def update_client_criteria_index(sender, instance, **kwargs):
+    schedule_client_criteria_sync([instance.pk])
+
+
+def update_client_criteria_index_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """Перебудовує індекс критеріїв та збіги при зміні розташування чи стану у клієнта"""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_client_criteria_sync([instance.pk])
+    elif pk_set:
+        schedule_client_criteria_sync(pk_set)
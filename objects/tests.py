@@ -1,10 +1,104 @@
+import csv
+import datetime
+import io
+import os
+import tempfile
+
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.core import checks
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.template import loader
+from django.test import RequestFactory, TestCase, override_settings
+from django.views import View
 from django.urls import reverse_lazy
+from django.utils import timezone
+
+from accounts.models import CustomUser, HistoryChange
+from handbooks.choices import ClientStatusType, IncomeSourceType, RealtorType
+from handbooks.forms import ClientForm
+from handbooks.models import (
+    Client,
+    District,
+    FilialAgency,
+    Handbook,
+    Locality,
+    LocalityDistrict,
+    Region,
+    Street,
+)
+from objects import full_text_search, showing_act_cache, showing_act_jobs
+from objects.choices import RealEstateStatus, RealEstateType, ShowingActJobStatus
+from images.models import RealEstateImage
+from objects.mixins import (
+    CatalogCacheMixin,
+    RealEstateCSVExportMixin,
+    RealEstateDetailCacheMixin,
+    RealEstateKeysetPaginateMixin,
+)
+from objects.forms import ApartmentForm
+from objects.models import (
+    Apartment,
+    ClientCriteriaIndex,
+    ClientMatch,
+    Land,
+    RealEstateSearchIndex,
+    ShowingActJob,
+)
+from objects.services import (
+    changes_report_queryset,
+    load_showing_act_objects,
+    real_estate_search_queryset,
+    selection_queryset,
+)
+from utils import pdf_url_fetcher
+from utils.mixins.mixins import CSVExportMixin, KeysetPaginateMixin
+from utils.model_versions import check_shared_cache
 
-from accounts.models import CustomUser
-from objects.models import Apartment
+
+def create_apartment(user: CustomUser, **kwargs) -> Apartment:
+    """Створює квартиру разом з усіма обовʼязковими довідниками"""
+    region = Region.objects.create(region="Region")
+    district = District.objects.create(district="District", region=region)
+    locality = Locality.objects.create(locality="Locality", district=district)
+    locality_district = LocalityDistrict.objects.create(
+        district="Locality district",
+        locality=locality,
+        prefix_to_site="",
+        is_subdistrict=False,
+        new_building_district=1,
+    )
+    street = Street.objects.create(
+        street="Street", locality=locality, locality_district=locality_district
+    )
+    filial = FilialAgency.objects.create(
+        filial_agency="Filial", locality_district=locality_district
+    )
+    handbook = Handbook.objects.create(handbook="Handbook", type=5)
+    owner = Client.objects.create(
+        email="client@gmail.com", first_name="Client", phone="050", realtor=user
+    )
+    data = {
+        "locality": locality,
+        "street": street,
+        "house": "1",
+        "realtor": user,
+        "agency": handbook,
+        "filial": filial,
+        "owner": owner,
+        "price": 1000,
+        "status": RealEstateStatus.ON_SALE,
+        "apartment": "1",
+        "living_square": 10,
+        "complex": handbook,
+    }
+    data.update(kwargs)
+    return Apartment.objects.create(**data)
 
 
 class ObjectsTest(TestCase):
@@ -129,3 +223,868 @@ class ObjectsTest(TestCase):
         self.user.user_permissions.add(permission)
         self.user.save()
         self.user.refresh_from_db()
+
+
+class RealEstateSearchIndexTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.apartment = create_apartment(self.user)
+
+    def get_index_row(self):
+        return RealEstateSearchIndex.objects.get(
+            real_estate_type=RealEstateType.APARTMENT, object_id=self.apartment.id
+        )
+
+    def test_index_row_created_on_save(self):
+        row = self.get_index_row()
+        self.assertEqual(row.price, 1000)
+        self.assertEqual(row.locality_district_id, self.apartment.street.locality_district_id)
+
+    def test_index_row_updated_on_save(self):
+        self.apartment.price = 2000
+        self.apartment.save()
+        self.assertEqual(self.get_index_row().price, 2000)
+
+    def test_index_row_removed_on_delete(self):
+        self.apartment.delete()
+        self.assertFalse(RealEstateSearchIndex.objects.exists())
+
+
+class RealEstateKeysetPaginateTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        # дві квартири з однаковою ціною, щоб перевірити стабільність порядку
+        prices = [500, 100, 300, 300, 200, 400, 600]
+        self.apartments = [create_apartment(self.user, price=price) for price in prices]
+
+    def paginate(self, **params):
+        view = RealEstateKeysetPaginateMixin()
+        view.request = RequestFactory().get("/", params)
+        qs = real_estate_search_queryset(RealEstateType.APARTMENT)
+        _, page, object_list, _ = view.paginate_queryset(qs, 3)
+        return page, [row.price for row in object_list]
+
+    def test_forward_and_backward(self):
+        page, prices = self.paginate(sort="price", direction="s")
+        self.assertEqual(prices, [100, 200, 300])
+        self.assertFalse(page.has_previous())
+
+        page, prices = self.paginate(sort="price", direction="s", cursor=page.next_cursor)
+        self.assertEqual(prices, [300, 400, 500])
+
+        next_page, prices = self.paginate(
+            sort="price", direction="s", cursor=page.next_cursor
+        )
+        self.assertEqual(prices, [600])
+        self.assertFalse(next_page.has_next())
+
+        page, prices = self.paginate(
+            sort="price", direction="s", cursor=next_page.previous_cursor
+        )
+        self.assertEqual(prices, [300, 400, 500])
+        self.assertTrue(page.has_previous())
+
+    def test_descending_and_unknown_sort(self):
+        _, prices = self.paginate(sort="price", direction="d")
+        self.assertEqual(prices, [600, 500, 400])
+
+        # невідоме поле сортування ігнорується, сортуємо за id обʼєкта
+        _, prices = self.paginate(sort="comment", direction="s")
+        self.assertEqual(prices, [500, 100, 300])
+
+    def test_invalid_cursor_returns_first_page(self):
+        _, prices = self.paginate(sort="price", direction="s", cursor="invalid")
+        self.assertEqual(prices, [100, 200, 300])
+
+
+class FullTextSearchTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.first = create_apartment(self.user, comment="Ремонт, вид на море")
+        self.second = create_apartment(self.user, comment="Потрібен ремонт")
+
+    def search(self, key_word):
+        return list(
+            full_text_search.filter_by_key_word(
+                Apartment.objects.all(), RealEstateType.APARTMENT, key_word
+            )
+        )
+
+    def test_search_by_prefix(self):
+        self.assertEqual(set(self.search("ремон")), {self.first, self.second})
+        self.assertEqual(self.search("море"), [self.first])
+        self.assertEqual(set(self.search("Street Locality")), {self.first, self.second})
+        self.assertEqual(self.search("ремонт море"), [self.first])
+
+    def test_combined_with_filters(self):
+        self.second.price = 2000
+        self.second.save()
+        qs = full_text_search.filter_by_key_word(
+            Apartment.objects.filter(price__gte=1500), RealEstateType.APARTMENT, "ремонт"
+        )
+        self.assertEqual(list(qs), [self.second])
+        self.assertEqual(qs.count(), 1)
+        # знайдені обʼєкти можна пересортувати та розбити на сторінки
+        self.assertEqual(
+            list(
+                full_text_search.filter_by_key_word(
+                    Apartment.objects.all(), RealEstateType.APARTMENT, "ремонт"
+                ).order_by("-price")[:1]
+            ),
+            [self.second],
+        )
+
+    def test_index_updated_on_save(self):
+        self.second.comment = "Вид на море"
+        self.second.save()
+        self.assertEqual(set(self.search("море")), {self.first, self.second})
+
+    def test_index_updated_on_delete(self):
+        self.first.delete()
+        self.assertEqual(self.search("море"), [])
+
+
+class SelectionQuerysetTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.first_floor = create_apartment(
+            self.user, floor=1, storeys_number=9, square=50, price=50000, rubric=1
+        )
+        self.middle_floor = create_apartment(
+            self.user, floor=5, storeys_number=9, square=50, price=100000, rubric=2
+        )
+        self.last_floor = create_apartment(
+            self.user, floor=9, storeys_number=9, square=100, price=100000, rubric=4
+        )
+
+    def select(self, **criteria):
+        return set(selection_queryset(Apartment, criteria))
+
+    def test_floor_criteria(self):
+        self.assertEqual(self.select(not_first=True), {self.middle_floor, self.last_floor})
+        self.assertEqual(self.select(not_last=True), {self.first_floor, self.middle_floor})
+        self.assertEqual(self.select(not_first=True, not_last=True), {self.middle_floor})
+        self.assertEqual(self.select(floor_min=2, floor_max=8), {self.middle_floor})
+
+    def test_price_criteria(self):
+        self.assertEqual(
+            self.select(price_from=60000, price_to=100000),
+            {self.middle_floor, self.last_floor},
+        )
+        # ціна за квадратний метр: 1000, 2000 та 1000
+        self.assertEqual(
+            self.select(square_meter_price_max=1000), {self.first_floor, self.last_floor}
+        )
+
+    def test_rooms_and_location_criteria(self):
+        self.assertEqual(self.select(rooms_number=6), {self.last_floor})
+        self.assertEqual(
+            self.select(
+                locality=Locality.objects.filter(pk=self.middle_floor.locality_id),
+                street=Street.objects.none(),
+            ),
+            {self.middle_floor},
+        )
+        self.assertEqual(
+            self.select(locality_district=[self.first_floor.street.locality_district]),
+            {self.first_floor},
+        )
+
+    def test_not_for_sale_excluded(self):
+        self.middle_floor.status = RealEstateStatus.SOLD
+        self.middle_floor.save()
+        self.last_floor.delete()
+        self.assertEqual(self.select(), {self.first_floor})
+
+    def test_constant_number_of_queries(self):
+        criteria = {
+            "locality": Locality.objects.all(),
+            "not_first": True,
+            "not_last": True,
+            "price_to": 1000000,
+            "square_meter_price_max": 5000,
+        }
+        with self.assertNumQueries(1):
+            self.assertEqual(len(selection_queryset(Apartment, criteria)), 1)
+
+        for i in range(10):
+            create_apartment(self.user, floor=2, storeys_number=5, square=50)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(selection_queryset(Apartment, criteria)), 11)
+
+
+class ClientMatchTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.apartment = create_apartment(self.user, floor=3, price=50000)
+        # власник квартири не шукає нерухомість
+        ClientCriteriaIndex.objects.all().delete()
+        ClientMatch.objects.all().delete()
+
+    def create_client(self, **kwargs):
+        data = {
+            "email": "buyer@gmail.com",
+            "first_name": "Buyer",
+            "phone": "067",
+            "realtor": self.user,
+            "object_type": RealEstateType.APARTMENT,
+        }
+        data.update(kwargs)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Client.objects.create(**data)
+
+    def committed(self):
+        """Індекс критеріїв клієнтів перебудовується після коміту"""
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def matched_clients(self):
+        return set(
+            ClientMatch.objects.filter(object_id=self.apartment.id).values_list(
+                "client_id", flat=True
+            )
+        )
+
+    def test_match_on_save(self):
+        matching = self.create_client(price_from=40000, price_to=60000, floor_min=2)
+        with self.committed():
+            matching.locality.add(self.apartment.locality)
+        too_cheap = self.create_client(price_to=30000)
+        wrong_street = self.create_client()
+        with self.committed():
+            wrong_street.street.add(
+                Street.objects.create(
+                    street="Other", locality=self.apartment.locality,
+                    locality_district=self.apartment.street.locality_district,
+                )
+            )
+        wrong_type = self.create_client(object_type=RealEstateType.HOUSE)
+
+        self.apartment.save()
+        self.assertEqual(self.matched_clients(), {matching.id})
+        self.assertNotIn(too_cheap.id, self.matched_clients())
+        self.assertNotIn(wrong_type.id, self.matched_clients())
+
+    def test_location_criteria_combined(self):
+        client = self.create_client()
+        with self.committed():
+            client.street.add(self.apartment.street)
+            client.locality_district.add(self.apartment.street.locality_district)
+        self.assertEqual(
+            ClientCriteriaIndex.objects.get(client=client).location_kind,
+            ClientCriteriaIndex.STREET,
+        )
+        self.apartment.save()
+        self.assertEqual(self.matched_clients(), {client.id})
+
+        other_locality = Locality.objects.create(
+            locality="Other", district=self.apartment.locality.district
+        )
+        with self.committed():
+            client.locality.add(other_locality)
+        self.apartment.save()
+        self.assertEqual(self.matched_clients(), set())
+
+    def test_reprice_and_status(self):
+        client = self.create_client(price_to=60000)
+        self.apartment.save()
+        self.assertEqual(self.matched_clients(), {client.id})
+
+        self.apartment.price = 70000
+        self.apartment.save()
+        self.assertEqual(self.matched_clients(), set())
+
+        self.apartment.price = 55000
+        self.apartment.save()
+        self.assertEqual(ClientMatch.objects.get(client=client).price, 55000)
+
+        self.apartment.status = RealEstateStatus.SOLD
+        self.apartment.save()
+        self.assertEqual(self.matched_clients(), set())
+
+    def test_match_on_client_change(self):
+        client = self.create_client(price_to=40000)
+        self.assertFalse(client.real_estate_matches.exists())
+
+        client.price_to = 60000
+        with self.committed():
+            client.save()
+        self.assertEqual(
+            list(client.real_estate_matches.values_list("object_id", "price")),
+            [(self.apartment.id, 50000)],
+        )
+
+        other_locality = Locality.objects.create(
+            locality="Other", district=self.apartment.locality.district
+        )
+        with self.committed():
+            client.locality.add(other_locality)
+        self.assertFalse(client.real_estate_matches.exists())
+
+        with self.committed():
+            client.locality.add(self.apartment.locality)
+        self.assertEqual(client.real_estate_matches.count(), 1)
+
+        client.on_delete = True
+        with self.committed():
+            client.save()
+        self.assertFalse(client.real_estate_matches.exists())
+
+    def test_client_form_rebuilds_once(self):
+        client = self.create_client()
+        form = ClientForm(
+            {
+                "email": client.email, "first_name": "Buyer", "phone": "067",
+                "income_source": IncomeSourceType.choices[0][0],
+                "object_type": RealEstateType.APARTMENT,
+                "realtor_type": RealtorType.choices[0][0],
+                "realtor": self.user.pk,
+                "status": ClientStatusType.choices[0][0],
+                "price_to": 60000,
+                "locality": [self.apartment.locality_id],
+                "locality_district": [self.apartment.street.locality_district_id],
+                "street": [self.apartment.street_id],
+            },
+            instance=client,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        # збереження клієнта та трьох ManyToMany - одна перебудова після коміту
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            form.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(callbacks[0].client_pks, {client.pk})
+        self.assertEqual(
+            list(client.real_estate_matches.values_list("object_id", flat=True)),
+            [self.apartment.id],
+        )
+
+    def test_sync_many_matches_sync(self):
+        with self.committed():
+            other = create_apartment(self.user, floor=None, price=70000)
+        ClientCriteriaIndex.objects.filter(client=other.owner).delete()
+        self.create_client(price_from=40000, price_to=60000, floor_min=2)
+        self.create_client(email="b@gmail.com", floor_max=2)
+        with self.committed():
+            self.create_client(email="c@gmail.com").street.add(other.street)
+            self.create_client(email="d@gmail.com").condition.add(Handbook.objects.first())
+            self.create_client(email="e@gmail.com").locality.add(self.apartment.locality)
+        self.create_client(email="f@gmail.com", object_type=RealEstateType.HOUSE)
+
+        def matches():
+            return set(ClientMatch.objects.values_list("client_id", "object_id", "price"))
+
+        for real_estate in (self.apartment, other):
+            ClientMatch.sync(real_estate)
+        expected = matches()
+        self.assertTrue(expected)
+
+        ClientMatch.objects.all().delete()
+        ClientMatch.sync_many(Apartment, [self.apartment.id, other.id])
+        self.assertEqual(matches(), expected)
+
+        Apartment.objects.filter(pk=other.pk).update(price=80000)
+        ClientMatch.sync_many(Apartment, [self.apartment.id, other.id])
+        self.assertEqual(
+            matches(), {(c, o, 80000 if o == other.id else p) for c, o, p in expected}
+        )
+
+    def test_client_matches_list(self):
+        client = self.create_client()
+        ClientMatch.objects.bulk_create(
+            ClientMatch(
+                client=client,
+                real_estate_type=RealEstateType.APARTMENT,
+                object_id=self.apartment.id + i,
+                price=1000,
+            )
+            for i in range(1, 15)
+        )
+        self.user.user_permissions.add(Permission.objects.get(codename="selection"))
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse_lazy(
+                "objects:client_matches", kwargs={"lang": "en", "client_id": client.id}
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["object_list"]), 10)
+        self.assertTrue(response.context["page_obj"].has_next())
+
+    def test_constant_number_of_queries(self):
+        self.create_client()
+        with self.assertNumQueries(4):
+            ClientMatch.sync(self.apartment)
+
+        for i in range(20):
+            client = self.create_client(email=f"buyer{i}@gmail.com", price_to=100000)
+            with self.committed():
+                client.locality.add(self.apartment.locality)
+        with self.assertNumQueries(4):
+            ClientMatch.sync(self.apartment)
+        self.assertEqual(len(self.matched_clients()), 21)
+
+
+class CatalogCacheTest(TestCase):
+    class CatalogView(CatalogCacheMixin, View):
+        cache_models = (Apartment, RealEstateImage)
+        calls = 0
+        error = False
+
+        def get(self, request, *args, **kwargs):
+            type(self).calls += 1
+            if self.error:
+                raise OperationalError()
+            return HttpResponse(f"{type(self).calls}")
+
+    class DetailView(RealEstateDetailCacheMixin, CatalogView):
+        queryset = Apartment.objects.all()
+        form_class = ApartmentForm
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.apartment = create_apartment(self.user)
+        self.CatalogView.calls = 0
+        self.CatalogView.error = False
+
+    def get(self, view_class, url="/en/catalog/", user=None, **kwargs):
+        request = self.factory.get(url)
+        request.user = user or AnonymousUser()
+        return view_class.as_view()(request, lang="en", **kwargs).content
+
+    def test_requires_shared_cache(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES=locmem, DEBUG=False):
+            self.assertEqual(
+                [error.id for error in check_shared_cache(None)], ["utils.E001"]
+            )
+            self.assertIsInstance(check_shared_cache(None)[0], checks.Error)
+
+    def test_cached_by_params(self):
+        self.assertEqual(self.get(self.CatalogView), b"1")
+        self.assertEqual(self.get(self.CatalogView), b"1")
+        self.assertEqual(self.get(self.CatalogView, "/en/catalog/?page=2"), b"2")
+        # порядок та порожні параметри не впливають на ключ
+        self.assertEqual(self.get(self.CatalogView, "/en/catalog/?street=&page=2"), b"2")
+        self.assertEqual(self.get(self.CatalogView, "/en/catalog/", user=self.user), b"3")
+
+    def test_invalidated_on_change(self):
+        self.assertEqual(self.get(self.CatalogView), b"1")
+        self.apartment.price = 2000
+        self.apartment.save()
+        self.assertEqual(self.get(self.CatalogView), b"2")
+
+    def test_detail_invalidated_by_own_object(self):
+        other = create_apartment(self.user)
+        self.assertEqual(self.get(self.DetailView, pk=self.apartment.pk), b"1")
+        self.assertEqual(self.get(self.DetailView, pk=other.pk), b"2")
+
+        RealEstateImage.objects.create(image="images/a.jpg", content_object=self.apartment)
+        self.assertEqual(self.get(self.DetailView, pk=self.apartment.pk), b"3")
+        self.assertEqual(self.get(self.DetailView, pk=other.pk), b"2")
+
+    def test_stale_response_on_database_error(self):
+        self.assertEqual(self.get(self.CatalogView), b"1")
+        self.apartment.save()
+        self.CatalogView.error = True
+        self.assertEqual(self.get(self.CatalogView), b"1")
+        with self.assertRaises(OperationalError):
+            self.get(self.CatalogView, "/en/catalog/?page=3")
+
+
+class ChangesReportTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.other_user = CustomUser.objects.create_user(
+            email="otheruser@gmail.com", password="secretpassword"
+        )
+        self.apartment = create_apartment(self.user)
+        self.land = Land.objects.create(
+            locality=self.apartment.locality,
+            street=self.apartment.street,
+            house="2",
+            realtor=self.user,
+            agency=self.apartment.agency,
+            filial=self.apartment.filial,
+            owner=self.apartment.owner,
+            price=500,
+            status=RealEstateStatus.ON_SALE,
+            target=1,
+            disposition=1,
+        )
+        self.apartment._history_user = self.user
+        self.apartment.price = 2000
+        self.apartment.save()
+        self.land._history_user = self.other_user
+        self.land.price = 700
+        self.land.save()
+
+    def test_changes_are_recorded_with_history(self):
+        old_street = self.apartment.street
+        street = Street.objects.create(
+            street="New street",
+            locality=old_street.locality,
+            locality_district=old_street.locality_district,
+        )
+        self.apartment.street = street
+        self.apartment.save()
+
+        changes = {
+            change.field: change for change in HistoryChange.for_object(self.apartment)
+        }
+        self.assertEqual(set(changes), {"price", "street"})
+        self.assertEqual(changes["price"].old_value, "1000")
+        self.assertEqual(changes["price"].new_value, "2000")
+        self.assertEqual(changes["price"].user, self.user)
+        self.assertEqual(changes["price"].verbose_field, "Price")
+        self.assertEqual(changes["street"].old_value, str(old_street))
+        self.assertEqual(changes["street"].new_value, str(street))
+
+    def test_filters(self):
+        changes = changes_report_queryset(user=self.other_user)
+        self.assertEqual([change.model_name for change in changes], ["land"])
+
+        changes = changes_report_queryset(real_estate_type=RealEstateType.APARTMENT)
+        self.assertEqual([change.object_id for change in changes], [self.apartment.id])
+
+        today = timezone.localdate()
+        changes = changes_report_queryset(date_from=today, date_to=today)
+        self.assertEqual(changes.count(), 2)
+        yesterday = today - datetime.timedelta(days=1)
+        self.assertFalse(changes_report_queryset(date_to=yesterday).exists())
+
+    def test_pagination_by_date(self):
+        HistoryChange.objects.update(date=timezone.now())  # однакові дати
+        view = KeysetPaginateMixin()
+        view.sort_fields = {"date": "date"}
+        qs = changes_report_queryset()
+        expected = list(qs.order_by("-date", "-id"))
+
+        changes, cursor = [], None
+        while True:
+            params = {"sort": "date", "direction": "d", "cursor": cursor or ""}
+            view.request = RequestFactory().get("/", params)
+            _, page, object_list, _ = view.paginate_queryset(qs, 1)
+            changes += object_list
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(changes, expected)
+
+        params = {"sort": "date", "direction": "d", "cursor": page.previous_cursor}
+        view.request = RequestFactory().get("/", params)
+        _, _, object_list, _ = view.paginate_queryset(qs, 1)
+        self.assertEqual(object_list, expected[-2:-1])
+
+
+class RealEstateCSVExportTest(TestCase):
+    class ExportView(RealEstateCSVExportMixin, View):
+        csv_chunk_size = 2
+
+        def get_queryset(self):
+            return real_estate_search_queryset(RealEstateType.APARTMENT)
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.apartments = [
+            create_apartment(self.user, price=price) for price in range(1, 6)
+        ]
+
+    def test_export(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        response = self.ExportView.as_view()(request, lang="en")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+
+        # рядки читаються одним запитом частинами по csv_chunk_size
+        with self.assertNumQueries(1):
+            content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content.lstrip("\ufeff"))))
+        self.assertEqual(rows[0][:5], ["Id", "Rubric", "Locality", "Street", "Price"])
+        self.assertEqual(
+            [row[0] for row in rows[1:]],
+            [str(apartment.id) for apartment in self.apartments],
+        )
+        rubric = self.apartments[0].get_rubric_display()
+        self.assertEqual(rows[1][1:7], [rubric, "Locality", "Street", "1", "", "On sale"])
+
+    def test_formulas_escaped(self):
+        Street.objects.update(street="=HYPERLINK(\"http://example.com\")")
+        request = RequestFactory().get("/")
+        request.user = self.user
+        response = self.ExportView.as_view()(request, lang="en")
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content.lstrip("\ufeff"))))
+        self.assertEqual(rows[1][3], "'=HYPERLINK(\"http://example.com\")")
+        # числа не змінюються
+        self.assertEqual(rows[1][4], "1")
+
+    def test_requires_columns(self):
+        class ExportView(CSVExportMixin, View):
+            def get_queryset(self):
+                return real_estate_search_queryset(RealEstateType.APARTMENT)
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with self.assertRaises(ImproperlyConfigured):
+            ExportView.as_view()(request, lang="en")
+
+
+@override_settings(SHOWING_ACT_PDF_MAX_JOBS=3, SHOWING_ACT_PDF_MAX_USER_JOBS=2)
+class ShowingActJobTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.other_user = CustomUser.objects.create_user(
+            email="otheruser@gmail.com", password="secretpassword"
+        )
+        self.apartment = create_apartment(self.user)
+        self.client_ = self.apartment.owner
+
+    def create_job(self, user):
+        return showing_act_jobs.create_job(
+            user, self.client_, RealEstateType.APARTMENT, [str(self.apartment.id)],
+            pdf_type=1, lang="en",
+        )
+
+    def test_job_is_scheduled_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = self.create_job(self.user)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(job.status, ShowingActJobStatus.PENDING)
+        self.assertEqual(job.object_ids, [self.apartment.id])
+
+    def test_limits(self):
+        with self.captureOnCommitCallbacks():
+            self.create_job(self.user)
+            job = self.create_job(self.user)
+            with self.assertRaises(showing_act_jobs.TooManyJobs):
+                self.create_job(self.user)
+
+            self.create_job(self.other_user)
+            with self.assertRaises(showing_act_jobs.TooManyJobs):
+                self.create_job(self.other_user)
+
+            # завершені та втрачені завдання не враховуються
+            ShowingActJob.objects.filter(pk=job.pk).update(status=ShowingActJobStatus.DONE)
+            self.create_job(self.user)
+            hour_ago = timezone.now() - datetime.timedelta(hours=1)
+            ShowingActJob.objects.update(created=hour_ago)
+            self.create_job(self.other_user)
+
+    def test_cleanup_expired_jobs(self):
+        done, recent, lost, pending = (
+            ShowingActJob.objects.create(
+                user=self.user, client=self.client_,
+                real_estate_type=RealEstateType.APARTMENT,
+                object_ids=[self.apartment.id], pdf_type=1, lang="en",
+            )
+            for _ in range(4)
+        )
+        two_days_ago = timezone.now() - datetime.timedelta(days=2)
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        with self.settings(MEDIA_ROOT=media.name):
+            for job in (done, recent):
+                job.file.save(f"{job.pk}.pdf", ContentFile(b"pdf"), save=False)
+                job.status = ShowingActJobStatus.DONE
+                job.finished = timezone.now()
+                job.save()
+            ShowingActJob.objects.filter(pk=done.pk).update(finished=two_days_ago)
+            ShowingActJob.objects.filter(pk=lost.pk).update(created=two_days_ago)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(showing_act_jobs.cleanup_jobs(), 2)
+            self.assertEqual(
+                set(ShowingActJob.objects.values_list("pk", flat=True)),
+                {recent.pk, pending.pk},
+            )
+            self.assertFalse(done.file.storage.exists(done.file.name))
+            self.assertTrue(recent.file.storage.exists(recent.file.name))
+
+
+class ShowingActCacheTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        self.apartment = create_apartment(self.user)
+        self.client_ = self.apartment.owner
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def cache_key(self, lang="en"):
+        return showing_act_cache.cache_key(
+            Apartment, [str(self.apartment.id)], self.client_, self.user, 1, lang
+        )
+
+    def test_key_changes_with_objects(self):
+        key = self.cache_key()
+        self.assertEqual(self.cache_key(), key)
+        self.assertNotEqual(self.cache_key(lang="uk"), key)
+
+        self.apartment.price = 1
+        self.apartment.save()
+        self.assertNotEqual(self.cache_key(), key)
+
+    def test_key_changes_with_format(self):
+        locale = tempfile.TemporaryDirectory()
+        self.addCleanup(locale.cleanup)
+        messages = os.path.join(locale.name, "en", "LC_MESSAGES")
+        os.makedirs(messages)
+        with override_settings(LOCALE_PATHS=[locale.name]):
+            key = self.cache_key()
+            # новий файл перекладів
+            with open(os.path.join(messages, "django.po"), "w") as file:
+                file.write('msgid "Client"\nmsgstr "Client"\n')
+            translated = self.cache_key()
+            self.assertNotEqual(translated, key)
+
+            showing_act_cache.FORMAT_VERSION += 1
+            self.addCleanup(setattr, showing_act_cache, "FORMAT_VERSION", 1)
+            self.assertNotEqual(self.cache_key(), translated)
+
+    def test_key_read_from_database(self):
+        self.apartment.condition = Handbook.objects.first()
+        self.apartment.save()
+        # update() без сигналів і з чистим кешем - як зміна в іншому процесі
+        for queryset, values in (
+            (Client.objects.filter(pk=self.client_.pk), {"first_name": "Other"}),
+            (Street.objects.filter(pk=self.apartment.street_id), {"street": "Other"}),
+            (Client.objects.filter(pk=self.apartment.owner_id), {"phone": "099"}),
+            (Handbook.objects.all(), {"handbook": "Other"}),
+        ):
+            key = self.cache_key()
+            queryset.update(**values)
+            cache.clear()
+            self.assertNotEqual(self.cache_key(), key)
+
+    def test_put_get_and_evict(self):
+        with override_settings(
+            SHOWING_ACT_PDF_CACHE_DIR=self.cache_dir.name, SHOWING_ACT_PDF_CACHE_SIZE=10
+        ):
+            self.assertIsNone(showing_act_cache.get("a"))
+            path = showing_act_cache.put("a", b"12345")
+            with open(showing_act_cache.get("a"), "rb") as file:
+                self.assertEqual(file.read(), b"12345")
+
+            os.utime(path, (0, 0))
+            os.utime(showing_act_cache.put("b", b"12345"), (1, 1))
+            # "a" використовувався раніше за "b", тому видаляється першим
+            showing_act_cache.get("a")
+            showing_act_cache.put("c", b"12345")
+            self.assertIsNotNone(showing_act_cache.get("a"))
+            self.assertIsNone(showing_act_cache.get("b"))
+            self.assertIsNotNone(showing_act_cache.get("c"))
+
+
+class PdfURLFetcherTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = media_root.name
+
+    def fetch(self, path):
+        return pdf_url_fetcher.url_fetcher(pdf_url_fetcher.BASE_URL + path)
+
+    def test_static(self):
+        result = self.fetch("static/css/showing_act_pdf.css?v=1")
+        self.assertEqual(result["mime_type"], "text/css")
+        self.assertIn(b"@page", result["string"])
+
+    def test_media_prefers_pdf_derivative(self):
+        os.makedirs(os.path.join(self.media_root, "images"))
+        for name, content in (("photo.png", b"original"), ("doc.txt", b"text")):
+            with open(os.path.join(self.media_root, "images", name), "wb") as file:
+                file.write(content)
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            self.assertEqual(self.fetch("media/images/photo.png")["string"], b"original")
+            pdf_path = os.path.join(self.media_root, "images", "photo.png_pdf.jpg")
+            with open(pdf_path, "wb") as file:
+                file.write(b"pdf")
+            result = self.fetch("media/images/photo.png")
+            self.assertEqual(result["string"], b"pdf")
+            self.assertEqual(result["mime_type"], "image/jpeg")
+            self.assertEqual(self.fetch("media/images/doc.txt")["string"], b"text")
+
+
+class ShowingActLoaderTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="testuser@gmail.com", password="secretpassword"
+        )
+        handbook = Handbook.objects.create(handbook="Condition", type=5)
+        self.apartment = create_apartment(
+            self.user, house_type=handbook, layout=handbook, condition=handbook
+        )
+        RealEstateImage.objects.create(
+            image="images/photo.jpg", content_object=self.apartment
+        )
+
+    def create_apartments(self, count):
+        ids = [self.apartment.id]
+        for _ in range(count - 1):
+            apartment = Apartment.objects.get(pk=self.apartment.pk)
+            apartment.pk = None
+            apartment.save()
+            RealEstateImage.objects.create(
+                image="images/photo.jpg", content_object=apartment
+            )
+            ids.append(apartment.id)
+        return ids
+
+    def assert_constant_queries(self, count):
+        ids = self.create_apartments(count)
+        # завантаження обʼєктів, зображень та filials рієлтора в шаблоні
+        with self.assertNumQueries(3):
+            objects = load_showing_act_objects(Apartment, ids)
+            for obj in objects:
+                str(obj.house_type), str(obj.layout), str(obj.condition)
+                str(obj.street.locality_district), str(obj.locality.district.region)
+                self.assertEqual(len(obj.images.all()), 1)
+            html = loader.render_to_string(
+                "showing_act_pdf_owner_info.html",
+                {
+                    "client": self.apartment.owner,
+                    "realtor": self.user,
+                    "objects": objects,
+                    "real_estate_descriptions": {},
+                },
+            )
+        self.assertEqual(len(objects), count)
+        self.assertIn("Locality Street Client", html)
+
+    def test_one_object(self):
+        self.assert_constant_queries(1)
+
+    def test_ten_objects(self):
+        self.assert_constant_queries(10)
+
+    def test_hundred_objects(self):
+        self.assert_constant_queries(100)
+
+    def test_withdrawn_objects_are_skipped(self):
+        self.apartment.status = RealEstateStatus.COMPLETELY_WITHDRAWN
+        self.apartment.save()
+        self.assertEqual(load_showing_act_objects(Apartment, [self.apartment.id]), [])
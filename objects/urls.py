@@ -30,8 +30,27 @@ urlpatterns = [
     path("sale/commerces/", views.CommerceListView.as_view(), name="commerce_list"),
     path("sale/houses/", views.HouseListView.as_view(), name="house_list"),
     path("sale/lands/", views.LandListView.as_view(), name="land_list"),
+    path(
+        "sale/apartments/export/",
+        views.ApartmentExportView.as_view(),
+        name="apartment_list_export",
+    ),
+    path(
+        "sale/commerces/export/",
+        views.CommerceExportView.as_view(),
+        name="commerce_list_export",
+    ),
+    path(
+        "sale/houses/export/", views.HouseExportView.as_view(), name="house_list_export"
+    ),
+    path("sale/lands/export/", views.LandExportView.as_view(), name="land_list_export"),
 
     path("sale/report/changes/", views.HistoryReportListView.as_view(), name="changes_report_list"),
+    path(
+        "sale/report/changes/export/",
+        views.HistoryReportExportView.as_view(),
+        name="changes_report_export",
+    ),
 
     path("base/create/apartment/", views.ApartmentCreateView.as_view(), name="create_apartment"),
     path("base/create/commerce/", views.CommerceCreateView.as_view(), name="create_commerce"),
@@ -49,6 +68,11 @@ urlpatterns = [
     path("base/history/land/<int:pk>/", views.LandHistoryView.as_view(), name="history_land"),
 
     path("base/selection/<int:client_id>/", views.SelectionListView.as_view(), name="selection"),
+    path(
+        "base/selection/<int:client_id>/matches/",
+        views.ClientMatchListView.as_view(),
+        name="client_matches",
+    ),
 
     path("pre/showing_act/", views.showing_act_redirect, name="showing_act_redirect"),
     path("showing_act/", views.ShowingActView.as_view(), name="showing_act"),
@@ -62,6 +86,11 @@ urlpatterns = [
          name="land_showing_act_details"),
     path("pre/showing_act/pdf/", views.pdf_redirect, name="generate_pdf_redirect"),
     path("showing_act/pdf/", views.ShowingActPDFView.as_view(), name="generate_pdf"),
+    path(
+        "showing_act/pdf/<uuid:pk>/",
+        views.ShowingActPDFJobView.as_view(),
+        name="showing_act_pdf_job",
+    ),
     path(
         "base/selection/history/<int:pk>/",
         views.SelectionHistoryView.as_view(),
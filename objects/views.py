@@ -1,12 +1,13 @@
-from itertools import chain
 from urllib.parse import urlencode
 
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied, BadRequest
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, render
 from django.db.models import Q
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.utils.translation import activate, gettext_lazy as _
 from django.views.decorators.http import require_GET
 from django.views.generic import (
@@ -17,19 +18,33 @@ from django.views.generic import (
     View, DetailView,
 )
 
+from accounts.models import HistoryChange
 from handbooks.forms import SelectionForm
-from handbooks.models import Client, Street
+from handbooks.models import Client, Handbook, Locality, Street
 from images.forms import RealEstateImageFormSet
+from images.models import RealEstateImage
+from images.services import real_estate_cards
 
-from .models import Apartment, Commerce, House, Land, Selection
+from . import showing_act_cache, showing_act_jobs
+from .models import Apartment, Commerce, House, Land, Selection, ShowingActJob
 from .utils import real_estate_form_save
-from utils.mixins.mixins import CustomLoginRequiredMixin, CustomPaginateOnPageMixin
-from utils.showing_act_pdf_service import ShowingActPDFService, ShowingActPDFType
+from utils.mixins.mixins import (
+    CustomLoginRequiredMixin,
+    CSVExportMixin,
+    KeysetPaginateMixin,
+)
+from utils.showing_act_pdf_service import ShowingActPDFType
 from utils.views import HistoryView
 
-from .choices import RealEstateStatus, RealEstateType, PermissionUpdateLevel
+from .choices import (
+    RealEstateStatus,
+    RealEstateType,
+    PermissionUpdateLevel,
+    ShowingActJobStatus,
+)
 from .forms import (
     ApartmentForm,
+    ChangesReportFilterForm,
     ApartmentVerifyAddressForm,
     ApartmentSearchForm,
     CommerceForm,
@@ -43,17 +58,24 @@ from .forms import (
     LandSearchForm,
 )
 from .mixins import (
+    CatalogCacheMixin,
     DefaultUserInCreateViewMixin,
+    RealEstateCSVExportMixin,
     RealEstateCreateContextMixin,
     RealEstateUpdateContextMixin,
     RealEstateListContextMixin,
+    RealEstateKeysetPaginateMixin,
+    RealEstateDetailCacheMixin,
 )
 from .services import (
+    changes_report_queryset,
     user_can_update_real_estate,
     user_can_update_real_estate_list,
     real_estate_model_from_type,
     process_real_estate_search_form,
+    real_estate_search_queryset,
     selection_add_selected_objects,
+    selection_queryset,
 )
 
 
@@ -128,6 +150,7 @@ class SelectionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, ListV
     template_name = "objects/selection_list.html"
     context_object_name = "objects"
     permission_required = "objects.selection"
+    matches_limit = 10
 
     def get_form(self, client):
         if len(self.request.GET) == 0:
@@ -166,64 +189,7 @@ class SelectionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, ListV
         if not model_class:
             raise BadRequest()
         
-        queryset = model_class.objects.filter(
-            status__in=(RealEstateStatus.ON_SALE, RealEstateStatus.DEPOSIT)
-        )
-
-        # if form.cleaned_data.get('rooms_number') is not None:
-        #     queryset = queryset.filter(rooms_number=form.cleaned_data.get('rooms_number'))
-        if form.cleaned_data.get("locality").exists():
-            queryset = queryset.filter(locality__in=form.cleaned_data.get("locality"))
-        # if form.cleaned_data.get('locality_district').exists():
-        #     queryset = queryset.filter(locality_district__in=form.cleaned_data.get('locality_district'))
-        if form.cleaned_data.get("street").exists():
-            queryset = queryset.filter(street__in=form.cleaned_data.get("street"))
-        if (
-            form.cleaned_data.get("house") is not None
-            and form.cleaned_data.get("house") != ""
-        ):
-            queryset = queryset.filter(house=form.cleaned_data.get("house"))
-        if form.cleaned_data.get("floor_min") is not None:
-            queryset = queryset.filter(floor__gte=form.cleaned_data.get("floor_min"))
-        if form.cleaned_data.get("floor_max") is not None:
-            queryset = queryset.filter(floor__lte=form.cleaned_data.get("floor_max"))
-        if form.cleaned_data.get("not_first"):
-            queryset = queryset.exclude(floor=1)
-            queryset = queryset.filter(
-                storeys_number__lte=form.cleaned_data.get("storeys_num_max")
-            )
-        if form.cleaned_data.get("price_from") is not None:
-            queryset = queryset.filter(price__gte=form.cleaned_data.get("price_from"))
-        if form.cleaned_data.get("price_to") is not None:
-            queryset = queryset.filter(price__lte=form.cleaned_data.get("price_to"))
-        # if form.cleaned_data.get('square_meter_price_max') is not None:
-        #     queryset = queryset.filter(
-        #         square_meter_price__lte=form.cleaned_data.get('square_meter_price_max')
-        #     )
-        if form.cleaned_data.get("condition"):
-            queryset = queryset.filter(condition__in=form.cleaned_data.get("condition"))
-
-        if (
-            form.cleaned_data.get("key_word") is not None
-            and form.cleaned_data.get("key_word") != ""
-        ):
-            key_word = form.cleaned_data.get("key_word")
-            queryset = queryset.filter(
-                Q(region__region__icontains=key_word)
-                | Q(district__district__icontains=key_word)
-                | Q(locality__locality__icontains=key_word)
-                | Q(locality_district__district__icontains=key_word)
-                | Q(street__street__icontains=key_word)
-                | Q(house__icontains=key_word)
-                | Q(comment__icontains=key_word)
-            )
-
-        n_queryset = queryset
-        for obj in n_queryset:
-            if form.cleaned_data.get("not_last") and obj.storeys_number == obj.floor:
-                n_queryset = n_queryset.exclude(id=obj.id)
-
-        return n_queryset
+        return selection_queryset(model_class, form.cleaned_data)
 
     def get_context_data(self, **kwargs):
         activate(self.kwargs["lang"])  # Перекладаємо
@@ -236,17 +202,46 @@ class SelectionListView(CustomLoginRequiredMixin, PermissionRequiredMixin, ListV
         context["client"] = client
 
         context["form"] = self.get_form(client)
+        # лише останні збіги, повний список - на окремій сторінці з пагінацією
+        matches = list(
+            client.real_estate_matches.order_by("-date", "-id")[:self.matches_limit + 1]
+        )
+        context["matches"] = matches[:self.matches_limit]
+        context["more_matches"] = len(matches) > self.matches_limit
 
-        objects = []
-        for obj in context["objects"]:
-            image = obj.images.first()
-            objects.append({"image": image, "object": obj})
-        context["objects"] = objects
+        context["objects"] = real_estate_cards(context["objects"])
         context["client"] = client
 
         return context
 
 
+class ClientMatchListView(
+    CustomLoginRequiredMixin, PermissionRequiredMixin, KeysetPaginateMixin, ListView
+):
+    """Усі обʼєкти, які підходять під критерії клієнта, від нових до старих"""
+
+    permission_required = "objects.selection"
+    template_name = "objects/client_match_list.html"
+    paginate_by = 10
+    tie_breaker = "id"
+    cursor_salt = "client-matches"
+
+    def get_keyset_ordering(self) -> tuple[str, bool]:
+        return "date", True
+
+    def get_queryset(self):
+        self.client = get_object_or_404(Client, id=self.kwargs["client_id"])
+        return self.client.real_estate_matches.all()
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        activate(self.kwargs["lang"])  # Перекладаємо
+
+        context = super().get_context_data(**kwargs)
+        context["lang"] = self.kwargs["lang"]
+        context["client"] = self.client
+        return context
+
+
 class SelectionHistoryView(
     CustomLoginRequiredMixin,
     PermissionRequiredMixin,
@@ -331,16 +326,8 @@ class ShowingActView(TemplateView):
         qs = model_class.objects.filter(
             ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
             id__in=selected_ids
-        )
-        objects = []
-        for obj in qs:
-            objects.append(
-                {
-                    "object": obj,
-                    "image": obj.images.first(),
-                }
-            )
-        context["objects"] = objects
+        ).select_related("cover_image")
+        context["objects"] = real_estate_cards(qs)
         context["url"] = f"objects:{model_class._meta.model_name}_showing_act_details"
 
         return context
@@ -392,7 +379,10 @@ def pdf_redirect(request, lang):
 
 class ShowingActPDFView(CustomLoginRequiredMixin, View):
     def get(self, request, lang):
-        """Повертає pdf файл акту показу нерухомості"""
+        """
+        Повертає pdf файл акту показу нерухомості з кешу або створює завдання
+        на нього та переадресовує на сторінку завдання
+        """
         activate(lang)
 
         client_id = int(request.GET.get("client"))
@@ -406,23 +396,59 @@ class ShowingActPDFView(CustomLoginRequiredMixin, View):
             raise BadRequest()
 
         selected_ids = self.request.GET.getlist("objects")
-        objects = (
-            model_class.objects.filter(
-                ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
-                id__in=selected_ids
-            )
-            .select_related()
+        pdf_type = ShowingActPDFType.SIMPLE.value
+        # такий самий акт вже створювався і обʼєкти з того часу не змінювались
+        key = showing_act_cache.cache_key(
+            model_class, selected_ids, client, request.user, pdf_type, lang
         )
+        if path := showing_act_cache.get(key):
+            return FileResponse(
+                open(path, "rb"), as_attachment=True, filename="showing_act.pdf"
+            )
 
-        service = ShowingActPDFService()
-        buffer = service.generate(ShowingActPDFType.SIMPLE, request.user, client, objects)
-        response = HttpResponse(buffer.read(), content_type="application/pdf")
-        response["Content-Disposition"] = "attachment; filename=showing_act.pdf"
+        try:
+            job = showing_act_jobs.create_job(
+                request.user, client, object_type, selected_ids, pdf_type, lang
+            )
+        except showing_act_jobs.TooManyJobs:
+            response = HttpResponse(
+                _("Too many showing acts are being created, try again later"), status=429
+            )
+            response["Retry-After"] = "10"
+            return response
+        return redirect("objects:showing_act_pdf_job", lang=lang, pk=job.pk)
+
+
+class ShowingActPDFJobView(CustomLoginRequiredMixin, View):
+    def get(self, request, lang, pk):
+        """
+        Повертає готовий pdf файл акту показу або статус завдання
+        (сторінка оновлюється, поки файл не буде створено)
+        """
+        activate(lang)
+        job = get_object_or_404(ShowingActJob, pk=pk, user=request.user)
+
+        if job.status == ShowingActJobStatus.DONE:
+            return FileResponse(
+                job.file.open("rb"), as_attachment=True, filename="showing_act.pdf"
+            )
+
+        status = 500 if job.status == ShowingActJobStatus.FAILED else 202
+        if not request.accepts("text/html"):
+            return JsonResponse({"status": job.get_status_display()}, status=status)
+        response = render(
+            request,
+            "objects/showing_act_pdf_job.html",
+            {"lang": lang, "job": job, "failed": ShowingActJobStatus.FAILED},
+            status=status,
+        )
+        if not job.is_finished:
+            response["Refresh"] = "2"
         return response
 
 
 class ApartmentListView(
-    CustomLoginRequiredMixin, PermissionRequiredMixin, CustomPaginateOnPageMixin,
+    CustomLoginRequiredMixin, PermissionRequiredMixin, RealEstateKeysetPaginateMixin,
     RealEstateListContextMixin, ListView
 ):
     """Список квартир"""
@@ -432,13 +458,6 @@ class ApartmentListView(
     form = None
     paginate_by = 5
 
-    def get_ordering(self):
-        sort = self.request.GET.get("sort")
-        direction = self.request.GET.get("direction")
-        if sort and direction in ["s", "d"]:
-            return sort if direction == "s" else f"-{sort}"
-        return None
-
     def get_queryset(self):
         if "id" in self.request.GET:
             # форма була відправлена
@@ -454,17 +473,8 @@ class ApartmentListView(
         if not self.form.is_valid():
             return []
 
-        qs = (
-            Apartment.objects.filter(
-                ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
-            )
-            .select_related("locality", "street", "realtor")
-            .only("id", "locality__locality", "street__street", "rubric", "on_site", "realtor__email")
-        )
-        qs = process_real_estate_search_form(qs, self.form, self.request.user)
-        if (ordering := self.get_ordering()):
-            qs = qs.order_by(ordering)
-        return qs
+        qs = real_estate_search_queryset(RealEstateType.APARTMENT)
+        return process_real_estate_search_form(qs, self.form, self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -478,6 +488,7 @@ class ApartmentListView(
                 "create_url_name": "objects:create_apartment",
                 "update_url_name": "objects:update_apartment",
                 "view_url_name": "objects:apartment_detail",
+                "export_url_name": "objects:apartment_list_export",
                 "sort": self.request.GET.get("sort"),
                 "direction": self.request.GET.get("direction"),
             }
@@ -485,8 +496,14 @@ class ApartmentListView(
         return context
 
 
+class ApartmentExportView(RealEstateCSVExportMixin, ApartmentListView):
+    """Експорт списку квартир у CSV"""
+
+    csv_filename = "apartments.csv"
+
+
 class CommerceListView(
-    CustomLoginRequiredMixin, PermissionRequiredMixin, CustomPaginateOnPageMixin,
+    CustomLoginRequiredMixin, PermissionRequiredMixin, RealEstateKeysetPaginateMixin,
     RealEstateListContextMixin, ListView
 ):
     """Список комерцій"""
@@ -496,13 +513,6 @@ class CommerceListView(
     paginate_by = 5
     form = None
 
-    def get_ordering(self):
-        sort = self.request.GET.get("sort")
-        direction = self.request.GET.get("direction")
-        if sort and direction in ["s", "d"]:
-            return sort if direction == "s" else f"-{sort}"
-        return None
-
     def get_queryset(self):
         if "id" in self.request.GET:
             # форма була відправлена
@@ -518,17 +528,8 @@ class CommerceListView(
         if not self.form.is_valid():
             return []
 
-        qs = (
-            Commerce.objects.filter(
-                ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
-            )
-            .select_related("locality", "street", "realtor")
-            .only("id", "locality__locality", "street__street", "rubric", "on_site", "realtor__email")
-        )
-        qs = process_real_estate_search_form(qs, self.form, self.request.user)
-        if (ordering := self.get_ordering()):
-            qs = qs.order_by(ordering)
-        return qs
+        qs = real_estate_search_queryset(RealEstateType.COMMERCE)
+        return process_real_estate_search_form(qs, self.form, self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -541,6 +542,7 @@ class CommerceListView(
                 "create_url_name": "objects:create_commerce",
                 "update_url_name": "objects:update_commerce",
                 "view_url_name": "objects:commerce_detail",
+                "export_url_name": "objects:commerce_list_export",
                 "sort": self.request.GET.get("sort"),
                 "direction": self.request.GET.get("direction"),
             }
@@ -548,8 +550,14 @@ class CommerceListView(
         return context
 
 
+class CommerceExportView(RealEstateCSVExportMixin, CommerceListView):
+    """Експорт списку комерцій у CSV"""
+
+    csv_filename = "commerces.csv"
+
+
 class HouseListView(
-    CustomLoginRequiredMixin, PermissionRequiredMixin, CustomPaginateOnPageMixin,
+    CustomLoginRequiredMixin, PermissionRequiredMixin, RealEstateKeysetPaginateMixin,
     RealEstateListContextMixin, ListView
 ):
     """Список будинків"""
@@ -558,13 +566,6 @@ class HouseListView(
     template_name = "objects/real_estate_list.html"
     paginate_by = 5
 
-    def get_ordering(self):
-        sort = self.request.GET.get("sort")
-        direction = self.request.GET.get("direction")
-        if sort and direction in ["s", "d"]:
-            return sort if direction == "s" else f"-{sort}"
-        return None
-
     def get_queryset(self):
         if "id" in self.request.GET:
             # форма була відправлена
@@ -580,17 +581,8 @@ class HouseListView(
         if not self.form.is_valid():
             return []
 
-        qs = (
-            House.objects.filter(
-                ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
-            )
-            .select_related("locality", "street", "realtor")
-            .only("id", "locality__locality", "street__street", "rubric", "on_site", "realtor__email")
-        )
-        qs = process_real_estate_search_form(qs, self.form, self.request.user)
-        if (ordering := self.get_ordering()):
-            qs = qs.order_by(ordering)
-        return qs
+        qs = real_estate_search_queryset(RealEstateType.HOUSE)
+        return process_real_estate_search_form(qs, self.form, self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -603,6 +595,7 @@ class HouseListView(
                 "create_url_name": "objects:create_house",
                 "update_url_name": "objects:update_house",
                 "view_url_name": "objects:house_detail",
+                "export_url_name": "objects:house_list_export",
                 "sort": self.request.GET.get("sort"),
                 "direction": self.request.GET.get("direction"),
             }
@@ -610,8 +603,14 @@ class HouseListView(
         return context
 
 
+class HouseExportView(RealEstateCSVExportMixin, HouseListView):
+    """Експорт списку будинків у CSV"""
+
+    csv_filename = "houses.csv"
+
+
 class LandListView(
-    CustomLoginRequiredMixin, PermissionRequiredMixin, CustomPaginateOnPageMixin,
+    CustomLoginRequiredMixin, PermissionRequiredMixin, RealEstateKeysetPaginateMixin,
     RealEstateListContextMixin, ListView
 ):
     """Список земельних ділянок"""
@@ -620,13 +619,6 @@ class LandListView(
     template_name = "objects/real_estate_list.html"
     paginate_by = 5
 
-    def get_ordering(self):
-        sort = self.request.GET.get("sort")
-        direction = self.request.GET.get("direction")
-        if sort and direction in ["s", "d"]:
-            return sort if direction == "s" else f"-{sort}"
-        return None
-
     def get_queryset(self):
         if "id" in self.request.GET:
             # форма була відправлена
@@ -642,17 +634,8 @@ class LandListView(
         if not self.form.is_valid():
             return []
 
-        qs = (
-            Land.objects.filter(
-                ~Q(status=RealEstateStatus.COMPLETELY_WITHDRAWN),
-            )
-            .select_related("locality", "street", "realtor")
-            .only("id", "locality__locality", "street__street", "rubric", "on_site", "realtor__email")
-        )
-        qs = process_real_estate_search_form(qs, self.form, self.request.user)
-        if (ordering := self.get_ordering()):
-            qs = qs.order_by(ordering)
-        return qs
+        qs = real_estate_search_queryset(RealEstateType.LAND)
+        return process_real_estate_search_form(qs, self.form, self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -666,6 +649,7 @@ class LandListView(
                 "create_url_name": "objects:create_land",
                 "update_url_name": "objects:update_land",
                 "view_url_name": "objects:land_detail",
+                "export_url_name": "objects:land_list_export",
                 "sort": self.request.GET.get("sort"),
                 "direction": self.request.GET.get("direction"),
             }
@@ -673,56 +657,77 @@ class LandListView(
         return context
 
 
-class HistoryReportListView(CustomLoginRequiredMixin, PermissionRequiredMixin, ListView):
+class LandExportView(RealEstateCSVExportMixin, LandListView):
+    """Експорт списку ділянок у CSV"""
+
+    csv_filename = "lands.csv"
+
+
+class HistoryReportListView(
+    CustomLoginRequiredMixin, PermissionRequiredMixin, KeysetPaginateMixin, ListView
+):
+    """
+    Звіт змін нерухомості. Зміни полів записуються разом з історією
+    (див. accounts.models.HistoryChange), сторінки перемикаються за курсором.
+    """
+
     permission_required = "objects.view_changes_report"
-    model = Apartment.history.all().model
     template_name = "objects/changes_report_list.html"
     handbook_type = "report"
-    paginate_by = 5
+    paginate_by = 10
+    tie_breaker = "id"
+    cursor_salt = "changes-report"
+
+    def get_keyset_ordering(self) -> tuple[str, bool]:
+        return "date", True
+
+    def get_queryset(self):
+        self.form = ChangesReportFilterForm(self.request.GET)
+        if not self.form.is_valid():
+            return HistoryChange.objects.none()
+        return changes_report_queryset(**self.form.cleaned_data)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         activate(self.kwargs["lang"])  # переклад
 
-        # підгружаємо частину готової дати і додаємо що потрібно
         context = super().get_context_data(**kwargs)
         context["lang"] = self.kwargs["lang"]
         context["choice"] = self.handbook_type
+        context["form"] = self.form
+        return context
 
-        apartments = Apartment.history.all().order_by("history_date")
-        commerces = Commerce.history.all().order_by("history_date")
-        houses = House.history.all().order_by("history_date")
-        lands = Land.history.all().order_by("history_date")
-        context["object_list"] = sorted(
-            chain(apartments, commerces, houses, lands),
-            key=lambda x: x.history_date,
-            reverse=True,
-        )
 
-        if context["object_list"]:  # Якщо нам взагалі є з чим працювати
-            context["object_values"] = []
-            for record in context["object_list"]:
-                if record.prev_record:
-                    prev_record = record.prev_record
-                    for field in record._meta.fields:
-                        if field.name.find("history") == -1:
-                            field_name = field.name
-                            old_value = getattr(prev_record, field_name)
-                            new_value = getattr(record, field_name)
-                            if old_value != new_value:
-                                context["object_values"].append(
-                                    {
-                                        "id": record.id,
-                                        "date": record.history_date,
-                                        "user": record.history_user,
-                                        "field": field.verbose_name,
-                                        "old_value": old_value,
-                                        "new_value": new_value,
-                                        "model": record._meta.model_name[10::],
-                                    }
-                                )
-        else:
-            context["object_values"] = None
-        return context
+class HistoryReportExportView(CSVExportMixin, HistoryReportListView):
+    """Експорт звіту змін нерухомості у CSV"""
+
+    csv_filename = "changes_report.csv"
+    csv_header = (
+        _("Id"), _("Object type"), _("Date"), _("User"),
+        _("Field"), _("Old value"), _("New value"),
+    )
+    csv_fields = (
+        "object_id", "content_type_id", "date", "user__email",
+        "field", "old_value", "new_value",
+    )
+    csv_ordering = ("-date", "-id")
+
+    def get_csv_rows(self, queryset):
+        # назви полів перекладаються тут, бо рядки пишуться вже після виходу з view
+        fields = {}
+        for model in (Apartment, Commerce, House, Land):
+            content_type = ContentType.objects.get_for_model(model)
+            for field in model._meta.fields:
+                fields[content_type.id, field.name] = str(field.verbose_name)
+            fields[content_type.id] = model._meta.model_name
+
+        def csv_row(row):
+            object_id, content_type_id, date, user, field, old_value, new_value = row
+            return (
+                object_id, fields[content_type_id], timezone.localtime(date), user,
+                fields.get((content_type_id, field), field), old_value, new_value,
+            )
+
+        return map(csv_row, super().get_csv_rows(queryset))
 
 
 class ApartmentCreateView(
@@ -1248,10 +1253,15 @@ class LandUpdateView(
         return reverse_lazy("objects:land_list", kwargs=kwargs)
 
 
-class CatalogListView(ListView):
+class CatalogListView(CatalogCacheMixin, ListView):
     paginate_by = 15
     template_name = "objects/catalog.html"
-    queryset = Apartment.objects.exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
+    cache_models = (Apartment, RealEstateImage, Locality, Street, Handbook)
+    queryset = (
+        Apartment.objects.filter(on_delete=False)
+        .exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
+        .select_related("locality", "street", "house_type", "cover_image")
+    )
     context_object_name = "objects"
 
     def get_queryset(self):
@@ -1281,14 +1291,11 @@ class CatalogListView(ListView):
         context["lang"] = self.kwargs["lang"]
         context["form"] = SearchForm(self.request.GET)
 
-        objects = []
-        for obj in context["objects"]:
-            objects.append({"object": obj, "image": obj.images.first()})
-        context["objects"] = objects
+        context["objects"] = real_estate_cards(context["objects"])
         return context
 
 
-class ApartmentDetailView(UpdateView):
+class ApartmentDetailView(RealEstateDetailCacheMixin, UpdateView):
     template_name = "objects/real_estate_details_form.html"
     queryset = Apartment.objects.exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
     form_class = ApartmentForm
@@ -1308,7 +1315,7 @@ class ApartmentDetailView(UpdateView):
         return context
 
 
-class CommerceDetailView(UpdateView):
+class CommerceDetailView(RealEstateDetailCacheMixin, UpdateView):
     template_name = "objects/real_estate_details_form.html"
     queryset = Commerce.objects.exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
     form_class = CommerceForm
@@ -1328,7 +1335,7 @@ class CommerceDetailView(UpdateView):
         return context
 
 
-class HouseDetailView(UpdateView):
+class HouseDetailView(RealEstateDetailCacheMixin, UpdateView):
     template_name = "objects/real_estate_details_form.html"
     queryset = House.objects.exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
     form_class = HouseForm
@@ -1348,7 +1355,7 @@ class HouseDetailView(UpdateView):
         return context
 
 
-class LandDetailView(UpdateView):
+class LandDetailView(RealEstateDetailCacheMixin, UpdateView):
     template_name = "objects/real_estate_details_form.html"
     queryset = Land.objects.exclude(status=RealEstateStatus.COMPLETELY_WITHDRAWN)
     form_class = LandForm
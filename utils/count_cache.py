@@ -0,0 +1,133 @@
+"""
+Кешування кількості обʼєктів для пагінації списків.
+Ключ кешу - модель, поточні версії (див. utils.model_versions) усіх моделей запиту
+(основної, приєднаних та з підзапитів) та SQL запиту (тобто всі фільтри,
+в тому числі обмеження доступу користувача), тому після змін будь-якої з цих
+моделей старі значення більше не використовуються.
+Для великих таблиць на PostgreSQL можна рахувати приблизну кількість
+за оцінкою планувальника (EXPLAIN) замість COUNT(*).
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.db.models.sql import Query
+from django.utils.functional import cached_property
+
+from utils.model_versions import model_version
+
+# приблизна кількість використовується, лише якщо оцінка більша за поріг
+APPROXIMATE_COUNT_THRESHOLD = 10000
+
+
+@lru_cache(maxsize=None)
+def table_models() -> dict[str, tuple[type[Model], ...]]:
+    """Таблиця -> моделі, від версій яких залежать її рядки"""
+    result = {}
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.auto_created:
+            # зміни ManyToMany змінюють версію моделі з одного з боків (m2m_changed)
+            result[model._meta.db_table] = tuple(
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation
+            )
+        else:
+            result[model._meta.db_table] = (model,)
+    return result
+
+
+def subqueries(node):
+    """Підзапити (in, Exists, Subquery) в умовах запиту"""
+    if isinstance(node, Query):
+        yield node
+        return
+    for child in getattr(node, "children", None) or ():
+        yield from subqueries(child)
+    if hasattr(node, "get_source_expressions"):
+        for expression in node.get_source_expressions():
+            yield from subqueries(expression)
+
+
+def query_models(query: Query) -> set[type[Model]]:
+    """Моделі всіх таблиць запиту: основної, приєднаних та з підзапитів"""
+    models = {query.model}
+    for join in query.alias_map.values():
+        models.update(table_models().get(join.table_name, ()))
+    for subquery in subqueries(query.where):
+        models |= query_models(subquery)
+    return models
+
+
+def count_cache_key(queryset: QuerySet, approximate: bool = False) -> str:
+    model = queryset.model
+    sql, params = queryset.query.sql_with_params()
+    signature = hashlib.sha1(
+        json.dumps([queryset.db, sql, params, approximate], default=str).encode()
+    ).hexdigest()
+    versions = ".".join(
+        str(model_version(query_model))
+        for query_model in sorted(
+            query_models(queryset.query), key=lambda query_model: query_model._meta.label
+        )
+    )
+    return f"count:{model._meta.label_lower}:{versions}:{signature}"
+
+
+def estimated_count(queryset: QuerySet) -> int | None:
+    """Оцінка кількості рядків планувальником PostgreSQL (None для інших баз даних)"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def cached_count(queryset: QuerySet, approximate: bool = False) -> int:
+    """
+    Повертає кількість обʼєктів <queryset> з кешу або рахує її.
+    Якщо <approximate> - для великих результатів повертає оцінку планувальника.
+    """
+    if queryset.query.is_empty():
+        return 0
+
+    key = count_cache_key(queryset, approximate)
+    count = cache.get(key)
+    if count is not None:
+        return count
+
+    count = None
+    if approximate:
+        estimate = estimated_count(queryset)
+        if estimate is not None and estimate > APPROXIMATE_COUNT_THRESHOLD:
+            count = estimate
+    if count is None:
+        count = queryset.count()
+
+    cache.set(key, count, getattr(settings, "COUNT_CACHE_TIMEOUT", 300))
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, який бере кількість обʼєктів з кешу (див. cached_count)"""
+
+    def __init__(self, *args, approximate_count: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.approximate_count = approximate_count
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            return cached_count(self.object_list, self.approximate_count)
+        return super().count
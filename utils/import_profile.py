@@ -0,0 +1,66 @@
+"""
+Профілювання команд імпорту (fill_db --profile, users_fill_db --profile):
+для кожного етапу рахуються рядки, час, кількість SQL запитів та пікова памʼять
+процесу (tracemalloc, без памʼяті дочірніх процесів читання файлів).
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import connection
+
+
+@dataclass
+class Stage:
+    name: str
+    rows: int = 0
+    elapsed: float = 0
+    queries: int = 0
+    peak_memory: int = 0
+
+
+class ImportProfile:
+    """Вимірює етапи імпорту; якщо <enabled> False, етапи лише виконуються"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.stages: list[Stage] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        stage = Stage(name)
+        if not self.enabled:
+            yield stage
+            return
+
+        def count_queries(execute, sql, params, many, context):
+            stage.queries += 1
+            return execute(sql, params, many, context)
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_queries):
+                yield stage
+        finally:
+            stage.elapsed = time.perf_counter() - start
+            stage.peak_memory = tracemalloc.get_traced_memory()[1]
+            if started:
+                tracemalloc.stop()
+            self.stages.append(stage)
+
+    def lines(self) -> list[str]:
+        lines = [
+            f"{'stage':<20}{'rows':>10}{'time, s':>10}{'queries':>10}{'peak, MB':>10}"
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"{stage.name:<20}{stage.rows:>10}{stage.elapsed:>10.2f}"
+                f"{stage.queries:>10}{stage.peak_memory / 1024 / 1024:>10.1f}"
+            )
+        return lines
@@ -0,0 +1,58 @@
+"""
+Звіт перевірки вивантажень для команд імпорту (--dry-run) у форматі JSON:
+{"errors": N, "warnings": N, "issues": [{"level", "source", "id", "field",
+"value", "message"}, ...]}. Помилки (error) зупиняють імпорт, попередження
+(warning) - ні, такі рядки пропускаються або імпортуються без значення.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+
+ERROR = "error"
+WARNING = "warning"
+
+
+@dataclass
+class Issue:
+    level: str
+    source: str
+    id: str | None
+    field: str
+    value: str | None
+    message: str
+
+
+class ImportReport:
+    def __init__(self):
+        self.issues: list[Issue] = []
+
+    def add(self, level: str, source: str, record_id, field: str, value, message: str):
+        self.issues.append(Issue(level, source, record_id, field, value, message))
+
+    def error(self, source: str, record_id, field: str, value, message: str):
+        self.add(ERROR, source, record_id, field, value, message)
+
+    def warning(self, source: str, record_id, field: str, value, message: str):
+        self.add(WARNING, source, record_id, field, value, message)
+
+    def count(self, level: str) -> int:
+        return sum(issue.level == level for issue in self.issues)
+
+    @property
+    def errors(self) -> int:
+        return self.count(ERROR)
+
+    @property
+    def warnings(self) -> int:
+        return self.count(WARNING)
+
+    def as_dict(self) -> dict:
+        return {
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "issues": [asdict(issue) for issue in self.issues],
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.as_dict(), file, ensure_ascii=False, indent=2)
@@ -1,7 +1,17 @@
+import datetime
+import json
+
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
 from django.urls import reverse
+from django.utils.translation import activate
 
 from handbooks.forms import IdSearchForm
+from utils.count_cache import CachedCountPaginator
+from utils.csv_export import csv_response
 
 
 class CustomLoginRequiredMixin(LoginRequiredMixin):
@@ -15,14 +25,197 @@ class CustomLoginRequiredMixin(LoginRequiredMixin):
         return reverse("accounts:login", kwargs={"lang": lang})
 
 
-class CustomPaginateOnPageMixin:
+class CachedCountPaginateMixin:
+    """
+    Пагінація з кешованою кількістю обʼєктів (див. utils.count_cache).
+    Якщо approximate_count - для великих таблиць показується приблизна кількість.
+    """
+
+    paginator_class = CachedCountPaginator
+    approximate_count = False
+
+    def get_paginator(
+        self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs
+    ):
+        return self.paginator_class(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            approximate_count=self.approximate_count,
+            **kwargs,
+        )
+
+
+class CustomPaginateOnPageMixin(CachedCountPaginateMixin):
+    max_paginate_by = 100
+
     def get_paginate_by(self, queryset):
         per_page = self.request.GET.get("per_page")
-        if per_page and per_page.isdigit():
-            return int(per_page)
+        if per_page and per_page.isdigit() and int(per_page) > 0:
+            return min(int(per_page), self.max_paginate_by)
         return self.paginate_by
 
 
+class CSVExportMixin:
+    """
+    Потоковий експорт у CSV результатів get_queryset() списку замість сторінки.
+    Колонки - <csv_header>, значення - поля <csv_fields> (values_list) в порядку
+    <csv_ordering>. Щоб змінити значення, get_csv_rows перевизначають
+    та обробляють рядки з super().get_csv_rows().
+    Рядки читаються з БД частинами по <csv_chunk_size> (QuerySet.iterator).
+    """
+
+    csv_filename = "export.csv"
+    csv_chunk_size = 2000
+    csv_header = None
+    csv_fields = None
+    csv_ordering = ("pk",)
+
+    def get_csv_header(self) -> list:
+        if self.csv_header is None:
+            raise ImproperlyConfigured(f"{type(self).__name__} is missing csv_header.")
+        return [str(label) for label in self.csv_header]
+
+    def get_csv_fields(self) -> tuple:
+        if self.csv_fields is None:
+            raise ImproperlyConfigured(f"{type(self).__name__} is missing csv_fields.")
+        return self.csv_fields
+
+    def get_csv_rows(self, queryset: QuerySet):
+        rows = queryset.order_by(*self.csv_ordering).values_list(*self.get_csv_fields())
+        return rows.iterator(chunk_size=self.csv_chunk_size)
+
+    def get(self, request, *args, **kwargs):
+        activate(self.kwargs["lang"])
+        queryset = self.get_queryset()
+        if not isinstance(queryset, QuerySet):
+            # форма пошуку не пройшла перевірку
+            rows = []
+        else:
+            rows = self.get_csv_rows(queryset)
+        return csv_response(self.csv_filename, self.get_csv_header(), rows)
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder обрізає мікросекунди, а курсор має бути точним
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer(signing.JSONSerializer):
+    """Серіалізатор курсора, який підтримує дати (зберігаються як рядки ISO 8601)"""
+
+    def dumps(self, obj):
+        data = json.dumps(obj, separators=(",", ":"), cls=CursorJSONEncoder)
+        return data.encode("latin-1")
+
+
+class KeysetPage:
+    """Сторінка пагінації за курсором (аналог django.core.paginator.Page)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginateMixin(CustomPaginateOnPageMixin):
+    """
+    Пагінація за курсором (keyset) замість OFFSET.
+    Сортувати можна лише за полями з <sort_fields> (значення GET параметра sort -> поле),
+    до кожного сортування додається поле <tie_breaker>, тому порядок стабільний.
+    Курсор - підписане значення полів сортування останнього (першого) рядка сторінки,
+    тому сторінки не рахують COUNT(*) і не пропускають рядки через OFFSET.
+    """
+
+    sort_fields = {"id": "id"}
+    tie_breaker = "id"
+    cursor_salt = "keyset-pagination"
+
+    def get_keyset_ordering(self) -> tuple[str, bool]:
+        """Повертає поле сортування та чи сортування спадне"""
+        sort = self.request.GET.get("sort")
+        direction = self.request.GET.get("direction")
+        field = self.sort_fields.get(sort, self.tie_breaker)
+        return field, direction == "d"
+
+    def encode_cursor(self, obj, field: str, backwards: bool) -> str:
+        return signing.dumps(
+            [getattr(obj, field), getattr(obj, self.tie_breaker), backwards],
+            salt=self.cursor_salt,
+            serializer=CursorSerializer,
+            compress=True,
+        )
+
+    def decode_cursor(self, cursor: str | None) -> list | None:
+        if not cursor:
+            return None
+        try:
+            return signing.loads(cursor, salt=self.cursor_salt)
+        except signing.BadSignature:
+            return None
+
+    def paginate_queryset(self, queryset, page_size):
+        if not isinstance(queryset, QuerySet):
+            return None, KeysetPage([]), [], False
+
+        field, descending = self.get_keyset_ordering()
+        cursor = self.decode_cursor(self.request.GET.get("cursor"))
+        backwards = bool(cursor and cursor[2])
+
+        # при переході на попередню сторінку йдемо у зворотньому порядку
+        reverse_order = descending != backwards
+        lookup = "lt" if reverse_order else "gt"
+        prefix = "-" if reverse_order else ""
+
+        if cursor:
+            value, tie_value, _ = cursor
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}": value})
+                | Q(**{field: value, f"{self.tie_breaker}__{lookup}": tie_value})
+            )
+        queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}{self.tie_breaker}")
+
+        object_list = list(queryset[:page_size + 1])
+        has_more = len(object_list) > page_size
+        object_list = object_list[:page_size]
+        if backwards:
+            object_list.reverse()
+
+        has_next = (not backwards and has_more) or backwards
+        has_previous = (backwards and has_more) or (not backwards and cursor is not None)
+        page = KeysetPage(
+            object_list,
+            next_cursor=(
+                self.encode_cursor(object_list[-1], field, False)
+                if has_next and object_list else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(object_list[0], field, True)
+                if has_previous and object_list else None
+            ),
+        )
+        return None, page, object_list, page.has_other_pages()
+
+
 class SearchByIdMixin:
     form = IdSearchForm
 
@@ -39,4 +232,4 @@ class SearchByIdMixin:
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({"form": self.form(self.request.GET)})
-        return context
\ No newline at end of file
+        return context
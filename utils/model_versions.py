@@ -0,0 +1,108 @@
+"""
+Версії моделей та окремих обʼєктів для інвалідації кешу.
+Версія моделі збільшується при кожному збереженні (в тому числі мʼякому видаленні)
+чи видаленні її обʼєкта, версія обʼєкта - при зміні самого обʼєкта.
+Сигнали підключаються лише для моделей, від яких залежать кешовані сторінки
+та лічильники (див. track_model_versions), інші моделі зберігаються без запису в кеш.
+Ключі кешу, до яких входять версії, після змін просто перестають використовуватись.
+Версія - це час зміни в наносекундах, тому після видалення версії з кешу
+нова версія ніколи не збігається зі старою.
+Версії працюють лише зі спільним для всіх процесів кешем (див. check_shared_cache).
+"""
+
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+# кеші, які не бачать інші процеси
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# версії обʼєктів зберігаються обмежений час, версії моделей - постійно
+OBJECT_VERSION_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def model_version_key(model: type[Model]) -> str:
+    return f"version:{model._meta.label_lower}"
+
+
+def object_version_key(model: type[Model], pk) -> str:
+    return f"version:{model._meta.label_lower}:{pk}"
+
+
+def get_version(key: str, timeout: int | None = None) -> int:
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout):
+            version = cache.get(key, version)
+    return version
+
+
+def model_version(model: type[Model]) -> int:
+    return get_version(model_version_key(model))
+
+
+def object_version(model: type[Model], pk) -> int:
+    return get_version(object_version_key(model, pk), OBJECT_VERSION_TIMEOUT)
+
+
+def bump_version(key: str, timeout: int | None = None) -> None:
+    cache.set(key, time.time_ns(), timeout)
+
+
+def bump_object_version(model: type[Model], pk) -> None:
+    bump_version(object_version_key(model, pk), OBJECT_VERSION_TIMEOUT)
+
+
+def bump_model_version(sender, instance=None, update_fields=None, **kwargs) -> None:
+    """
+    Збільшує версію моделі <sender> та обʼєкта <instance>
+    (обробник сигналів post_save та post_delete).
+    """
+    # оновлення дати входу користувача не змінює даних, які показуються
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    bump_version(model_version_key(sender))
+    if instance is not None and instance.pk is not None:
+        bump_object_version(sender, instance.pk)
+
+
+def bump_m2m_model_version(sender, instance, action, **kwargs) -> None:
+    """Збільшує версію моделі при зміні її ManyToMany звʼязків (сигнал m2m_changed)"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_model_version(type(instance), instance)
+
+
+def track_model_versions(*models: type[Model]) -> None:
+    """Змінює версії моделей <models> при збереженні, видаленні та зміні їх ManyToMany"""
+    for model in models:
+        post_save.connect(bump_model_version, sender=model)
+        post_delete.connect(bump_model_version, sender=model)
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(bump_m2m_model_version, sender=field.remote_field.through)
+
+
+def check_shared_cache(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    """
+    Перевірка (manage.py check): версії, змінені в одному процесі, мають бачити всі,
+    тому без DEBUG кеш у памʼяті процесу - помилка.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    message_class = checks.Warning if settings.DEBUG else checks.Error
+    return [
+        message_class(
+            f"Cache backend {backend} is not shared between processes, "
+            "cached pages and counts will not be invalidated in other processes.",
+            hint="Use a shared cache, e.g. FileBasedCache, RedisCache or DatabaseCache.",
+            id="utils.E001",
+        )
+    ]
@@ -0,0 +1,80 @@
+"""
+Завантаження ресурсів pdf файлів (стилі, шрифти, зображення) для WeasyPrint.
+Адреси STATIC_URL та MEDIA_URL читаються одразу з диску за абсолютними шляхами,
+тому не залежать від каталогу, з якого запущено сервер. Замість зображень
+нерухомості віддаються їх зменшені pdf копії (images.derivatives), якщо вони є.
+Інші адреси завантажує стандартний url_fetcher WeasyPrint.
+"""
+
+import mimetypes
+import os
+from functools import lru_cache
+from urllib.parse import unquote, urljoin, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.storage import default_storage
+from django.utils._os import safe_join
+
+from images.derivatives import derivative_name
+
+# базова адреса документа, відносно якої WeasyPrint будує адреси ресурсів
+BASE_URL = "http://estate-agency.local/"
+
+
+def static_root() -> str:
+    return settings.STATIC_ROOT or os.path.join(settings.BASE_DIR, "static")
+
+
+def static_path(name: str) -> str:
+    """Абсолютний шлях до статичного файлу <name>"""
+    path = finders.find(name)
+    if path is None:
+        path = safe_join(static_root(), name)
+    return path
+
+
+@lru_cache(maxsize=64)
+def read_static(path: str) -> bytes:
+    """Вміст статичного файлу, статика не змінюється під час роботи процесу"""
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def read_media(name: str) -> tuple[str, bytes]:
+    """Повертає імʼя та вміст pdf копії файлу <name> або самого файлу"""
+    pdf_name = derivative_name(name, "pdf")
+    mime_type = mimetypes.guess_type(name)[0] or ""
+    if mime_type.startswith("image/") and default_storage.exists(pdf_name):
+        name = pdf_name
+    with default_storage.open(name, "rb") as file:
+        return name, file.read()
+
+
+def url_name(url: str, prefix: str) -> str | None:
+    """Шлях файлу в адресі <url> відносно <prefix> або None"""
+    prefix = urljoin(BASE_URL, prefix)
+    if not url.startswith(prefix):
+        return None
+    return unquote(urlsplit(url[len(prefix):]).path).lstrip("/")
+
+
+def url_fetcher(url: str, *args, **kwargs) -> dict:
+    if (name := url_name(url, settings.STATIC_URL)) is not None:
+        path = static_path(name)
+        return {
+            "string": read_static(path),
+            "mime_type": mimetypes.guess_type(path)[0],
+            "redirected_url": url,
+        }
+    if (name := url_name(url, settings.MEDIA_URL)) is not None:
+        name, content = read_media(name)
+        return {
+            "string": content,
+            "mime_type": mimetypes.guess_type(name)[0],
+            "redirected_url": url,
+        }
+
+    import weasyprint
+
+    return weasyprint.default_url_fetcher(url, *args, **kwargs)
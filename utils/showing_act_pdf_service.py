@@ -2,13 +2,18 @@ import io
 from enum import Enum
 
 import weasyprint
-from django.db.models.query import QuerySet
+from weasyprint.text.fonts import FontConfiguration
 from django.utils.translation import gettext as _
 from django.template import loader
 
 from objects.models import BaseRealEstate, Apartment, Commerce, House, Land
 from accounts.models import CustomUser
 from handbooks.models import Client
+from utils.pdf_url_fetcher import BASE_URL, static_path, url_fetcher
+
+# шрифти та стилі завантажуються один раз на процес
+_font_config = None
+_stylesheet = None
 
 
 class ShowingActPDFType(Enum):
@@ -24,7 +29,7 @@ class ShowingActPDFService:
         type: ShowingActPDFType,
         user: CustomUser,
         client: Client,
-        objects: QuerySet[BaseRealEstate]
+        objects: list[BaseRealEstate]
     ) -> io.BytesIO:
         template_name: str
         if type == ShowingActPDFType.SIMPLE:
@@ -42,13 +47,34 @@ class ShowingActPDFService:
             "real_estate_descriptions": descriptions
         }
         html_string = loader.render_to_string(template_name, context)
-        html = weasyprint.HTML(string=html_string, base_url="..")
-        css = weasyprint.CSS("static/css/showing_act_pdf.css")
+        html = weasyprint.HTML(
+            string=html_string, base_url=BASE_URL, url_fetcher=url_fetcher
+        )
         buffer = io.BytesIO()
-        html.write_pdf(buffer, stylesheets=[css])
+        html.write_pdf(
+            buffer, stylesheets=[get_stylesheet()], font_config=get_font_config()
+        )
         buffer.seek(0)
         return buffer
-    
+
+
+def get_font_config() -> FontConfiguration:
+    global _font_config
+    if _font_config is None:
+        _font_config = FontConfiguration()
+    return _font_config
+
+
+def get_stylesheet() -> weasyprint.CSS:
+    global _stylesheet
+    if _stylesheet is None:
+        _stylesheet = weasyprint.CSS(
+            filename=static_path("css/showing_act_pdf.css"),
+            url_fetcher=url_fetcher,
+            font_config=get_font_config(),
+        )
+    return _stylesheet
+
 
 def real_estate_brief_description(real_estate: BaseRealEstate) -> str:
     """
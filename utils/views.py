@@ -1,6 +1,8 @@
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
 
+from accounts.models import HistoryChange
+from utils.mixins.mixins import CustomPaginateOnPageMixin
 from utils.utils import  table_to_app
 from django.utils.translation import activate
 
@@ -78,7 +80,7 @@ class CustomDeleteView(DeleteView):
         )
 
 
-class HistoryView(DetailView):
+class HistoryView(CustomPaginateOnPageMixin, DetailView):
     """
     Вьюшка щоб подивитись історію змін
     """
@@ -86,6 +88,7 @@ class HistoryView(DetailView):
     template_name = "handbooks/history_list.html"
     model = None
     handbook_type = None
+    paginate_by = 50
 
     def get_context_data(self, *, object_list=None, **kwargs):
         activate(self.kwargs["lang"])  # Перекладаємо
@@ -93,26 +96,12 @@ class HistoryView(DetailView):
         context = super().get_context_data(**kwargs)
         context["lang"] = self.kwargs["lang"]
 
-        history = context["object"].history.all()
-        changes = []
-        for record in history:
-            if record.prev_record:
-                prev_record = record.prev_record
-                for field in context["object"]._meta.fields:
-                    field_name = field.name
-                    old_value = getattr(prev_record, field_name)
-                    new_value = getattr(record, field_name)
-                    if old_value != new_value:
-                        changes.append(
-                            {
-                                "date": record.history_date,
-                                "user": record.history_user,
-                                "field": field.verbose_name,
-                                "old_value": old_value,
-                                "new_value": new_value,
-                            }
-                        )
-        context["history"] = changes
+        # зміни полів записуються разом з історією (див. accounts.models.HistoryChange),
+        # старі зміни читаються з архіву лише на сторінках після основних
+        history = HistoryChange.with_archive(context["object"])
+        paginator = self.get_paginator(history, self.get_paginate_by(history))
+        context["page_obj"] = paginator.get_page(self.request.GET.get("page"))
+        context["history"] = context["page_obj"].object_list
         context["handbook"] = self.handbook_type
         context["list_url"] = (
             f"{table_to_app(self.handbook_type)}:{self.handbook_type}_list"